@@ -0,0 +1,906 @@
+#-------------------------------------------------------------
+# Name:       Fake ArcPy
+# Purpose:    Lightweight stand in for the arcpy site package so the toolkit scripts can be run and timed
+#             without ArcGIS installed. Each workspace (.gdb or .sde) is a folder holding a SQLite database
+#             with the datasets, fields and domains in it. Covers the List*, Describe, Exists, data access
+#             cursors and the geoprocessing tools used by the benchmarked scripts, and counts every call made.
+#             Set fakeCallLatency to add a delay to each call e.g. to model an enterprise geodatabase.
+# Author:     Shaun Weston (shaun_weston@eagle.co.nz)
+# Date Created:    18/10/2026
+# Last Updated:    18/10/2026
+# Copyright:   (c) Eagle Technology
+# ArcGIS Version:   None - Stand in for arcpy
+# Python Version:   2.7/3.x
+#--------------------------------
+
+# Import main modules
+import os
+import re
+import json
+import time
+import uuid
+import struct
+import fnmatch
+import sqlite3
+import datetime
+import tempfile
+import functools
+
+# Set global variables
+# Calls made to arcpy keyed by function name
+callCounts = {}
+# Seconds to wait on each call e.g. 0.02 to model a round trip to an enterprise geodatabase
+fakeCallLatency = 0
+# Messages added with AddMessage, AddWarning and AddError
+messages = []
+# Print the messages as they are added
+printMessages = False
+# Open connections keyed by workspace
+connections = {}
+# Layers and table views keyed by name
+layers = {}
+# Parameters when run as a script tool
+parameters = []
+
+# Archive rows that are still current have a to date of 31/12/9999
+openDate = datetime.datetime(9999, 12, 31, 23, 59, 59)
+
+
+# Start of count calls function
+def countCalls(name):
+    # Count each call to the function and add the latency
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            callCounts[name] = callCounts.get(name, 0) + 1
+            if (fakeCallLatency):
+                time.sleep(fakeCallLatency)
+            try:
+                return function(*args, **kwargs)
+            # Tool errors can be got with GetMessages
+            except ExecuteError as e:
+                messages.append((2, str(e)))
+                raise
+        return wrapper
+    return decorator
+# End of count calls function
+
+
+# Start of reset call counts function
+def resetCallCounts():
+    callCounts.clear()
+    del messages[:]
+# End of reset call counts function
+
+
+# Start of execute error class
+class ExecuteError(Exception):
+    pass
+# End of execute error class
+
+
+# Start of environment class
+class Environment(object):
+    def __init__(self):
+        self.workspace = None
+        self.overwriteOutput = False
+        self.preserveGlobalIds = False
+        self.scratchWorkspace = None
+        self.scratchFolder = tempfile.mkdtemp(prefix="FakeArcPyScratch")
+        self.scratchGDB = os.path.join(self.scratchFolder, "scratch.gdb")
+# End of environment class
+
+env = Environment()
+
+
+# ---------------------------------------- Workspaces ---------------------------------------- #
+
+# Start of split path function
+def splitPath(path):
+    # Get the workspace, feature dataset and dataset name from a path e.g. C:\Data\Data.gdb\Transport\Roads
+    path = str(path)
+    # Layers and table views
+    if (path.lower() in layers):
+        return splitPath(layers[path.lower()]["path"])
+    # Relative to the current workspace
+    parts = [part for part in re.split(r"[\\/]", path) if part]
+    workspaceIndex = None
+    for index, part in enumerate(parts):
+        if (part.lower().endswith(".gdb")) or (part.lower().endswith(".sde")) or (part.lower() in ["in_memory","memory"]):
+            workspaceIndex = index
+    if (workspaceIndex is None):
+        if (not env.workspace):
+            return None, "", path
+        return splitPath(os.path.join(str(env.workspace), path))
+    if (path.startswith("/")):
+        workspace = "/" + "/".join(parts[:workspaceIndex + 1])
+    elif (re.match(r"^[a-zA-Z]:", path)):
+        workspace = "\\".join(parts[:workspaceIndex + 1])
+    else:
+        workspace = os.path.join(*parts[:workspaceIndex + 1])
+    remaining = parts[workspaceIndex + 1:]
+    if (len(remaining) == 0):
+        return workspace, "", ""
+    if (len(remaining) == 1):
+        return workspace, "", remaining[0]
+    return workspace, remaining[-2], remaining[-1]
+# End of split path function
+
+
+# Start of get connection function
+def getConnection(workspace, create=False):
+    key = workspace.replace("\\", "/").lower()
+    if (key not in connections):
+        if (key.split("/")[-1] in ["in_memory","memory"]):
+            connection = sqlite3.connect(":memory:")
+        else:
+            databaseFile = os.path.join(workspace.replace("\\", os.sep), "Workspace.sqlite")
+            # Scratch geodatabase is created when it is first used
+            if (not os.path.exists(databaseFile)) and (not create) and (key != env.scratchGDB.replace("\\", "/").lower()):
+                return None
+            if not os.path.exists(os.path.dirname(databaseFile)):
+                os.makedirs(os.path.dirname(databaseFile))
+            connection = sqlite3.connect(databaseFile)
+        connection.isolation_level = None
+        # Benchmarks measure the scripts rather than the disk
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("PRAGMA journal_mode = MEMORY")
+        connection.execute("CREATE TABLE IF NOT EXISTS Items (Name TEXT PRIMARY KEY COLLATE NOCASE, Type TEXT, FeatureDataset TEXT COLLATE NOCASE, ShapeType TEXT, SpatialReference INTEGER, IsVersioned INTEGER, IsArchived INTEGER, EditorTracking INTEGER, EditedAtField TEXT)")
+        connection.execute("CREATE TABLE IF NOT EXISTS Fields (Dataset TEXT COLLATE NOCASE, Position INTEGER, Name TEXT COLLATE NOCASE, Type TEXT, Length INTEGER, Alias TEXT, Nullable INTEGER, Domain TEXT)")
+        connection.execute("CREATE TABLE IF NOT EXISTS Domains (Name TEXT PRIMARY KEY COLLATE NOCASE, Description TEXT, DomainType TEXT, FieldType TEXT, CodedValues TEXT)")
+        connections[key] = connection
+    return connections[key]
+# End of get connection function
+
+
+# Start of get item function
+def getItem(path):
+    workspace, featureDataset, name = splitPath(path)
+    if (not workspace) or (not name):
+        return None, None
+    connection = getConnection(workspace)
+    if (not connection):
+        return None, None
+    item = connection.execute("SELECT Name, Type, FeatureDataset, ShapeType, SpatialReference, IsVersioned, IsArchived, EditorTracking, EditedAtField FROM Items WHERE Name = ?", (name,)).fetchone()
+    if (not item):
+        return connection, None
+    return connection, {"name": item[0], "type": item[1], "featureDataset": item[2], "shapeType": item[3], "spatialReference": item[4],
+                        "isVersioned": item[5], "isArchived": item[6], "editorTracking": item[7], "editedAtField": item[8], "workspace": workspace}
+# End of get item function
+
+
+# Start of require item function
+def requireItem(path):
+    connection, item = getItem(path)
+    if (not item):
+        raise ExecuteError("ERROR 000732: Dataset " + str(path) + " does not exist or is not supported")
+    return connection, item
+# End of require item function
+
+
+# Start of quote function
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+# End of quote function
+
+
+# Start of get fields function
+def getFieldRows(connection, name):
+    return connection.execute("SELECT Name, Type, Length, Alias, Nullable, Domain FROM Fields WHERE Dataset = ? ORDER BY Position", (name,)).fetchall()
+# End of get fields function
+
+
+# Start of translate where clause function
+def translateWhereClause(whereClause):
+    # Change the SQL used by file and enterprise geodatabases to SQLite
+    if (not whereClause):
+        return ""
+    whereClause = re.sub(r"(?i)\b(date|timestamp)\s+'", "'", str(whereClause))
+    whereClause = re.sub(r"(?i)CAST\(GETDATE\(\) AS DATE\)", "date('now','localtime')", whereClause)
+    whereClause = re.sub(r"(?i)GETDATE\(\)", "datetime('now','localtime')", whereClause)
+    return whereClause
+# End of translate where clause function
+
+
+# Start of get where clause function
+def getWhereClause(path, whereClause=None):
+    # Combine the where clause of a layer or table view with the where clause
+    clauses = []
+    if (str(path).lower() in layers) and (layers[str(path).lower()]["where"]):
+        clauses.append("(" + translateWhereClause(layers[str(path).lower()]["where"]) + ")")
+    if (whereClause):
+        clauses.append("(" + translateWhereClause(whereClause) + ")")
+    return " AND ".join(clauses)
+# End of get where clause function
+
+
+# ---------------------------------------- Values ---------------------------------------- #
+
+# Start of geometry class
+class Geometry(object):
+    def __init__(self, shapeType, coordinates):
+        self.type = shapeType.lower()
+        self.coordinates = [tuple(coordinate) for coordinate in coordinates]
+
+    @property
+    def firstPoint(self):
+        return Point(*self.coordinates[0])
+
+    @property
+    def centroid(self):
+        return Point(sum([coordinate[0] for coordinate in self.coordinates]) / len(self.coordinates), sum([coordinate[1] for coordinate in self.coordinates]) / len(self.coordinates))
+
+    @property
+    def pointCount(self):
+        return len(self.coordinates)
+
+    @property
+    def WKB(self):
+        return bytearray(struct.pack("<" + "d" * (len(self.coordinates) * 2), *[value for coordinate in self.coordinates for value in coordinate]))
+
+    @property
+    def WKT(self):
+        return self.type.upper() + " (" + ", ".join([str(coordinate[0]) + " " + str(coordinate[1]) for coordinate in self.coordinates]) + ")"
+
+    @property
+    def JSON(self):
+        return json.dumps({"type": self.type, "coordinates": self.coordinates})
+
+    def equals(self, second_geometry):
+        return self.coordinates == second_geometry.coordinates
+# End of geometry class
+
+
+# Start of point class
+class Point(object):
+    def __init__(self, X=0.0, Y=0.0, *args):
+        self.X = X
+        self.Y = Y
+# End of point class
+
+
+# Start of shape to storage function
+def shapeToStorage(value, shapeType):
+    # Store geometry as a JSON list of coordinates
+    if (value is None):
+        return None
+    if isinstance(value, Geometry):
+        return json.dumps(value.coordinates)
+    if isinstance(value, Point):
+        return json.dumps([(value.X, value.Y)])
+    if isinstance(value, (tuple, list)) and (len(value) == 2) and (not isinstance(value[0], (tuple, list))):
+        return json.dumps([tuple(value)])
+    return json.dumps([tuple(coordinate) for coordinate in value])
+# End of shape to storage function
+
+
+# Start of as shape function
+def AsShape(geojson_struct, esri_json=False):
+    # Esri JSON or GeoJSON geometry to a geometry of its coordinates
+    if (esri_json):
+        if ("x" in geojson_struct):
+            return Geometry("Point", [(geojson_struct["x"], geojson_struct["y"])])
+        for key, shapeType in [("points", "Multipoint"), ("paths", "Polyline"), ("rings", "Polygon")]:
+            if (key in geojson_struct):
+                return Geometry(shapeType, [coordinate[:2] for part in (geojson_struct[key] if (key != "points") else [geojson_struct[key]]) for coordinate in part])
+        raise ValueError("Unsupported geometry")
+    coordinates = geojson_struct["coordinates"]
+    if (geojson_struct["type"] == "Point"):
+        coordinates = [coordinates]
+    return Geometry(geojson_struct["type"], coordinates)
+# End of as shape function
+
+
+# Start of value to storage function
+def valueToStorage(value, fieldType):
+    if (value is None):
+        return None
+    if (fieldType == "Date") and isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat(" ")
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return value
+# End of value to storage function
+
+
+# Start of value from storage function
+def valueFromStorage(value, fieldType):
+    if (value is None):
+        return None
+    if (fieldType == "Date"):
+        for dateFormat in ["%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
+            try:
+                return datetime.datetime.strptime(value, dateFormat)
+            except ValueError:
+                pass
+    return value
+# End of value from storage function
+
+
+# ---------------------------------------- Describe ---------------------------------------- #
+
+# Start of field class
+class Field(object):
+    def __init__(self, name="", fieldType="String", length=255, alias="", nullable=True, domain=""):
+        self.name = name
+        self.baseName = name
+        self.aliasName = alias or name
+        self.type = fieldType
+        self.length = length
+        self.precision = 0
+        self.scale = 0
+        self.isNullable = bool(nullable)
+        self.required = fieldType in ["OID","Geometry"]
+        self.editable = fieldType not in ["OID","GlobalID"]
+        self.domain = domain or ""
+# End of field class
+
+
+# Start of spatial reference class
+class SpatialReference(object):
+    def __init__(self, factoryCode=2193):
+        self.factoryCode = factoryCode or 0
+        self.name = "Unknown" if not factoryCode else "Spatial Reference " + str(factoryCode)
+
+    def loadFromString(self, string):
+        self.name = "Custom"
+# End of spatial reference class
+
+
+# Start of connection properties class
+class ConnectionProperties(object):
+    def __init__(self, databaseClient):
+        self.dbclient = databaseClient
+        self.instance = "sde:" + databaseClient
+# End of connection properties class
+
+
+# Start of describe class
+class DescribeObject(object):
+    pass
+# End of describe class
+
+
+# Start of describe function
+@countCalls("Describe")
+def Describe(path):
+    describeObject = DescribeObject()
+    workspace, featureDataset, name = splitPath(path)
+    if (workspace) and (not name):
+        connection = getConnection(workspace)
+        if (not connection):
+            raise ExecuteError("ERROR 000732: Workspace " + str(path) + " does not exist or is not supported")
+        describeObject.name = os.path.basename(workspace.replace("\\", "/"))
+        describeObject.baseName = os.path.splitext(describeObject.name)[0]
+        describeObject.dataType = "Workspace"
+        describeObject.catalogPath = workspace
+        describeObject.path = os.path.dirname(workspace)
+        if (workspace.lower().endswith(".sde")):
+            describeObject.workspaceType = "RemoteDatabase"
+            describeObject.connectionProperties = ConnectionProperties("sqlserver")
+        else:
+            describeObject.workspaceType = "LocalDatabase"
+            describeObject.connectionProperties = ConnectionProperties("")
+        describeObject.children = [Describe(os.path.join(workspace, row[0])) for row in connection.execute("SELECT Name FROM Items WHERE FeatureDataset = '' ORDER BY Name").fetchall()]
+        return describeObject
+
+    connection, item = requireItem(path)
+    fieldRows = getFieldRows(connection, item["name"])
+    describeObject.name = item["name"]
+    describeObject.baseName = item["name"]
+    describeObject.catalogPath = str(path)
+    describeObject.path = os.path.join(workspace, item["featureDataset"]) if item["featureDataset"] else workspace
+    describeObject.dataType = item["type"]
+    describeObject.datasetType = item["type"]
+    describeObject.spatialReference = SpatialReference(item["spatialReference"])
+    describeObject.canVersion = True
+    describeObject.isVersioned = bool(item["isVersioned"])
+    describeObject.isArchived = bool(item["isArchived"])
+    describeObject.children = []
+    if (item["type"] == "FeatureDataset"):
+        describeObject.children = [Describe(os.path.join(workspace, item["name"], row[0])) for row in connection.execute("SELECT Name FROM Items WHERE FeatureDataset = ? ORDER BY Name", (item["name"],)).fetchall()]
+        return describeObject
+
+    describeObject.fields = [Field(row[0], row[1], row[2], row[3], row[4], row[5]) for row in fieldRows]
+    describeObject.hasOID = True
+    describeObject.OIDFieldName = [row[0] for row in fieldRows if (row[1] == "OID")][0]
+    globalIDFields = [row[0] for row in fieldRows if (row[1] == "GlobalID")]
+    describeObject.hasGlobalID = len(globalIDFields) > 0
+    describeObject.globalIDFieldName = globalIDFields[0] if globalIDFields else ""
+    describeObject.editorTrackingEnabled = bool(item["editorTracking"])
+    describeObject.editedAtFieldName = item["editedAtField"] or ""
+    describeObject.defaultSubtypeCode = -1
+    if (item["type"] == "FeatureClass"):
+        describeObject.shapeType = item["shapeType"]
+        describeObject.shapeFieldName = [row[0] for row in fieldRows if (row[1] == "Geometry")][0]
+        describeObject.lengthFieldName = ""
+        describeObject.areaFieldName = ""
+    return describeObject
+# End of describe function
+
+
+# Start of exists function
+@countCalls("Exists")
+def Exists(path):
+    workspace, featureDataset, name = splitPath(path)
+    if (not workspace):
+        return False
+    if (not name):
+        return getConnection(workspace) is not None
+    return getItem(path)[1] is not None
+# End of exists function
+
+
+# Start of list fields function
+@countCalls("ListFields")
+def ListFields(path, wild_card="", field_type=""):
+    connection, item = requireItem(path)
+    fields = [Field(row[0], row[1], row[2], row[3], row[4], row[5]) for row in getFieldRows(connection, item["name"])]
+    if (wild_card):
+        fields = [field for field in fields if fnmatch.fnmatch(field.name.lower(), wild_card.lower())]
+    return fields
+# End of list fields function
+
+
+# Start of list items function
+def listItems(itemTypes, wildCard, featureDataset):
+    if (not env.workspace):
+        return []
+    connection = getConnection(str(env.workspace))
+    if (not connection):
+        return []
+    names = [row[0] for row in connection.execute("SELECT Name FROM Items WHERE Type IN (" + ",".join(["?"] * len(itemTypes)) + ") AND FeatureDataset = ? ORDER BY Name", tuple(itemTypes) + (featureDataset or "",)).fetchall()]
+    if (wildCard):
+        names = [name for name in names if fnmatch.fnmatch(name.lower(), wildCard.lower())]
+    return names
+# End of list items function
+
+
+# Start of validate field name function
+@countCalls("ValidateFieldName")
+def ValidateFieldName(name, workspace=None):
+    fieldName = re.sub("[^A-Za-z0-9_]", "_", name)
+    if (not fieldName) or (not fieldName[0].isalpha()):
+        fieldName = "F" + fieldName
+    return fieldName[:64]
+# End of validate field name function
+
+
+# Start of validate table name function
+@countCalls("ValidateTableName")
+def ValidateTableName(name, workspace=None):
+    tableName = re.sub("[^A-Za-z0-9_]", "_", name)
+    if (not tableName) or (not tableName[0].isalpha()):
+        tableName = "T" + tableName
+    return tableName[:160]
+# End of validate table name function
+
+
+# Start of list datasets function
+@countCalls("ListDatasets")
+def ListDatasets(wild_card="", feature_type=""):
+    if (feature_type) and (feature_type.lower() not in ["feature","all"]):
+        return []
+    return listItems(["FeatureDataset"], wild_card, "")
+# End of list datasets function
+
+
+# Start of list feature classes function
+@countCalls("ListFeatureClasses")
+def ListFeatureClasses(wild_card="", feature_type="", feature_dataset=""):
+    return listItems(["FeatureClass"], wild_card, feature_dataset)
+# End of list feature classes function
+
+
+# Start of list tables function
+@countCalls("ListTables")
+def ListTables(wild_card="", table_type=""):
+    return listItems(["Table"], wild_card, "")
+# End of list tables function
+
+
+# Start of add field delimiters function
+@countCalls("AddFieldDelimiters")
+def AddFieldDelimiters(datasource, field):
+    return quote(field)
+# End of add field delimiters function
+
+
+# ---------------------------------------- Messages ---------------------------------------- #
+
+# Start of add message function
+@countCalls("AddMessage")
+def AddMessage(message):
+    messages.append((0, str(message)))
+    if (printMessages):
+        print(message)
+# End of add message function
+
+
+# Start of add warning function
+@countCalls("AddWarning")
+def AddWarning(message):
+    messages.append((1, str(message)))
+    if (printMessages):
+        print(message)
+# End of add warning function
+
+
+# Start of add error function
+@countCalls("AddError")
+def AddError(message):
+    messages.append((2, str(message)))
+    if (printMessages):
+        print(message)
+# End of add error function
+
+
+# Start of get messages function
+@countCalls("GetMessages")
+def GetMessages(severity=0):
+    return "\n".join([message for level, message in messages if (level >= severity)])
+# End of get messages function
+
+
+# Start of script tool functions
+def GetArgumentCount():
+    return len(parameters)
+
+def GetParameterAsText(index):
+    return parameters[index]
+
+def SetParameter(index, value):
+    pass
+
+def SetParameterAsText(index, value):
+    pass
+
+def CheckProduct(product):
+    return "Available"
+
+def GetInstallInfo(product="desktop"):
+    return {"InstallDir": tempfile.gettempdir() + os.sep, "Version": "10.7"}
+# End of script tool functions
+
+
+# ---------------------------------------- Geoprocessing tools ---------------------------------------- #
+
+# Start of result class
+class Result(object):
+    def __init__(self, *outputs):
+        self.outputs = outputs
+
+    def getOutput(self, index):
+        return self.outputs[index]
+
+    def __str__(self):
+        return str(self.outputs[0])
+
+    def __getitem__(self, index):
+        return self.outputs[index]
+# End of result class
+
+
+# Start of create dataset function
+def createDataset(path, itemType, shapeType, spatialReference, fieldRows, isVersioned=0, isArchived=0, editorTracking=0, editedAtField=""):
+    workspace, featureDataset, name = splitPath(path)
+    connection = getConnection(workspace)
+    if (not connection):
+        raise ExecuteError("ERROR 000732: Workspace " + str(workspace) + " does not exist or is not supported")
+    if (getItem(path)[1]):
+        if (not env.overwriteOutput):
+            raise ExecuteError("ERROR 000258: Output " + str(path) + " already exists")
+        deleteDataset(path)
+    connection.execute("INSERT INTO Items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", (name, itemType, featureDataset, shapeType, spatialReference, isVersioned, isArchived, editorTracking, editedAtField))
+    if (itemType == "FeatureDataset"):
+        return name
+    columns = []
+    for position, fieldRow in enumerate(fieldRows):
+        connection.execute("INSERT INTO Fields VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (name, position) + tuple(fieldRow))
+        if (fieldRow[1] == "OID"):
+            columns.append(quote(fieldRow[0]) + " INTEGER PRIMARY KEY AUTOINCREMENT")
+        else:
+            columns.append(quote(fieldRow[0]))
+    connection.execute("CREATE TABLE " + quote(name) + " (" + ", ".join(columns) + ")")
+    return name
+# End of create dataset function
+
+
+# Start of delete dataset function
+def deleteDataset(path):
+    connection, item = requireItem(path)
+    if (item["type"] == "FeatureDataset"):
+        for row in connection.execute("SELECT Name FROM Items WHERE FeatureDataset = ?", (item["name"],)).fetchall():
+            deleteDataset(os.path.join(item["workspace"], item["name"], row[0]))
+    else:
+        connection.execute("DROP TABLE IF EXISTS " + quote(item["name"]))
+        connection.execute("DELETE FROM Fields WHERE Dataset = ?", (item["name"],))
+    connection.execute("DELETE FROM Items WHERE Name = ?", (item["name"],))
+# End of delete dataset function
+
+
+# Start of copy dataset function
+def copyDataset(inputPath, outputPath, whereClause=None):
+    # Create the output with the same fields and copy the records over - Global IDs are new unless preserving them
+    connection, item = requireItem(inputPath)
+    fieldRows = [tuple(row) for row in getFieldRows(connection, item["name"])]
+    createDataset(outputPath, item["type"], item["shapeType"], item["spatialReference"], fieldRows)
+    return appendRecords(inputPath, outputPath, whereClause)
+# End of copy dataset function
+
+
+# Start of append records function
+def appendRecords(inputPath, targetPath, whereClause=None, keepGlobalIDs=False):
+    inputConnection, inputItem = requireItem(inputPath)
+    targetConnection, targetItem = requireItem(targetPath)
+    inputFields = dict([(row[0].lower(), row) for row in getFieldRows(inputConnection, inputItem["name"])])
+    targetFields = getFieldRows(targetConnection, targetItem["name"])
+    # Map the fields by name - Object IDs are always new and global IDs are new unless preserving them
+    copyFields = []
+    newGlobalIDFields = []
+    for targetField in targetFields:
+        if (targetField[1] == "OID"):
+            continue
+        if (targetField[1] == "GlobalID") and (not keepGlobalIDs) and (not env.preserveGlobalIds):
+            newGlobalIDFields.append(targetField[0])
+        elif (targetField[1] == "Geometry"):
+            shapeFields = [row[0] for row in inputFields.values() if (row[1] == "Geometry")]
+            if shapeFields:
+                copyFields.append((shapeFields[0], targetField[0]))
+        elif (targetField[0].lower() in inputFields):
+            copyFields.append((inputFields[targetField[0].lower()][0], targetField[0]))
+    query = "SELECT " + (", ".join([quote(field[0]) for field in copyFields]) or "1") + " FROM " + quote(inputItem["name"])
+    combinedWhereClause = getWhereClause(inputPath, whereClause)
+    if (combinedWhereClause):
+        query = query + " WHERE " + combinedWhereClause
+    insert = "INSERT INTO " + quote(targetItem["name"]) + " (" + ", ".join([quote(field[1]) for field in copyFields] + [quote(field) for field in newGlobalIDFields]) + ") VALUES (" + ", ".join(["?"] * (len(copyFields) + len(newGlobalIDFields))) + ")"
+    count = 0
+    for row in inputConnection.execute(query).fetchall():
+        targetConnection.execute(insert, tuple(row[:len(copyFields)]) + tuple(["{" + str(uuid.uuid4()).upper() + "}" for field in newGlobalIDFields]))
+        count = count + 1
+    return count
+# End of append records function
+
+
+# Start of delete records function
+def deleteRecords(path):
+    connection, item = requireItem(path)
+    query = "DELETE FROM " + quote(item["name"])
+    whereClause = getWhereClause(path)
+    if (whereClause):
+        query = query + " WHERE " + whereClause
+    connection.execute(query)
+# End of delete records function
+
+
+# Start of add field function
+def addField(path, name, fieldType, length, alias, nullable, domain):
+    connection, item = requireItem(path)
+    position = connection.execute("SELECT COUNT(*) FROM Fields WHERE Dataset = ?", (item["name"],)).fetchone()[0]
+    connection.execute("INSERT INTO Fields VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (item["name"], position, name, fieldType, length, alias, 1 if nullable else 0, domain or ""))
+    connection.execute("ALTER TABLE " + quote(item["name"]) + " ADD COLUMN " + quote(name))
+# End of add field function
+
+
+# Start of geoprocessing tool functions
+@countCalls("GetCount_management")
+def GetCount_management(in_rows):
+    connection, item = requireItem(in_rows)
+    query = "SELECT COUNT(*) FROM " + quote(item["name"])
+    whereClause = getWhereClause(in_rows)
+    if (whereClause):
+        query = query + " WHERE " + whereClause
+    return Result(str(connection.execute(query).fetchone()[0]))
+
+
+@countCalls("CopyFeatures_management")
+def CopyFeatures_management(in_features, out_feature_class, *args, **kwargs):
+    copyDataset(in_features, out_feature_class)
+    return Result(out_feature_class)
+
+
+@countCalls("CopyRows_management")
+def CopyRows_management(in_rows, out_table, *args, **kwargs):
+    copyDataset(in_rows, out_table)
+    return Result(out_table)
+
+
+@countCalls("TableSelect_analysis")
+def TableSelect_analysis(in_table, out_table, where_clause=None):
+    copyDataset(in_table, out_table, where_clause)
+    return Result(out_table)
+
+
+@countCalls("Select_analysis")
+def Select_analysis(in_features, out_feature_class, where_clause=None):
+    copyDataset(in_features, out_feature_class, where_clause)
+    return Result(out_feature_class)
+
+
+@countCalls("Append_management")
+def Append_management(inputs, target, schema_type="TEST", *args, **kwargs):
+    if not isinstance(inputs, (list, tuple)):
+        inputs = [value for value in str(inputs).split(";") if value]
+    for inputPath in inputs:
+        appendRecords(inputPath, target)
+    return Result(target)
+
+
+@countCalls("DeleteRows_management")
+def DeleteRows_management(in_rows):
+    deleteRecords(in_rows)
+    return Result(in_rows)
+
+
+@countCalls("DeleteFeatures_management")
+def DeleteFeatures_management(in_features):
+    # Tables need delete rows
+    if (requireItem(in_features)[1]["type"] == "Table"):
+        raise ExecuteError("ERROR 000732: Input Features: Dataset " + str(in_features) + " does not exist or is not supported")
+    deleteRecords(in_features)
+    return Result(in_features)
+
+
+@countCalls("TruncateTable_management")
+def TruncateTable_management(in_table):
+    connection, item = requireItem(in_table)
+    connection.execute("DELETE FROM " + quote(item["name"]))
+    return Result(in_table)
+
+
+@countCalls("Delete_management")
+def Delete_management(in_data, data_type=""):
+    if (str(in_data).lower() in layers):
+        del layers[str(in_data).lower()]
+    elif (getItem(in_data)[1]):
+        deleteDataset(in_data)
+    return Result(True)
+
+
+@countCalls("Rename_management")
+def Rename_management(in_data, out_data, data_type=""):
+    connection, item = requireItem(in_data)
+    newName = splitPath(out_data)[2]
+    if (getItem(out_data)[1]):
+        raise ExecuteError("ERROR 000725: Output " + str(out_data) + " already exists")
+    connection.execute("ALTER TABLE " + quote(item["name"]) + " RENAME TO " + quote(newName))
+    connection.execute("UPDATE Fields SET Dataset = ? WHERE Dataset = ?", (newName, item["name"]))
+    connection.execute("UPDATE Items SET Name = ? WHERE Name = ?", (newName, item["name"]))
+    return Result(out_data)
+
+
+@countCalls("MakeFeatureLayer_management")
+def MakeFeatureLayer_management(in_features, out_layer, where_clause=None, *args, **kwargs):
+    requireItem(in_features)
+    layers[str(out_layer).lower()] = {"path": str(in_features), "where": getWhereClause(in_features, where_clause)}
+    return Result(out_layer)
+
+
+@countCalls("MakeTableView_management")
+def MakeTableView_management(in_table, out_view, where_clause=None, *args, **kwargs):
+    requireItem(in_table)
+    layers[str(out_view).lower()] = {"path": str(in_table), "where": getWhereClause(in_table, where_clause)}
+    return Result(out_view)
+
+
+@countCalls("CreateFileGDB_management")
+def CreateFileGDB_management(out_folder_path, out_name):
+    if not out_name.lower().endswith(".gdb"):
+        out_name = out_name + ".gdb"
+    getConnection(os.path.join(out_folder_path, out_name), True)
+    return Result(os.path.join(out_folder_path, out_name))
+
+
+@countCalls("CreateFolder_management")
+def CreateFolder_management(out_folder_path, out_name):
+    if not os.path.exists(os.path.join(out_folder_path, out_name)):
+        os.makedirs(os.path.join(out_folder_path, out_name))
+    return Result(os.path.join(out_folder_path, out_name))
+
+
+@countCalls("CreateFeatureDataset_management")
+def CreateFeatureDataset_management(out_dataset_path, out_name, spatial_reference=None):
+    createDataset(os.path.join(out_dataset_path, out_name), "FeatureDataset", None, 2193, [])
+    return Result(os.path.join(out_dataset_path, out_name))
+
+
+@countCalls("CreateFeatureclass_management")
+def CreateFeatureclass_management(out_path, out_name, geometry_type="POLYGON", *args, **kwargs):
+    shapeType = {"POINT": "Point", "MULTIPOINT": "Multipoint", "POLYLINE": "Polyline", "POLYGON": "Polygon"}[geometry_type.upper()]
+    createDataset(os.path.join(out_path, out_name), "FeatureClass", shapeType, 2193, [("OBJECTID", "OID", 4, "", 0, ""), ("SHAPE", "Geometry", 0, "", 1, "")])
+    return Result(os.path.join(out_path, out_name))
+
+
+@countCalls("CreateTable_management")
+def CreateTable_management(out_path, out_name, *args, **kwargs):
+    createDataset(os.path.join(out_path, out_name), "Table", None, 0, [("OBJECTID", "OID", 4, "", 0, "")])
+    return Result(os.path.join(out_path, out_name))
+
+
+@countCalls("AddField_management")
+def AddField_management(in_table, field_name, field_type, field_precision=None, field_scale=None, field_length=None, field_alias=None, field_is_nullable="NULLABLE", field_is_required=None, field_domain=""):
+    fieldType = {"TEXT": "String", "FLOAT": "Single", "DOUBLE": "Double", "SHORT": "SmallInteger", "LONG": "Integer", "DATE": "Date", "BLOB": "Blob", "GUID": "Guid"}[field_type.upper()]
+    addField(in_table, field_name, fieldType, field_length or 255, field_alias or "", field_is_nullable != "NON_NULLABLE", field_domain)
+    return Result(in_table)
+
+
+@countCalls("AddGlobalIDs_management")
+def AddGlobalIDs_management(in_datasets):
+    for dataset in str(in_datasets).split(";"):
+        connection, item = requireItem(dataset)
+        if not [row for row in getFieldRows(connection, item["name"]) if (row[1] == "GlobalID")]:
+            addField(dataset, "GlobalID", "GlobalID", 38, "", False, "")
+            for row in connection.execute("SELECT OBJECTID FROM " + quote(item["name"])).fetchall():
+                connection.execute("UPDATE " + quote(item["name"]) + " SET GlobalID = ? WHERE OBJECTID = ?", ("{" + str(uuid.uuid4()).upper() + "}", row[0]))
+    return Result(in_datasets)
+
+
+@countCalls("EnableEditorTracking_management")
+def EnableEditorTracking_management(in_dataset, creator_field=None, creation_date_field=None, last_editor_field=None, last_edit_date_field=None, *args, **kwargs):
+    connection, item = requireItem(in_dataset)
+    connection.execute("UPDATE Items SET EditorTracking = 1, EditedAtField = ? WHERE Name = ?", (last_edit_date_field or "", item["name"]))
+    return Result(in_dataset)
+
+
+@countCalls("RegisterAsVersioned_management")
+def RegisterAsVersioned_management(in_dataset, edit_to_base=None):
+    connection, item = requireItem(in_dataset)
+    connection.execute("UPDATE Items SET IsVersioned = 1 WHERE Name = ? OR FeatureDataset = ?", (item["name"], item["name"]))
+    return Result(in_dataset)
+
+
+@countCalls("CreateDomain_management")
+def CreateDomain_management(in_workspace, domain_name, domain_description="", field_type="TEXT", domain_type="CODED", *args, **kwargs):
+    connection = getConnection(str(in_workspace))
+    connection.execute("INSERT OR REPLACE INTO Domains VALUES (?, ?, ?, ?, ?)", (domain_name, domain_description, "CodedValue" if (domain_type.upper() == "CODED") else "Range", field_type, "{}"))
+    return Result(in_workspace)
+
+
+@countCalls("AddCodedValueToDomain_management")
+def AddCodedValueToDomain_management(in_workspace, domain_name, code, code_description):
+    connection = getConnection(str(in_workspace))
+    codedValues = json.loads(connection.execute("SELECT CodedValues FROM Domains WHERE Name = ?", (domain_name,)).fetchone()[0])
+    codedValues[str(code)] = code_description
+    connection.execute("UPDATE Domains SET CodedValues = ? WHERE Name = ?", (json.dumps(codedValues), domain_name))
+    return Result(in_workspace)
+
+
+@countCalls("DeleteDomain_management")
+def DeleteDomain_management(in_workspace, domain_name):
+    connection = getConnection(str(in_workspace))
+    if (connection.execute("SELECT COUNT(*) FROM Fields WHERE Domain = ?", (domain_name,)).fetchone()[0] > 0):
+        raise ExecuteError("ERROR 000244: Domain " + domain_name + " is in use")
+    connection.execute("DELETE FROM Domains WHERE Name = ?", (domain_name,))
+    return Result(in_workspace)
+
+
+@countCalls("AssignDomainToField_management")
+def AssignDomainToField_management(in_table, field_name, domain_name, subtype_code=None):
+    connection, item = requireItem(in_table)
+    connection.execute("UPDATE Fields SET Domain = ? WHERE Dataset = ? AND Name = ?", (domain_name, item["name"], field_name))
+    return Result(in_table)
+
+
+@countCalls("RemoveDomainFromField_management")
+def RemoveDomainFromField_management(in_table, field_name, subtype_code=None):
+    connection, item = requireItem(in_table)
+    connection.execute("UPDATE Fields SET Domain = '' WHERE Dataset = ? AND Name = ?", (item["name"], field_name))
+    return Result(in_table)
+# End of geoprocessing tool functions
+
+
+# Start of reset function
+def reset():
+    # Close the workspaces and forget the layers e.g. between benchmarks
+    for connection in connections.values():
+        connection.close()
+    connections.clear()
+    layers.clear()
+    env.workspace = None
+    env.preserveGlobalIds = False
+    resetCallCounts()
+# End of reset function
+
+
+# Import the data access module
+from arcpy import da
@@ -0,0 +1,270 @@
+#-------------------------------------------------------------
+# Name:       Fake ArcPy Data Access
+# Purpose:    Stand in for the arcpy.da module - Search, update and insert cursors, edit sessions and
+#             domains on top of the SQLite workspaces in the fake arcpy package.
+# Author:     Shaun Weston (shaun_weston@eagle.co.nz)
+# Date Created:    18/10/2026
+# Last Updated:    18/10/2026
+# Copyright:   (c) Eagle Technology
+# ArcGIS Version:   None - Stand in for arcpy
+# Python Version:   2.7/3.x
+#--------------------------------
+
+# Import main modules
+import json
+import uuid
+import datetime
+import arcpy
+
+
+# Start of get cursor fields function
+def getCursorFields(path, fieldNames):
+    # Get the column and how to read or write the value for each field in the cursor
+    connection, item = arcpy.requireItem(path)
+    fieldRows = arcpy.getFieldRows(connection, item["name"])
+    fieldTypes = dict([(row[0].lower(), (row[0], row[1])) for row in fieldRows])
+    oidField = [row[0] for row in fieldRows if (row[1] == "OID")][0]
+    shapeFields = [row[0] for row in fieldRows if (row[1] == "Geometry")]
+    if isinstance(fieldNames, str) or (not isinstance(fieldNames, (list, tuple))):
+        fieldNames = [fieldName.strip() for fieldName in str(fieldNames).split(";")]
+    # All fields - Geometry is returned as the centroid
+    if (len(fieldNames) == 1) and (fieldNames[0] == "*"):
+        fieldNames = [row[0] if (row[1] != "Geometry") else "SHAPE@XY" for row in fieldRows]
+
+    cursorFields = []
+    for fieldName in fieldNames:
+        if (fieldName.upper() == "OID@"):
+            cursorFields.append((fieldName, oidField, "OID"))
+        elif (fieldName.upper().startswith("SHAPE@")):
+            if not shapeFields:
+                raise RuntimeError("Cannot find field '" + fieldName + "'")
+            cursorFields.append((fieldName, shapeFields[0], fieldName.upper()))
+        elif (fieldName.lower() in fieldTypes):
+            cursorFields.append((fieldName,) + fieldTypes[fieldName.lower()])
+        else:
+            raise RuntimeError("Cannot find field '" + fieldName + "'")
+    return connection, item, oidField, cursorFields
+# End of get cursor fields function
+
+
+# Start of read value function
+def readValue(value, fieldType, shapeType):
+    if (fieldType.startswith("SHAPE@")):
+        if (value is None):
+            return None
+        geometry = arcpy.Geometry(shapeType or "Point", json.loads(value))
+        if (fieldType == "SHAPE@XY"):
+            centroid = geometry.centroid
+            return (centroid.X, centroid.Y)
+        if (fieldType == "SHAPE@X"):
+            return geometry.centroid.X
+        if (fieldType == "SHAPE@Y"):
+            return geometry.centroid.Y
+        if (fieldType == "SHAPE@WKB"):
+            return geometry.WKB
+        if (fieldType == "SHAPE@WKT"):
+            return geometry.WKT
+        if (fieldType == "SHAPE@JSON"):
+            return geometry.JSON
+        return geometry
+    return arcpy.valueFromStorage(value, fieldType)
+# End of read value function
+
+
+# Start of write value function
+def writeValue(value, fieldType, shapeType):
+    if (fieldType.startswith("SHAPE@")):
+        return arcpy.shapeToStorage(value, shapeType)
+    return arcpy.valueToStorage(value, fieldType)
+# End of write value function
+
+
+# Start of get select query function
+def getSelectQuery(path, item, columns, where_clause, sql_clause):
+    prefix, postfix = (sql_clause or (None, None))
+    query = "SELECT " + ("DISTINCT " if (prefix and ("DISTINCT" in prefix.upper())) else "") + ", ".join(columns) + " FROM " + arcpy.quote(item["name"])
+    whereClause = arcpy.getWhereClause(path, where_clause)
+    if (whereClause):
+        query = query + " WHERE " + whereClause
+    if (postfix):
+        query = query + " " + postfix
+    return query
+# End of get select query function
+
+
+# Start of search cursor class
+class SearchCursor(object):
+    def __init__(self, in_table, field_names, where_clause=None, spatial_reference=None, explode_to_points=False, sql_clause=(None, None)):
+        arcpy.callCounts["da.SearchCursor"] = arcpy.callCounts.get("da.SearchCursor", 0) + 1
+        connection, item, oidField, self.cursorFields = getCursorFields(in_table, field_names)
+        self.fields = tuple([cursorField[0] for cursorField in self.cursorFields])
+        self.shapeType = item["shapeType"]
+        self.query = getSelectQuery(in_table, item, [arcpy.quote(cursorField[1]) for cursorField in self.cursorFields], where_clause, sql_clause)
+        self.connection = connection
+        self.reset()
+
+    def reset(self):
+        self.cursor = self.connection.execute(self.query)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        row = self.cursor.fetchone()
+        if (row is None):
+            raise StopIteration
+        return tuple([readValue(value, cursorField[2], self.shapeType) for value, cursorField in zip(row, self.cursorFields)])
+
+    __next__ = next
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cursor.close()
+        return False
+# End of search cursor class
+
+
+# Start of update cursor class
+class UpdateCursor(object):
+    def __init__(self, in_table, field_names, where_clause=None, spatial_reference=None, explode_to_points=False, sql_clause=(None, None)):
+        arcpy.callCounts["da.UpdateCursor"] = arcpy.callCounts.get("da.UpdateCursor", 0) + 1
+        connection, self.item, self.oidField, self.cursorFields = getCursorFields(in_table, field_names)
+        self.fields = tuple([cursorField[0] for cursorField in self.cursorFields])
+        self.shapeType = self.item["shapeType"]
+        self.connection = connection
+        # Read the records first so they can be changed while iterating
+        self.rows = connection.execute(getSelectQuery(in_table, self.item, [arcpy.quote(self.oidField)] + [arcpy.quote(cursorField[1]) for cursorField in self.cursorFields], where_clause, sql_clause)).fetchall()
+        self.index = -1
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        self.index = self.index + 1
+        if (self.index >= len(self.rows)):
+            raise StopIteration
+        return [readValue(value, cursorField[2], self.shapeType) for value, cursorField in zip(self.rows[self.index][1:], self.cursorFields)]
+
+    __next__ = next
+
+    def updateRow(self, row):
+        arcpy.callCounts["da.UpdateCursor.updateRow"] = arcpy.callCounts.get("da.UpdateCursor.updateRow", 0) + 1
+        columns = []
+        values = []
+        for value, cursorField in zip(row, self.cursorFields):
+            if (cursorField[2] not in ["OID","GlobalID"]):
+                columns.append(arcpy.quote(cursorField[1]) + " = ?")
+                values.append(writeValue(value, cursorField[2], self.shapeType))
+        # Editor tracking records the date of the edit
+        if (self.item["editorTracking"]) and (self.item["editedAtField"]) and (self.item["editedAtField"].lower() not in [cursorField[1].lower() for cursorField in self.cursorFields]):
+            columns.append(arcpy.quote(self.item["editedAtField"]) + " = ?")
+            values.append(datetime.datetime.now().isoformat(" "))
+        if columns:
+            self.connection.execute("UPDATE " + arcpy.quote(self.item["name"]) + " SET " + ", ".join(columns) + " WHERE " + arcpy.quote(self.oidField) + " = ?", tuple(values) + (self.rows[self.index][0],))
+
+    def deleteRow(self):
+        arcpy.callCounts["da.UpdateCursor.deleteRow"] = arcpy.callCounts.get("da.UpdateCursor.deleteRow", 0) + 1
+        self.connection.execute("DELETE FROM " + arcpy.quote(self.item["name"]) + " WHERE " + arcpy.quote(self.oidField) + " = ?", (self.rows[self.index][0],))
+
+    def reset(self):
+        self.index = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+# End of update cursor class
+
+
+# Start of insert cursor class
+class InsertCursor(object):
+    def __init__(self, in_table, field_names):
+        arcpy.callCounts["da.InsertCursor"] = arcpy.callCounts.get("da.InsertCursor", 0) + 1
+        connection, self.item, oidField, self.cursorFields = getCursorFields(in_table, field_names)
+        self.fields = tuple([cursorField[0] for cursorField in self.cursorFields])
+        self.shapeType = self.item["shapeType"]
+        self.connection = connection
+        # Global IDs not written by the cursor are created for each record
+        self.columns = [cursorField[1] for cursorField in self.cursorFields if (cursorField[2] != "OID")]
+        self.globalIDFields = [row[0] for row in arcpy.getFieldRows(connection, self.item["name"]) if (row[1] == "GlobalID") and (row[0].lower() not in [column.lower() for column in self.columns])]
+        self.insert = "INSERT INTO " + arcpy.quote(self.item["name"]) + " (" + ", ".join([arcpy.quote(column) for column in self.columns + self.globalIDFields]) + ") VALUES (" + ", ".join(["?"] * (len(self.columns) + len(self.globalIDFields))) + ")"
+
+    def insertRow(self, row):
+        arcpy.callCounts["da.InsertCursor.insertRow"] = arcpy.callCounts.get("da.InsertCursor.insertRow", 0) + 1
+        values = [writeValue(value, cursorField[2], self.shapeType) for value, cursorField in zip(row, self.cursorFields) if (cursorField[2] != "OID")]
+        values = values + ["{" + str(uuid.uuid4()).upper() + "}" for globalIDField in self.globalIDFields]
+        return self.connection.execute(self.insert, tuple(values)).lastrowid
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+# End of insert cursor class
+
+
+# Start of editor class
+class Editor(object):
+    def __init__(self, workspace):
+        arcpy.callCounts["da.Editor"] = arcpy.callCounts.get("da.Editor", 0) + 1
+        self.workspace = workspace
+        self.isEditing = False
+
+    def startEditing(self, with_undo=True, multiuser_mode=True):
+        self.isEditing = True
+
+    def stopEditing(self, save_changes=True):
+        self.isEditing = False
+
+    def startOperation(self):
+        pass
+
+    def stopOperation(self):
+        pass
+
+    def abortOperation(self):
+        pass
+
+    def __enter__(self):
+        self.startEditing()
+        return self
+
+    def __exit__(self, *args):
+        self.stopEditing()
+        return False
+# End of editor class
+
+
+# Start of domain class
+class Domain(object):
+    def __init__(self, name, description, domainType, fieldType, codedValues):
+        self.name = name
+        self.description = description
+        self.domainType = domainType
+        self.type = fieldType
+        self.codedValues = codedValues
+        self.owner = ""
+        self.range = None
+        self.splitPolicy = "DefaultValue"
+        self.mergePolicy = "DefaultValue"
+# End of domain class
+
+
+# Start of list domains function
+@arcpy.countCalls("da.ListDomains")
+def ListDomains(in_workspace):
+    connection = arcpy.getConnection(str(in_workspace))
+    if (not connection):
+        raise IOError(str(in_workspace) + " does not exist")
+    return [Domain(row[0], row[1], row[2], row[3], json.loads(row[4])) for row in connection.execute("SELECT Name, Description, DomainType, FieldType, CodedValues FROM Domains ORDER BY Name").fetchall()]
+# End of list domains function
+
+
+# Start of list subtypes function
+@arcpy.countCalls("da.ListSubtypes")
+def ListSubtypes(table):
+    return {}
+# End of list subtypes function
@@ -0,0 +1,537 @@
+#-------------------------------------------------------------
+# Name:       Run Benchmarks
+# Purpose:    Times the toolkit scripts against synthetic geodatabases using the fake arcpy package, so
+#             performance changes can be measured without ArcGIS installed. Reports the time taken, arcpy
+#             calls made and peak memory for each benchmark. The output of each run is checked against the
+#             record counts and a checksum of the records expected, and the benchmark fails if they don't match. Scripts that can't be imported with the version
+#             of Python being used are skipped. Results can be saved to a JSON file and compared to a
+#             baseline from an earlier run, which returns an exit code of 1 if there is a regression.
+#             e.g. python RunBenchmarks.py --records=5000 --latency=0.005 --output=Results.json
+#             Options:
+#             --records=1000 - Number of records in each synthetic dataset
+#             --datasets=4 - Number of feature classes in each feature dataset and in the geodatabase
+#             --latency=0 - Seconds added to each arcpy call e.g. to model an enterprise geodatabase
+#             --service-latency=0.05 - Seconds added to each request to the stub map service e.g. to model the network
+#             --service-errors=0 - Fraction of requests to the stub map service that fail with a 503 e.g. to test retries
+#             --repeat=1 - Number of times to run each benchmark, the fastest time is reported
+#             --only=GeodatabaseReplication - Only run the benchmarks whose name starts with this
+#             --output=Results.json - Save the results to a JSON file
+#             --baseline=Baseline.json - Compare the results to an earlier run
+#             --tolerance=0.2 - Fraction slower than the baseline that is reported as a regression
+# Author:     Shaun Weston (shaun_weston@eagle.co.nz)
+# Date Created:    18/10/2026
+# Last Updated:    18/10/2026
+# Copyright:   (c) Eagle Technology
+# ArcGIS Version:   None - Uses the fake arcpy package
+# Python Version:   2.7/3.x
+#--------------------------------
+
+# Import main modules
+import os
+import sys
+import json
+import time
+import hashlib
+import shutil
+import tempfile
+import importlib
+
+# Use the fake arcpy package and the toolkit scripts
+benchmarkFolder = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarkFolder))
+sys.path.insert(0, os.path.join(benchmarkFolder, "FakeArcPy"))
+import arcpy
+import SyntheticWorkspace
+import StubMapService
+import HTTPClient
+# Python version check
+try:
+    # Python 3.4+
+    import tracemalloc
+except ImportError:
+    # Python 2.x
+    tracemalloc = None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Set global variables
+recordCount = 1000 # Number of records in each synthetic dataset
+datasetCount = 4 # Number of feature classes in each feature dataset and in the geodatabase
+callLatency = 0 # Seconds added to each arcpy call
+serviceLatency = 0.05 # Seconds added to each request to the stub map service
+serviceErrorRate = 0 # Fraction of requests to the stub map service that fail with a 503
+repeatCount = 1 # Number of times to run each benchmark
+onlyBenchmark = "" # Only run the benchmarks whose name starts with this
+outputFile = "" # JSON file to save the results to
+baselineFile = "" # JSON file with the results of an earlier run to compare to
+regressionTolerance = 0.2 # Fraction slower than the baseline that is reported as a regression
+
+
+# Start of main function
+def mainFunction():
+    results = {}
+    # For each benchmark
+    for benchmarkName,moduleName,setupFunction in getBenchmarks():
+        if (onlyBenchmark) and (not benchmarkName.lower().startswith(onlyBenchmark.lower())):
+            continue
+        # Import the script - Skip it if it can't be imported with this version of Python
+        try:
+            module = importlib.import_module(moduleName)
+        except Exception as e:
+            results[benchmarkName] = {"status": "Skipped - " + moduleName + " could not be imported (" + type(e).__name__ + ": " + str(e) + ")"}
+            printResult(benchmarkName,results[benchmarkName])
+            continue
+
+        # FUNCTION - Run the benchmark
+        results[benchmarkName] = runBenchmark(module,setupFunction)
+        printResult(benchmarkName,results[benchmarkName])
+
+    # If saving the results
+    if (outputFile):
+        with open(outputFile, "w") as resultsFile:
+            json.dump({"python": sys.version.split(" ")[0], "records": recordCount, "datasets": datasetCount, "latency": callLatency, "serviceLatency": serviceLatency, "results": results}, resultsFile, indent=2, sort_keys=True)
+        print("Results saved to " + outputFile)
+    # If comparing to a baseline
+    if (baselineFile):
+        # FUNCTION - Compare the results to the baseline
+        if (compareBaseline(results)):
+            sys.exit(1)
+# End of main function
+
+
+# Start of run benchmark function
+def runBenchmark(module,setupFunction):
+    result = None
+    for repeat in range(int(repeatCount)):
+        workFolder = tempfile.mkdtemp(prefix="Benchmark")
+        runFunction = None
+        try:
+            # Setup the synthetic data - Not included in the timings
+            arcpy.reset()
+            arcpy.fakeCallLatency = 0
+            runFunction = setupFunction(workFolder,module)
+            if ("WorkspaceCatalog" in sys.modules):
+                sys.modules["WorkspaceCatalog"].clear()
+            arcpy.resetCallCounts()
+
+            # Run the benchmark
+            if (tracemalloc):
+                tracemalloc.start()
+            arcpy.fakeCallLatency = float(callLatency)
+            startTime = time.time()
+            runFunction()
+            seconds = time.time() - startTime
+            arcpy.fakeCallLatency = 0
+            peakMemory = None
+            if (tracemalloc):
+                peakMemory = tracemalloc.get_traced_memory()[1] / 1048576.0
+                tracemalloc.stop()
+            # Python 2.x - Peak memory of the whole process
+            elif (resource):
+                peakMemory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+            callCounts = dict(arcpy.callCounts)
+
+            # Scripts catch their own errors and add them as messages
+            errors = [message.strip() or "Error" for level, message in arcpy.messages if (level == 2)]
+            # Check the output is what was expected - Not included in the timings
+            if (not errors) and (hasattr(runFunction, "check")):
+                errors = runFunction.check()
+            repeatResult = {"status": "Failed - " + errors[0].splitlines()[0] if errors else "OK",
+                            "seconds": round(seconds, 3),
+                            "arcpyCalls": sum(callCounts.values()),
+                            "peakMemoryMB": round(peakMemory, 1) if (peakMemory is not None) else None,
+                            "callCounts": callCounts}
+            if (result is None) or (repeatResult["seconds"] < result["seconds"]):
+                result = repeatResult
+        # If python error
+        except Exception as e:
+            if (tracemalloc) and (tracemalloc.is_tracing()):
+                tracemalloc.stop()
+            result = {"status": "Failed - " + type(e).__name__ + ": " + str(e)}
+            break
+        finally:
+            # Stop anything the benchmark started e.g. the stub map service
+            if (runFunction) and (hasattr(runFunction, "cleanup")):
+                runFunction.cleanup()
+            arcpy.reset()
+            shutil.rmtree(workFolder, True)
+    return result
+# End of run benchmark function
+
+
+# Start of print result function
+def printResult(benchmarkName,result):
+    if ("seconds" not in result):
+        print(benchmarkName.ljust(50) + " " + result["status"])
+        return
+    peakMemory = "n/a" if (result["peakMemoryMB"] is None) else str(result["peakMemoryMB"]) + " MB"
+    print(benchmarkName.ljust(50) + " " + (str(result["seconds"]) + "s").rjust(10) + " " + (str(result["arcpyCalls"]) + " calls").rjust(14) + " " + peakMemory.rjust(10) + "  " + result["status"])
+    # Show the arcpy calls made most
+    topCalls = sorted(result["callCounts"].items(), key=lambda callCount: callCount[1], reverse=True)[:5]
+    print("    " + ", ".join([name + " " + str(count) for name, count in topCalls]))
+# End of print result function
+
+
+# Start of compare baseline function
+def compareBaseline(results):
+    with open(baselineFile, "r") as resultsFile:
+        baselineResults = json.load(resultsFile)["results"]
+    regressions = []
+    for benchmarkName in sorted(results):
+        result = results[benchmarkName]
+        baselineResult = baselineResults.get(benchmarkName, {})
+        if ("seconds" not in result) or ("seconds" not in baselineResult):
+            continue
+        if (result["seconds"] > baselineResult["seconds"] * (1 + float(regressionTolerance))):
+            regressions.append(benchmarkName + " took " + str(result["seconds"]) + "s, baseline was " + str(baselineResult["seconds"]) + "s")
+        if (result["arcpyCalls"] > baselineResult["arcpyCalls"]):
+            regressions.append(benchmarkName + " made " + str(result["arcpyCalls"]) + " arcpy calls, baseline was " + str(baselineResult["arcpyCalls"]))
+    for regression in regressions:
+        print("Regression - " + regression)
+    if not regressions:
+        print("No regressions compared to " + baselineFile)
+    return len(regressions) > 0
+# End of compare baseline function
+
+
+# Start of get benchmarks function
+def getBenchmarks():
+    # Name, script and function to setup the data, which returns the function to time
+    return [("GeodatabaseReplication.copyDatasets (New)", "GeodatabaseReplication", setupReplicationNew),
+            ("GeodatabaseReplication.copyDatasets (Existing)", "GeodatabaseReplication", setupReplicationExisting),
+            ("GeodatabaseReplication.copyDatasets (Incremental)", "GeodatabaseReplication", setupReplicationIncremental),
+            ("GeodatabaseReplication.copyDatasets (Unchanged)", "GeodatabaseReplication", setupReplicationUnchanged),
+            ("LICDataWarehouseSync.mainFunction", "LICDataWarehouseSync", setupDataWarehouseSync),
+            ("ConvertToCSV.mainFunction", "ConvertToCSV", setupConvertToCSV),
+            ("DomainsRemoveDuplicates.mainFunction", "DomainsRemoveDuplicates", setupDomainsRemoveDuplicates),
+            ("MapServiceDownload.mainFunction (New)", "MapServiceDownload", setupMapServiceDownloadNew),
+            ("MapServiceDownload.mainFunction (Incremental)", "MapServiceDownload", setupMapServiceDownloadIncremental),
+            ("MapServiceDownload.mainFunction (Service)", "MapServiceDownload", setupMapServiceDownloadService),
+            ("MapServiceDownload.mainFunction (Tiles)", "MapServiceDownload", setupMapServiceDownloadTiles),
+            ("DataUpdateFromZip.mainFunction (New)", "DataUpdateFromZip", setupDataUpdateFromZipNew),
+            ("DataUpdateFromZip.mainFunction (Existing)", "DataUpdateFromZip", setupDataUpdateFromZipExisting),
+            ("DataUpdateFromZip.mainFunction (Watch)", "DataUpdateFromZip", setupDataUpdateFromZipWatch),
+            ("DataUpdateFromZip.mainFunction (Incremental)", "DataUpdateFromZip", setupDataUpdateFromZipIncremental),
+            ("DataUpdateFromZip.mainFunction (Duplicate Keys)", "DataUpdateFromZip", setupDataUpdateFromZipDuplicateKeys)]
+# End of get benchmarks function
+
+
+# Start of get dataset paths function
+def getDatasetPaths(geodatabase):
+    # Path to each feature class and table in the geodatabase by its name, including those in feature datasets
+    arcpy.env.workspace = geodatabase
+    datasetPaths = {}
+    for featureDataset in [""] + (arcpy.ListDatasets("", "Feature") or []):
+        for featureClass in (arcpy.ListFeatureClasses("", "", featureDataset) or []):
+            datasetPaths[os.path.basename(featureClass)] = os.path.join(geodatabase, featureDataset, os.path.basename(featureClass))
+    for table in (arcpy.ListTables() or []):
+        datasetPaths[table] = os.path.join(geodatabase, table)
+    return datasetPaths
+# End of get dataset paths function
+
+
+# Start of get dataset checksum function
+def getDatasetChecksum(datasetPath,fieldNames):
+    # Record count and a checksum of the records in any order
+    rows = []
+    with arcpy.da.SearchCursor(datasetPath, fieldNames) as searchCursor:
+        for row in searchCursor:
+            rows.append("|".join([repr(value) if isinstance(value, float) else str(value) for value in row]))
+    rows.sort()
+    return len(rows),hashlib.md5("\n".join(rows).encode("utf-8")).hexdigest()
+# End of get dataset checksum function
+
+
+# Start of compare datasets function
+def compareDatasets(expectedGeodatabase,actualGeodatabase,includeGlobalIDs):
+    # Problems found comparing the record count and checksum of each dataset to the expected dataset
+    problems = []
+    actualPaths = getDatasetPaths(actualGeodatabase)
+    for datasetName,expectedPath in sorted(getDatasetPaths(expectedGeodatabase).items()):
+        if (datasetName not in actualPaths):
+            problems.append(datasetName + " was not created")
+            continue
+        # Compare the fields in both datasets - Object IDs are always new and global IDs are new unless preserved
+        actualFields = dict([(field.name.lower(), field) for field in arcpy.ListFields(actualPaths[datasetName])])
+        fieldNames = []
+        for field in arcpy.ListFields(expectedPath):
+            if (field.name.lower() not in actualFields) or (field.type == "OID") or ((field.type == "GlobalID") and (not includeGlobalIDs)):
+                continue
+            fieldNames.append("SHAPE@WKT" if (field.type == "Geometry") else field.name)
+        expectedCount,expectedChecksum = getDatasetChecksum(expectedPath,fieldNames)
+        actualCount,actualChecksum = getDatasetChecksum(actualPaths[datasetName],fieldNames)
+        if (actualCount != expectedCount):
+            problems.append(datasetName + " has " + str(actualCount) + " records, expected " + str(expectedCount))
+        elif (actualChecksum != expectedChecksum):
+            problems.append(datasetName + " records don't match the expected records")
+    return problems
+# End of compare datasets function
+
+
+# Start of compare service features function
+def compareServiceFeatures(server,datasetPaths):
+    # Problems found comparing the record count and checksum of each downloaded dataset to the features in the stub map service
+    problems = []
+    fieldNames = ["Name","Category","Value"]
+    expectedRows = sorted(["|".join([repr(feature["attributes"][fieldName]) if isinstance(feature["attributes"][fieldName], float) else str(feature["attributes"][fieldName]) for fieldName in fieldNames]) for feature in server.features])
+    expectedChecksum = hashlib.md5("\n".join(expectedRows).encode("utf-8")).hexdigest()
+    for datasetPath in datasetPaths:
+        if not arcpy.Exists(datasetPath):
+            problems.append(os.path.basename(datasetPath) + " was not created")
+            continue
+        actualCount,actualChecksum = getDatasetChecksum(datasetPath,fieldNames)
+        if (actualCount != len(expectedRows)):
+            problems.append(os.path.basename(datasetPath) + " has " + str(actualCount) + " records, expected " + str(len(expectedRows)))
+        elif (actualChecksum != expectedChecksum):
+            problems.append(os.path.basename(datasetPath) + " records don't match the features in the map service")
+    return problems
+# End of compare service features function
+
+
+# Start of setup replication function
+def setupReplication(workFolder,module,updateMode,firstRunMode,changeRecords):
+    sourceGeodatabase,duplicateDomains = SyntheticWorkspace.createWorkspace(workFolder, "Source", featureClassCount=int(datasetCount), recordCount=int(recordCount))
+    destinationGeodatabase = SyntheticWorkspace.createGeodatabase(workFolder, "Destination")
+    configFile = SyntheticWorkspace.writeReplicationConfiguration(os.path.join(workFolder, "GeodatabaseReplication.csv"), sourceGeodatabase)
+    module.enableLogging = "false"
+    module.stateDatabase = os.path.join(workFolder, "GeodatabaseReplication.sqlite")
+    module.runReportFile = ""
+    module.workerProcesses = 1
+
+    # Copy the data over first if replicating into existing datasets
+    if (firstRunMode):
+        replicationPlan = module.getReplicationPlan(sourceGeodatabase,destinationGeodatabase,"All",configFile,[""],"false")
+        module.copyDatasets(replicationPlan,destinationGeodatabase,firstRunMode,module.startJournalRun())
+    # Change some of the records in the feature classes not in a feature dataset
+    if (changeRecords):
+        arcpy.env.workspace = sourceGeodatabase
+        for featureClass in arcpy.ListFeatureClasses():
+            with arcpy.da.UpdateCursor(os.path.join(sourceGeodatabase, featureClass), ["Value"], "Count < " + str(int(int(recordCount) * 0.05))) as updateCursor:
+                for row in updateCursor:
+                    updateCursor.updateRow([row[0] + 1])
+
+    def run():
+        replicationPlan = module.getReplicationPlan(sourceGeodatabase,destinationGeodatabase,"All",configFile,[""],"false")
+        module.copyDatasets(replicationPlan,destinationGeodatabase,updateMode,module.startJournalRun())
+    def check():
+        # Every dataset is replicated with its global IDs, which are the key
+        return compareDatasets(sourceGeodatabase,destinationGeodatabase,True)
+    run.check = check
+    return run
+# End of setup replication function
+
+
+# Start of setup replication functions
+def setupReplicationNew(workFolder,module):
+    return setupReplication(workFolder,module,"New","",False)
+
+def setupReplicationExisting(workFolder,module):
+    return setupReplication(workFolder,module,"Existing","New",True)
+
+def setupReplicationIncremental(workFolder,module):
+    return setupReplication(workFolder,module,"Incremental","New",True)
+
+def setupReplicationUnchanged(workFolder,module):
+    # Nothing has changed since the first run so every dataset is skipped
+    return setupReplication(workFolder,module,"New","New",False)
+# End of setup replication functions
+
+
+# Start of setup data warehouse sync function
+def setupDataWarehouseSync(workFolder,module):
+    geodatabase,datasets = SyntheticWorkspace.createDataWarehouseSyncWorkspace(workFolder, "DataWarehouse", propertyCount=int(recordCount))
+    module.enableLogging = "false"
+    module.sendErrorEmail = "false"
+    module.gisReportDict = {}
+    module.gisReportCount = 0
+
+    def run():
+        module.mainFunction(datasets["Property"],datasets["Shed"],datasets["Entrance"],datasets["PropertyEntranceRelate"],datasets["PropertyShedRelate"],datasets["ShedEntranceRelate"],datasets["DWProperty"],datasets["DWShed"],datasets["DataSyncReport"],datasets["DWLoadStatus"])
+    return run
+# End of setup data warehouse sync function
+
+
+# Start of setup convert to CSV function
+def setupConvertToCSV(workFolder,module):
+    geodatabase,duplicateDomains = SyntheticWorkspace.createWorkspace(workFolder, "Data", featureDatasetCount=0, featureClassCount=int(datasetCount), tableCount=2, recordCount=int(recordCount))
+    arcpy.env.workspace = geodatabase
+    featureClasses = ";".join([os.path.join(geodatabase, featureClass) for featureClass in arcpy.ListFeatureClasses()])
+    tables = ";".join([os.path.join(geodatabase, table) for table in arcpy.ListTables()])
+    outputFolder = os.path.join(workFolder, "Output")
+    os.makedirs(outputFolder)
+    module.enableLogging = "false"
+    module.sendErrorEmail = "false"
+
+    def run():
+        module.mainFunction(featureClasses,tables,",","true","true",",",outputFolder)
+    return run
+# End of setup convert to CSV function
+
+
+# Start of setup domains remove duplicates function
+def setupDomainsRemoveDuplicates(workFolder,module):
+    geodatabase,duplicateDomains = SyntheticWorkspace.createWorkspace(workFolder, "Data", featureClassCount=int(datasetCount), recordCount=10)
+    configFile = SyntheticWorkspace.writeDomainsConfiguration(os.path.join(workFolder, "DomainsRemoveDuplicates.csv"), duplicateDomains)
+    module.enableLogging = "false"
+    module.sendErrorEmail = "false"
+
+    def run():
+        module.mainFunction(geodatabase,configFile)
+    return run
+# End of setup domains remove duplicates function
+
+
+# Start of setup map service download function
+def setupMapServiceDownload(workFolder,module,updateMode,firstRunMode,layerCount=1,supportsObjectIds=True):
+    # Ten pages of features from each layer in the stub map service
+    server,layerURL = StubMapService.startService(recordCount=int(recordCount) * 10, maxRecordCount=int(recordCount), supportsPagination=supportsObjectIds, latency=float(serviceLatency), errorRate=float(serviceErrorRate), layerCount=layerCount)
+    # Service without pagination or object ID queries is downloaded in tiles
+    server.supportsObjectIds = supportsObjectIds
+    # Retry failed requests to the stub map service without waiting long
+    HTTPClient.retryBackoff = 0.01
+    geodatabase = SyntheticWorkspace.createGeodatabase(workFolder, "Data")
+    module.enableLogging = "false"
+    module.sendErrorEmail = "false"
+    module.pageCacheFolder = os.path.join(workFolder, "PageCache")
+    module.watermarkFile = os.path.join(workFolder, "MapServiceDownloadWatermarks.json")
+
+    # Download the layer first and then edit and delete some of the features
+    if (firstRunMode):
+        module.mainFunction(layerURL,os.path.join(geodatabase, "Download"),firstRunMode)
+        server.editFeatures(int(int(recordCount) * 0.5), int(int(recordCount) * 0.1))
+
+    def run():
+        # Download all the layers in the service into the geodatabase
+        if (layerCount > 1):
+            module.mainFunction(layerURL.rsplit("/", 1)[0],geodatabase,updateMode)
+        else:
+            module.mainFunction(layerURL,os.path.join(geodatabase, "Download"),updateMode)
+    def check():
+        # Every layer is downloaded with the features in the stub map service, including the edits
+        if (layerCount > 1):
+            return compareServiceFeatures(server,sorted(getDatasetPaths(geodatabase).values()))
+        return compareServiceFeatures(server,[os.path.join(geodatabase, "Download")])
+    def cleanup():
+        # Close the connections kept open to the stub map service
+        HTTPClient.reset()
+        StubMapService.stopService(server)
+    run.check = check
+    run.cleanup = cleanup
+    return run
+# End of setup map service download function
+
+
+# Start of setup map service download functions
+def setupMapServiceDownloadNew(workFolder,module):
+    return setupMapServiceDownload(workFolder,module,"New","")
+
+def setupMapServiceDownloadIncremental(workFolder,module):
+    return setupMapServiceDownload(workFolder,module,"Incremental","Incremental")
+
+def setupMapServiceDownloadService(workFolder,module):
+    return setupMapServiceDownload(workFolder,module,"New","",int(datasetCount))
+
+def setupMapServiceDownloadTiles(workFolder,module):
+    return setupMapServiceDownload(workFolder,module,"New","",1,False)
+# End of setup map service download functions
+
+
+# Start of setup data update from zip function
+def setupDataUpdateFromZip(workFolder,module,updateMode,zipCount=1,duplicateKeys=False):
+    # Zip files of shapefiles and a geodatabase in the update folder
+    updateFolder = os.path.join(workFolder, "Updates")
+    os.makedirs(updateFolder)
+    for zipNumber in range(zipCount):
+        SyntheticWorkspace.createUpdateZip(updateFolder, "Update" if (zipCount == 1) else "Update" + str(zipNumber + 1), int(datasetCount), int(recordCount), zipNumber + 1)
+    geodatabase = SyntheticWorkspace.createGeodatabase(workFolder, "Data")
+    expectedGeodatabase = SyntheticWorkspace.createGeodatabase(workFolder, "Expected")
+    module.enableLogging = "false"
+    module.sendErrorEmail = "false"
+    module.watchMode = "false"
+    module.processedManifestFile = os.path.join(workFolder, "DataUpdateFromZipProcessed.json")
+    module.keyFields = "Name"
+
+    def check():
+        # The datasets have the records in the last zip file applied - Global IDs are new
+        return compareDatasets(expectedGeodatabase,geodatabase,False)
+
+    # Apply all the zip files in the update folder in order and stop
+    if (zipCount > 1):
+        module.updateFromZip(os.path.join(updateFolder, "Update" + str(zipCount) + ".zip"),"New",expectedGeodatabase)
+        module.watchMode = "once"
+        def runWatch():
+            module.mainFunction(updateFolder,"",updateMode,geodatabase)
+        runWatch.check = check
+        return runWatch
+
+    # Load the zip file first so the datasets exist to update
+    updateFile = "Update.zip"
+    if (updateMode in ["Existing","Incremental"]):
+        module.mainFunction(updateFolder,"Update.zip","New",geodatabase)
+    # Apply a zip file with the same records as the first, with some of the values changed
+    if (updateMode == "Incremental"):
+        SyntheticWorkspace.createUpdateZip(updateFolder, "Changes", int(datasetCount), int(recordCount), 1, int(int(recordCount) * 0.05), 10 if (duplicateKeys) else 0)
+        updateFile = "Changes.zip"
+    # Match the records on a key field with null and duplicate values in the shapefiles
+    if (duplicateKeys):
+        module.keyFields = "Count"
+
+    module.updateFromZip(os.path.join(updateFolder, updateFile),"New",expectedGeodatabase)
+
+    def run():
+        module.mainFunction(updateFolder,updateFile,updateMode,geodatabase)
+        # Apply the same zip file again, which shouldn't change the number of records
+        if (duplicateKeys):
+            module.mainFunction(updateFolder,updateFile,updateMode,geodatabase)
+    run.check = check
+    return run
+# End of setup data update from zip function
+
+
+# Start of setup data update from zip functions
+def setupDataUpdateFromZipNew(workFolder,module):
+    return setupDataUpdateFromZip(workFolder,module,"New")
+
+def setupDataUpdateFromZipExisting(workFolder,module):
+    return setupDataUpdateFromZip(workFolder,module,"Existing")
+
+def setupDataUpdateFromZipWatch(workFolder,module):
+    return setupDataUpdateFromZip(workFolder,module,"Existing",3)
+
+def setupDataUpdateFromZipIncremental(workFolder,module):
+    return setupDataUpdateFromZip(workFolder,module,"Incremental")
+
+def setupDataUpdateFromZipDuplicateKeys(workFolder,module):
+    return setupDataUpdateFromZip(workFolder,module,"Incremental",1,True)
+# End of setup data update from zip functions
+
+
+# This test allows the script to be used from the operating
+# system command prompt (stand-alone) or in a Python IDE
+if __name__ == '__main__':
+    # Get the options from the arguments e.g. --records=1000
+    for argument in sys.argv[1:]:
+        if (argument.lower().startswith("--records=")):
+            recordCount = int(argument.split("=")[1])
+        elif (argument.lower().startswith("--datasets=")):
+            datasetCount = int(argument.split("=")[1])
+        elif (argument.lower().startswith("--latency=")):
+            callLatency = float(argument.split("=")[1])
+        elif (argument.lower().startswith("--service-latency=")):
+            serviceLatency = float(argument.split("=")[1])
+        elif (argument.lower().startswith("--service-errors=")):
+            serviceErrorRate = float(argument.split("=")[1])
+        elif (argument.lower().startswith("--repeat=")):
+            repeatCount = int(argument.split("=")[1])
+        elif (argument.lower().startswith("--only=")):
+            onlyBenchmark = argument.split("=")[1]
+        elif (argument.lower().startswith("--output=")):
+            outputFile = argument.split("=")[1]
+        elif (argument.lower().startswith("--baseline=")):
+            baselineFile = argument.split("=")[1]
+        elif (argument.lower().startswith("--tolerance=")):
+            regressionTolerance = float(argument.split("=")[1])
+    mainFunction()
@@ -0,0 +1,267 @@
+#-------------------------------------------------------------
+# Name:       Stub Map Service
+# Purpose:    Local stand in for an ArcGIS Server map service layer, so the scripts that download from map
+#             services can be run and timed without a server. Serves the layer information and answers
+#             queries for object IDs, counts and pages of features in Esri JSON, with a delay added to each
+#             request to model the network. Features can be edited and deleted between runs to test incremental
+#             downloads. Connections are kept alive, responses are gzipped when asked for and a share of requests
+#             can be failed with a 503 response to test retries. Queries only return the fields asked for and
+#             round the coordinates to the geometry precision asked for. The service can have more than one
+#             layer to test downloading a whole service. Queries can be limited to an envelope and object ID
+#             queries can be turned off to test downloading in tiles.
+# Author:     Shaun Weston (shaun_weston@eagle.co.nz)
+# Date Created:    18/10/2026
+# Last Updated:    18/10/2026
+# Copyright:   (c) Eagle Technology
+# ArcGIS Version:   None - Stand in for ArcGIS Server
+# Python Version:   2.7/3.x
+#--------------------------------
+
+# Import main modules
+import re
+import json
+import gzip
+import time
+import random
+import calendar
+import datetime
+import threading
+import collections
+# Python version check
+try:
+    # Python 2.x
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qsl
+    from StringIO import StringIO as BytesIO
+except ImportError:
+    # Python 3.x
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qsl
+    from io import BytesIO
+
+# Set global variables
+servicePath = "/arcgis/rest/services/Benchmark/MapServer"
+layerPath = servicePath + "/0"
+
+
+# Start of create features function
+def createFeatures(recordCount,seed=1):
+    # Point features with an object ID, text, number and date fields
+    randomGenerator = random.Random(seed)
+    features = []
+    for recordNumber in range(recordCount):
+        features.append({"attributes": {"OBJECTID": recordNumber + 1,
+                                        "Name": "Feature " + str(recordNumber),
+                                        "Category": randomGenerator.choice(["A","B","C","D"]),
+                                        "Value": randomGenerator.random() * 1000,
+                                        "EditDate": 1577836800000 + (recordNumber * 60000)},
+                         "geometry": {"x": 1750000 + randomGenerator.random() * 10000, "y": 5900000 + randomGenerator.random() * 10000}})
+    return features
+# End of create features function
+
+
+# Start of stub service class
+class StubService(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, features, maxRecordCount, supportsPagination, latency, errorRate, layerCount):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), StubRequestHandler)
+        self.features = features
+        self.layerCount = layerCount
+        self.maxRecordCount = maxRecordCount
+        self.supportsPagination = supportsPagination
+        self.supportsObjectIds = True
+        self.latency = latency
+        self.errorRate = errorRate
+        self.randomGenerator = random.Random(1)
+        self.requestCount = 0
+        self.errorCount = 0
+        self.connectionCount = 0
+        self.bytesSent = 0
+        self.lock = threading.Lock()
+
+    def serviceInformation(self):
+        # Layers all serve the same features, with a group layer holding them
+        layers = [{"id": layerID, "name": self.layerName(layerID), "type": "Feature Layer", "parentLayerId": self.layerCount, "subLayerIds": None} for layerID in range(self.layerCount)]
+        layers.append({"id": self.layerCount, "name": "Benchmark Group", "type": "Group Layer", "parentLayerId": -1, "subLayerIds": list(range(self.layerCount))})
+        return {"currentVersion": 10.51, "layers": layers, "tables": []}
+
+    def layerName(self, layerID):
+        if (layerID == 0):
+            return "Benchmark"
+        return "Benchmark " + str(layerID)
+
+    def layerInformation(self, layerID=0):
+        return {"name": self.layerName(layerID),
+                "type": "Feature Layer",
+                "geometryType": "esriGeometryPoint",
+                "objectIdField": "OBJECTID",
+                "maxRecordCount": self.maxRecordCount,
+                "advancedQueryCapabilities": {"supportsPagination": self.supportsPagination},
+                "editFieldsInfo": {"editDateField": "EditDate"},
+                "extent": {"xmin": 1750000, "ymin": 5900000, "xmax": 1760000, "ymax": 5910000, "spatialReference": {"wkid": 2193, "latestWkid": 2193}},
+                "fields": self.fields()}
+
+    def fields(self):
+        return [{"name": "OBJECTID", "type": "esriFieldTypeOID", "alias": "OBJECTID"},
+                {"name": "Name", "type": "esriFieldTypeString", "alias": "Name", "length": 50},
+                {"name": "Category", "type": "esriFieldTypeString", "alias": "Category", "length": 10},
+                {"name": "Value", "type": "esriFieldTypeDouble", "alias": "Value"},
+                {"name": "EditDate", "type": "esriFieldTypeDate", "alias": "Edit Date", "length": 8}]
+
+    def editFeatures(self, editCount, deleteCount):
+        # Edit the first features and delete the last features
+        editDate = int(calendar.timegm(datetime.datetime.utcnow().timetuple()) * 1000)
+        with self.lock:
+            for feature in self.features[:editCount]:
+                feature["attributes"]["Value"] = feature["attributes"]["Value"] + 1
+                feature["attributes"]["EditDate"] = editDate
+            if (deleteCount):
+                self.features = self.features[:-deleteCount]
+
+    def filterFeatures(self, where):
+        # Where clauses joined by AND comparing a field to a number or a timestamp e.g. EditDate >= TIMESTAMP '2020-01-01 00:00:00'
+        features = self.features
+        if (where.replace(" ", "") in ["", "1=1"]):
+            return features
+        operators = {">=": lambda a, b: a >= b, "<=": lambda a, b: a <= b, ">": lambda a, b: a > b, "<": lambda a, b: a < b, "=": lambda a, b: a == b}
+        conditions = re.findall(r"(\w+)\s*(>=|<=|>|<|=)\s*(TIMESTAMP\s*'[^']*'|-?\d+(?:\.\d+)?)", where, re.IGNORECASE)
+        if (not conditions) or (re.sub(r"(\w+)\s*(>=|<=|>|<|=)\s*(TIMESTAMP\s*'[^']*'|-?\d+(?:\.\d+)?)|\(|\)|\s+AND\s+|\s", "", where, flags=re.IGNORECASE)):
+            return None
+        for fieldName, operator, value in conditions:
+            if (value.upper().startswith("TIMESTAMP")):
+                value = calendar.timegm(datetime.datetime.strptime(value.split("'")[1], "%Y-%m-%d %H:%M:%S").timetuple()) * 1000
+            else:
+                value = float(value)
+            features = [feature for feature in features if (feature["attributes"].get(fieldName) is not None) and operators[operator](feature["attributes"][fieldName], value)]
+        return features
+
+    def query(self, parameters):
+        # Object IDs, count or a page of features for the where clause
+        features = self.filterFeatures(parameters.get("where", "1=1"))
+        if (features is None):
+            return {"error": {"code": 400, "message": "Unable to complete operation.", "details": ["Unsupported where clause"]}}
+        # Points in or on the edge of the envelope
+        if (parameters.get("geometry")):
+            xmin,ymin,xmax,ymax = [float(coordinate) for coordinate in parameters["geometry"].split(",")]
+            features = [feature for feature in features if (xmin <= feature["geometry"]["x"] <= xmax) and (ymin <= feature["geometry"]["y"] <= ymax)]
+        if (parameters.get("returnIdsOnly") == "true"):
+            if (not self.supportsObjectIds):
+                return {"error": {"code": 400, "message": "Unable to complete operation.", "details": ["returnIdsOnly is not supported"]}}
+            return {"objectIdFieldName": "OBJECTID", "objectIds": [feature["attributes"]["OBJECTID"] for feature in features]}
+        if (parameters.get("returnCountOnly") == "true"):
+            return {"count": len(features)}
+        if ("resultOffset" in parameters):
+            if (not self.supportsPagination):
+                return {"error": {"code": 400, "message": "Pagination is not supported."}}
+            resultOffset = int(parameters["resultOffset"])
+            features = features[resultOffset:resultOffset + int(parameters.get("resultRecordCount", self.maxRecordCount))]
+        exceededTransferLimit = len(features) > self.maxRecordCount
+        features = features[:self.maxRecordCount]
+        # Only return the fields asked for and round the coordinates to the precision asked for
+        fields = self.fields()
+        if (parameters.get("outFields", "*") != "*"):
+            fieldNames = [fieldName.strip().lower() for fieldName in parameters["outFields"].split(",")]
+            fields = [field for field in fields if field["name"].lower() in fieldNames]
+        geometryPrecision = parameters.get("geometryPrecision")
+        pageFeatures = []
+        for feature in features:
+            pageFeature = {"attributes": dict([(field["name"], feature["attributes"].get(field["name"])) for field in fields])}
+            if (parameters.get("returnGeometry", "true") == "true"):
+                pageFeature["geometry"] = feature["geometry"]
+                if (geometryPrecision):
+                    pageFeature["geometry"] = dict([(key, round(value, int(geometryPrecision))) for key, value in feature["geometry"].items()])
+            pageFeatures.append(pageFeature)
+        # Features are always last in the response like a server
+        return collections.OrderedDict([("objectIdFieldName", "OBJECTID"),
+                                        ("geometryType", "esriGeometryPoint"),
+                                        ("spatialReference", {"wkid": 2193, "latestWkid": 2193}),
+                                        ("fields", fields),
+                                        ("exceededTransferLimit", exceededTransferLimit),
+                                        ("features", pageFeatures)])
+# End of stub service class
+
+
+# Start of stub request handler class
+class StubRequestHandler(BaseHTTPRequestHandler):
+    # Keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.lock:
+            self.server.connectionCount = self.server.connectionCount + 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parameters = dict(parse_qsl(url.query))
+        if (self.server.latency):
+            time.sleep(self.server.latency)
+        # Fail a share of the requests like a busy server
+        with self.server.lock:
+            failRequest = self.server.randomGenerator.random() < self.server.errorRate
+            if (failRequest):
+                self.server.errorCount = self.server.errorCount + 1
+        if (failRequest):
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        layerMatch = re.match("^" + servicePath + r"/(\d+)(/query)?$", url.path.rstrip("/"))
+        if (url.path.rstrip("/") == servicePath):
+            response = self.server.serviceInformation()
+        elif (layerMatch) and (int(layerMatch.group(1)) < self.server.layerCount) and (layerMatch.group(2)):
+            response = self.server.query(parameters)
+        elif (layerMatch) and (int(layerMatch.group(1)) < self.server.layerCount):
+            response = self.server.layerInformation(int(layerMatch.group(1)))
+        else:
+            self.send_error(404)
+            return
+        # Pretty print like a server does for f=pjson
+        if (parameters.get("f") == "pjson"):
+            data = json.dumps(response, indent=2).encode("utf-8")
+        else:
+            data = json.dumps(response, separators=(",", ":")).encode("utf-8")
+        # Compress the response if the client can read gzip
+        contentEncoding = None
+        if ("gzip" in (self.headers.get("Accept-Encoding") or "")):
+            buffer = BytesIO()
+            gzipFile = gzip.GzipFile(fileobj=buffer, mode="wb")
+            gzipFile.write(data)
+            gzipFile.close()
+            data = buffer.getvalue()
+            contentEncoding = "gzip"
+        with self.server.lock:
+            self.server.requestCount = self.server.requestCount + 1
+            self.server.bytesSent = self.server.bytesSent + len(data)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if (contentEncoding):
+            self.send_header("Content-Encoding", contentEncoding)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+# End of stub request handler class
+
+
+# Start of start service function
+def startService(recordCount=1000,maxRecordCount=1000,supportsPagination=True,latency=0,errorRate=0,layerCount=1):
+    # Serve the layer on a free port in a background thread and return the server and the URL of the first layer
+    server = StubService(createFeatures(recordCount), maxRecordCount, supportsPagination, latency, errorRate, layerCount)
+    serverThread = threading.Thread(target=server.serve_forever)
+    serverThread.daemon = True
+    serverThread.start()
+    return server,"http://127.0.0.1:" + str(server.server_address[1]) + layerPath
+# End of start service function
+
+
+# Start of stop service function
+def stopService(server):
+    server.shutdown()
+    server.server_close()
+# End of stop service function
@@ -0,0 +1,276 @@
+#-------------------------------------------------------------
+# Name:       Synthetic Workspace
+# Purpose:    Creates geodatabases of a configurable size filled with made up records for the benchmarks.
+#             Only uses arcpy tools and cursors, so works with the fake arcpy package or with ArcGIS.
+#             Also creates zip files of shapefiles and a geodatabase like the updates loaded from a zip file.
+# Author:     Shaun Weston (shaun_weston@eagle.co.nz)
+# Date Created:    18/10/2026
+# Last Updated:    18/10/2026
+# Copyright:   (c) Eagle Technology
+# ArcGIS Version:   ArcGIS for Desktop 10.1+
+# Python Version:   2.7/3.x
+#--------------------------------
+
+# Import main modules
+import os
+import random
+import struct
+import zipfile
+import datetime
+import arcpy
+
+
+# Start of create geodatabase function
+def createGeodatabase(folder,name):
+    arcpy.CreateFileGDB_management(folder, name)
+    return os.path.join(folder, name + ".gdb")
+# End of create geodatabase function
+
+
+# Start of create domains function
+def createDomains(geodatabase,domainCount,duplicateDomainCount):
+    # Create the domains and a copy of some of them as duplicates
+    domainNames = []
+    duplicateDomains = []
+    for domainNumber in range(domainCount):
+        domainName = "Domain" + str(domainNumber + 1)
+        domainNames.append(domainName)
+        copies = [domainName]
+        if (domainNumber < duplicateDomainCount):
+            copies.append(domainName + "_1")
+            duplicateDomains.append([domainName, domainName + "_1"])
+        for copyName in copies:
+            arcpy.CreateDomain_management(geodatabase, copyName, copyName + " values", "TEXT", "CODED")
+            for code in ["A","B","C","D"]:
+                arcpy.AddCodedValueToDomain_management(geodatabase, copyName, code, "Value " + code)
+    return domainNames,duplicateDomains
+# End of create domains function
+
+
+# Start of create dataset function
+def createDataset(geodatabase,featureDataset,name,dataType,recordCount,domainName,randomGenerator):
+    datasetWorkspace = geodatabase
+    if (featureDataset):
+        datasetWorkspace = os.path.join(geodatabase, featureDataset)
+    if (dataType == "Table"):
+        arcpy.CreateTable_management(datasetWorkspace, name)
+    else:
+        arcpy.CreateFeatureclass_management(datasetWorkspace, name, "POINT")
+    datasetPath = os.path.join(datasetWorkspace, name)
+    arcpy.AddField_management(datasetPath, "Name", "TEXT", field_length=50)
+    arcpy.AddField_management(datasetPath, "Category", "TEXT", field_length=10, field_domain=domainName)
+    arcpy.AddField_management(datasetPath, "Value", "DOUBLE")
+    arcpy.AddField_management(datasetPath, "Count", "LONG")
+    arcpy.AddField_management(datasetPath, "EditDate", "DATE")
+    arcpy.AddGlobalIDs_management(datasetPath)
+    arcpy.EnableEditorTracking_management(datasetPath, last_edit_date_field="EditDate")
+
+    # Fill with records
+    fields = ["Name","Category","Value","Count","EditDate"]
+    if (dataType != "Table"):
+        fields.append("SHAPE@XY")
+    editDate = datetime.datetime(2020, 1, 1)
+    with arcpy.da.InsertCursor(datasetPath, fields) as insertCursor:
+        for recordNumber in range(recordCount):
+            row = [name + " " + str(recordNumber), randomGenerator.choice(["A","B","C","D"]), randomGenerator.random() * 1000, recordNumber, editDate + datetime.timedelta(minutes=recordNumber)]
+            if (dataType != "Table"):
+                row.append((1750000 + randomGenerator.random() * 10000, 5900000 + randomGenerator.random() * 10000))
+            insertCursor.insertRow(row)
+    return datasetPath
+# End of create dataset function
+
+
+# Start of create workspace function
+def createWorkspace(folder,name,featureDatasetCount=2,featureClassCount=4,tableCount=2,recordCount=1000,domainCount=10,duplicateDomainCount=5,seed=1):
+    # Creates a geodatabase with feature classes in feature datasets, feature classes and tables, using the domains
+    randomGenerator = random.Random(seed)
+    geodatabase = createGeodatabase(folder,name)
+    domainNames,duplicateDomains = createDomains(geodatabase,domainCount,duplicateDomainCount)
+    # Use the duplicate domains on some of the datasets
+    useDomains = domainNames + [duplicateDomain[1] for duplicateDomain in duplicateDomains]
+
+    datasetNumber = 0
+    for featureDatasetNumber in range(featureDatasetCount):
+        featureDataset = "FeatureDataset" + str(featureDatasetNumber + 1)
+        arcpy.CreateFeatureDataset_management(geodatabase, featureDataset)
+        for featureClassNumber in range(featureClassCount):
+            datasetNumber = datasetNumber + 1
+            createDataset(geodatabase, featureDataset, featureDataset + "_FeatureClass" + str(featureClassNumber + 1), "Feature Class", recordCount, useDomains[datasetNumber % len(useDomains)], randomGenerator)
+    for featureClassNumber in range(featureClassCount):
+        datasetNumber = datasetNumber + 1
+        createDataset(geodatabase, "", "FeatureClass" + str(featureClassNumber + 1), "Feature Class", recordCount, useDomains[datasetNumber % len(useDomains)], randomGenerator)
+    for tableNumber in range(tableCount):
+        datasetNumber = datasetNumber + 1
+        createDataset(geodatabase, "", "Table" + str(tableNumber + 1), "Table", recordCount, useDomains[datasetNumber % len(useDomains)], randomGenerator)
+
+    return geodatabase,duplicateDomains
+# End of create workspace function
+
+
+# Start of write domains configuration function
+def writeDomainsConfiguration(configFile,duplicateDomains):
+    # Configuration file for domains remove duplicates - Original domain, duplicate domain
+    with open(configFile, "w") as csvFile:
+        csvFile.write("Original,Duplicate\n")
+        for duplicateDomain in duplicateDomains:
+            csvFile.write(duplicateDomain[0] + "," + duplicateDomain[1] + "\n")
+    return configFile
+# End of write domains configuration function
+
+
+# Start of write replication configuration function
+def writeReplicationConfiguration(configFile,geodatabase):
+    # Configuration file for geodatabase replication - Copy every dataset to the same name
+    arcpy.env.workspace = geodatabase
+    sourceNames = []
+    for featureDataset in arcpy.ListDatasets("", "Feature"):
+        for featureClass in arcpy.ListFeatureClasses("", "", featureDataset):
+            sourceNames.append(featureDataset + "\\" + featureClass)
+    sourceNames = sourceNames + arcpy.ListFeatureClasses() + arcpy.ListTables()
+    with open(configFile, "w") as csvFile:
+        csvFile.write("source,destination,version,key\n")
+        for sourceName in sourceNames:
+            csvFile.write(sourceName + "," + sourceName + ",no,\n")
+    return configFile
+# End of write replication configuration function
+
+
+# Start of create data warehouse sync workspace function
+def createDataWarehouseSyncWorkspace(folder,name,propertyCount=1000,seed=1):
+    # Creates the GIS and data warehouse datasets for the LIC data warehouse sync
+    randomGenerator = random.Random(seed)
+    geodatabase = createGeodatabase(folder,name)
+    datasets = {}
+    schemas = [("Property", "POINT", [("Id","TEXT"),("RecordStatus","TEXT")], True),
+               ("Shed", "POINT", [("Id","TEXT"),("RecordStatus","TEXT"),("SpatialAccuracy","TEXT"),("CreatedUser","TEXT"),("CreatedDate","DATE"),("LastEditedUser","TEXT"),("LastEditedDate","DATE")], True),
+               ("Entrance", "POINT", [("RecordStatus","TEXT"),("SpatialAccuracy","TEXT"),("CreatedUser","TEXT"),("CreatedDate","DATE"),("LastEditedUser","TEXT"),("LastEditedDate","DATE"),("EntranceNumber","LONG")], True),
+               ("PropertyEntranceRelate", None, [("PropertyGlobalID","TEXT"),("EntranceGlobalID","TEXT")], False),
+               ("PropertyShedRelate", None, [("ShedID","TEXT"),("PropertyID","TEXT")], False),
+               ("ShedEntranceRelate", None, [("ShedGlobalID","TEXT"),("EntranceGlobalID","TEXT")], False),
+               ("DWProperty", None, [("property_bsns_partner_num","TEXT")], False),
+               ("DWShed", None, [("shed_bsns_partner_num","TEXT")], False),
+               ("DataSyncReport", None, [("ID","TEXT"),("Date","DATE"),("LogType","TEXT"),("Description","TEXT")], False),
+               ("DWLoadStatus", None, [("start_datetime","DATE"),("end_datetime","DATE"),("start_date","TEXT"),("end_date","TEXT")], False)]
+    for datasetName, geometryType, fields, globalIDs in schemas:
+        if (geometryType):
+            arcpy.CreateFeatureclass_management(geodatabase, datasetName, geometryType)
+        else:
+            arcpy.CreateTable_management(geodatabase, datasetName)
+        datasets[datasetName] = os.path.join(geodatabase, datasetName)
+        for fieldName, fieldType in fields:
+            arcpy.AddField_management(datasets[datasetName], fieldName, fieldType)
+        if (globalIDs):
+            arcpy.AddGlobalIDs_management(datasets[datasetName])
+
+    # Properties - Most are in the data warehouse, some are only in GIS or only in the data warehouse
+    with arcpy.da.InsertCursor(datasets["Property"], ["SHAPE@XY","Id","RecordStatus"]) as propertyCursor, \
+         arcpy.da.InsertCursor(datasets["DWProperty"], ["property_bsns_partner_num"]) as dwPropertyCursor, \
+         arcpy.da.InsertCursor(datasets["PropertyShedRelate"], ["ShedID","PropertyID"]) as shedRelateCursor, \
+         arcpy.da.InsertCursor(datasets["DWShed"], ["shed_bsns_partner_num"]) as dwShedCursor:
+        for propertyNumber in range(propertyCount):
+            propertyID = "P" + str(propertyNumber)
+            if (propertyNumber % 20 != 0):
+                propertyCursor.insertRow([(1750000 + randomGenerator.random() * 10000, 5900000 + randomGenerator.random() * 10000), propertyID, "A"])
+            if (propertyNumber % 25 != 0):
+                dwPropertyCursor.insertRow([propertyID])
+            for shedNumber in range(propertyNumber % 3):
+                shedRelateCursor.insertRow(["S" + str(propertyNumber) + "-" + str(shedNumber), propertyID])
+                dwShedCursor.insertRow(["S" + str(propertyNumber) + "-" + str(shedNumber)])
+    # Data warehouse load has finished today
+    with arcpy.da.InsertCursor(datasets["DWLoadStatus"], ["start_datetime","end_datetime","start_date","end_date"]) as loadStatusCursor:
+        loadStatusCursor.insertRow([datetime.datetime.now(), datetime.datetime.now(), datetime.date.today().isoformat(), datetime.date.today().isoformat()])
+
+    return geodatabase,datasets
+# End of create data warehouse sync workspace function
+
+
+# Start of create update zip function
+def createUpdateZip(folder,name,shapefileCount=4,recordCount=1000,seed=1,changeRecords=0,duplicateCounts=0):
+    # Creates a zip file with point and polygon shapefiles, a geodatabase and files that aren't datasets - The value of the first
+    # change records in each shapefile is changed from the one created with the same seed, and the count of the first duplicate
+    # counts records is null for the first record and the same for the rest
+    randomGenerator = random.Random(seed)
+    zipPath = os.path.join(folder, name + ".zip")
+    with zipfile.ZipFile(zipPath, "w", zipfile.ZIP_DEFLATED) as zipFile:
+        for shapefileNumber in range(shapefileCount):
+            shapeType = [1,5][shapefileNumber % 2]
+            shapefileName = ["Points","Polygons"][shapefileNumber % 2] + str(shapefileNumber + 1)
+            records = []
+            for recordNumber in range(recordCount):
+                x = 1750000 + randomGenerator.random() * 10000
+                y = 5900000 + randomGenerator.random() * 10000
+                values = [shapefileName + " " + str(recordNumber), randomGenerator.choice(["A","B","C","D"]), randomGenerator.random() * 1000, recordNumber, datetime.date(2020, 1, 1) + datetime.timedelta(days=recordNumber % 365)]
+                if (recordNumber < changeRecords):
+                    values[2] = values[2] + 1
+                if (recordNumber < duplicateCounts):
+                    values[3] = None if (recordNumber == 0) else 1
+                records.append(((x, y), values))
+            writeShapefile(zipFile, shapefileName, shapeType, records)
+        zipFile.writestr("ReadMe.txt", "Synthetic update for the benchmarks")
+        zipFile.writestr("Documents/Metadata.xml", "<metadata>" + ("Synthetic update " * 10000) + "</metadata>")
+
+        # Geodatabase with a feature class and a table
+        geodatabase = createGeodatabase(folder, name)
+        createDataset(geodatabase, "", "GeodatabaseFeatureClass", "Feature Class", recordCount, "", randomGenerator)
+        createDataset(geodatabase, "", "GeodatabaseTable", "Table", recordCount, "", randomGenerator)
+        for root, folders, files in os.walk(geodatabase):
+            for fileName in files:
+                # Skip lock files
+                if not fileName.lower().endswith(".lock"):
+                    zipFile.write(os.path.join(root, fileName), os.path.relpath(os.path.join(root, fileName), folder).replace(os.sep, "/"))
+    return zipPath
+# End of create update zip function
+
+
+# Start of write shapefile function
+def writeShapefile(zipFile,name,shapeType,records):
+    # Write the shp, shx, dbf, prj and cpg files for points or square polygons around each point
+    fields = [("Name","C",50,0),("Category","C",10,0),("Value","N",19,6),("Count","N",9,0),("EditDate","D",8,0)]
+    shapes = []
+    for (x, y), values in records:
+        if (shapeType == 1):
+            shapes.append(struct.pack("<i2d", 1, x, y))
+        else:
+            ring = [(x, y), (x, y + 10), (x + 10, y + 10), (x + 10, y), (x, y)]
+            shapes.append(struct.pack("<i4d2ii", 5, x, y, x + 10, y + 10, 1, len(ring), 0) + struct.pack("<" + str(len(ring) * 2) + "d", *[value for point in ring for value in point]))
+    xValues = [record[0][0] for record in records] or [0]
+    yValues = [record[0][1] for record in records] or [0]
+    boundingBox = struct.pack("<8d", min(xValues), min(yValues), max(xValues) + 10, max(yValues) + 10, 0, 0, 0, 0)
+
+    # Shapes and the index of where each one starts - Lengths are in 16 bit words
+    shapeContent = []
+    indexContent = []
+    offset = 50
+    for recordNumber, shape in enumerate(shapes):
+        shapeContent.append(struct.pack(">2i", recordNumber + 1, int(len(shape) / 2)) + shape)
+        indexContent.append(struct.pack(">2i", offset, int(len(shape) / 2)))
+        offset = offset + 4 + int(len(shape) / 2)
+    for extension, content in [(".shp", b"".join(shapeContent)), (".shx", b"".join(indexContent))]:
+        header = struct.pack(">7i", 9994, 0, 0, 0, 0, 0, 50 + int(len(content) / 2)) + struct.pack("<2i", 1000, shapeType) + boundingBox
+        zipFile.writestr(name + extension, header + content)
+
+    # Attributes
+    dbfRecords = []
+    for point, values in records:
+        record = b" "
+        for (fieldName, fieldType, fieldLength, fieldDecimals), value in zip(fields, values):
+            if (value is None):
+                text = ""
+            elif (fieldType == "C"):
+                text = value.ljust(fieldLength)
+            elif (fieldType == "D"):
+                text = value.strftime("%Y%m%d")
+            elif (fieldDecimals):
+                text = ("%." + str(fieldDecimals) + "f") % value
+            else:
+                text = str(value)
+            record = record + text.rjust(fieldLength)[:fieldLength].encode("ascii")
+        dbfRecords.append(record)
+    recordLength = 1 + sum([field[2] for field in fields])
+    today = datetime.date.today()
+    dbfHeader = struct.pack("<4BI2H20x", 3, today.year - 1900, today.month, today.day, len(records), 33 + (32 * len(fields)), recordLength)
+    fieldDescriptors = b"".join([struct.pack("<11sc4xBB14x", fieldName.encode("ascii"), fieldType.encode("ascii"), fieldLength, fieldDecimals) for fieldName, fieldType, fieldLength, fieldDecimals in fields])
+    zipFile.writestr(name + ".dbf", dbfHeader + fieldDescriptors + b"\r" + b"".join(dbfRecords) + b"\x1a")
+    zipFile.writestr(name + ".cpg", "UTF-8")
+    zipFile.writestr(name + ".prj", 'PROJCS["NZGD_2000_New_Zealand_Transverse_Mercator",GEOGCS["GCS_NZGD_2000",DATUM["D_NZGD_2000",SPHEROID["GRS_1980",6378137.0,298.257222101]],PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]],PROJECTION["Transverse_Mercator"],PARAMETER["False_Easting",1600000.0],PARAMETER["False_Northing",10000000.0],PARAMETER["Central_Meridian",173.0],PARAMETER["Scale_Factor",0.9996],PARAMETER["Latitude_Of_Origin",0.0],UNIT["Meter",1.0]]')
+# End of write shapefile function
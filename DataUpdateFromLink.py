@@ -1,11 +1,22 @@
 #-------------------------------------------------------------
 # Name:       Data Update from Link
 # Purpose:    Downloads a zipped up file geodatabase from a download link. Updates data in a geodatabase
-#             from the zip file. Two update options:
+#             from the zip file. Three update options:
 #             Existing Mode - Will only update datasets that have the same name and will delete and
 #             append records, so field names need to be the same.
 #             New Mode - Copies all datasets from the geodatabase and loads into geodatabase. Requires
 #             no locks on geodatabase. 
+#             Incremental Mode - Matches records on the key field set for the dataset and only applies the
+#             inserts, updates and deletes, datasets without a key field or with null or duplicate values in
+#             the key field are deleted and appended as in Existing Mode. The number of records inserted,
+#             updated, deleted and unchanged are logged.
+#             The record count logged for each dataset is the records inserted, updated and unchanged when
+#             changes are applied, otherwise it is counted in the downloaded geodatabase, set verifyCounts to
+#             count the records in each dataset after it has been loaded.
+#             The ETag, Last-Modified date and SHA-256 hash of the last download applied from the link are
+#             stored, so the next run only downloads the file if the server says it has changed and doesn't
+#             update the datasets if the download is the same as last time. Use --force-refresh to update anyway.
+#             Large files are downloaded as byte ranges at the same time when the server accepts ranges.
 # Author:     Shaun Weston (shaun_weston@eagle.co.nz)
 # Date Created:    05/09/2013
 # Last Updated:    10/11/2016
@@ -35,8 +46,14 @@ emailSubject = ""
 emailMessage = ""
 # Proxy
 enableProxy = "false"
-requestProtocol = "http" # http or https
-proxyURL = ""
+proxyURL = "" # Proxy for http and https requests e.g. http://proxy.example.com:8080
+# Download state
+downloadStateFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DataUpdateFromLinkState.json") # JSON file storing the ETag, Last-Modified date and SHA-256 hash of the last download applied from each link, leave blank to always download and update
+forceRefresh = "false" # Download and update even if the download hasn't changed since the last update - Can also be set with --force-refresh on the command line
+# Record counts
+verifyCounts = "false" # Count the records in each dataset after it has been loaded, otherwise the records in the downloaded geodatabase are counted - Counting can be a full table scan on an enterprise geodatabase
+# Incremental mode
+keyFields = "" # Key field to match records on for each dataset in incremental mode e.g. "Roads:RoadID,Parcels:ParcelID", a key field without a dataset name is used for every dataset e.g. "AssetID" - Can also be set with --key-fields=Roads:RoadID on the command line
 # Output
 output = None
 # ArcGIS desktop installed
@@ -48,15 +65,15 @@ if (arcgisDesktop == "true"):
     import arcpy
     # Enable data to be overwritten
     arcpy.env.overwriteOutput = True
-# Python version check
-if sys.version_info[0] >= 3:
-    # Python 3.x
-    import urllib.request as urllib2
-else:
-    # Python 2.x
-    import urllib2  
+    # Shared change detection - Only applies the inserts, updates and deletes in incremental mode
+    import RecordChanges
+# Shared HTTP client - Reuses connections and retries failed requests
+import HTTPClient
 import zipfile
 import glob
+import json
+import hashlib
+import datetime
 
 
 # Start of main function
@@ -64,104 +81,146 @@ def mainFunction(downloadLink,updateMode,geodatabase,featureDataset): # Get para
     try:
         # --------------------------------------- Start of code --------------------------------------- #
     
-        # Download the file from the link
-        file = urllib2.urlopen(downloadLink)
-        # Download in chunks
-        fileChunk = 16 * 1024
-        
         datasetFileName = "Data.zip"
         if ".gdb" in downloadLink:
             datasetFileName = "Data.gdb.zip"      
-        with open(os.path.join(arcpy.env.scratchFolder, datasetFileName), 'wb') as output:
-            while True:
-                chunk = file.read(fileChunk)
-                if not chunk:
-                    break
-                # Write chunk to output file
-                output.write(chunk)
-        output.close()
-
-        # Unzip the file to the scratch folder
-        arcpy.AddMessage("Extracting zip file...")  
-        zip = zipfile.ZipFile(os.path.join(arcpy.env.scratchFolder, datasetFileName), mode="r")
-        unzipFolder = arcpy.env.scratchFolder        
-        if ".gdb" in downloadLink:
-            unzipFolder = os.path.join(arcpy.env.scratchFolder, "Data.gdb")             
-        zip.extractall(unzipFolder)
+        # FUNCTION - Get the download state from the last update from the link
+        downloadKey = downloadLink + "|" + geodatabase.lower() + "|" + featureDataset.lower()
+        lastDownloadState = getDownloadState(downloadKey)
+        # FUNCTION - Download the file from the link if it has changed since the last update
+        downloadState = downloadData(downloadLink,os.path.join(arcpy.env.scratchFolder, datasetFileName),lastDownloadState)
+
+        updateData = "true"
+        # If the server says the file hasn't changed
+        if (downloadState is None):
+            updateData = "false"
+            arcpy.AddMessage("Download hasn't changed since the last update (" + lastDownloadState["updated"] + "), no update needed...")
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Download hasn't changed since the last update (" + lastDownloadState["updated"] + "), no update needed...")
+        # If the download is the same as the last update
+        elif (lastDownloadState) and (forceRefresh != "true") and (downloadState["sha256"] == lastDownloadState.get("sha256")):
+            updateData = "false"
+            arcpy.AddMessage("Download is the same as the last update (" + lastDownloadState["updated"] + "), no update needed...")
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Download is the same as the last update (" + lastDownloadState["updated"] + "), no update needed...")
+            # FUNCTION - Save the ETag and Last-Modified date from the server for the next request
+            downloadState["updated"] = lastDownloadState["updated"]
+            saveDownloadState(downloadKey,downloadState)
+
+        # If the download has changed since the last update
+        if (updateData == "true"):
+            # Unzip the file to the scratch folder
+            arcpy.AddMessage("Extracting zip file...")  
+            zip = zipfile.ZipFile(os.path.join(arcpy.env.scratchFolder, datasetFileName), mode="r")
+            unzipFolder = arcpy.env.scratchFolder        
+            if ".gdb" in downloadLink:
+                unzipFolder = os.path.join(arcpy.env.scratchFolder, "Data.gdb")             
+            zip.extractall(unzipFolder)
 
-        # Get the newest unzipped database from the scratch folder
-        database = max(glob.iglob(arcpy.env.scratchFolder + r"\*.gdb"), key=os.path.getmtime)
+            # Get the newest unzipped database from the scratch folder
+            database = max(glob.iglob(arcpy.env.scratchFolder + r"\*.gdb"), key=os.path.getmtime)
         
-        # Assign the geodatabase workspace and load in the datasets to the lists
-        arcpy.env.workspace = database
-        featureclassList = arcpy.ListFeatureClasses()
-        tableList = arcpy.ListTables()       
+            # Assign the geodatabase workspace and load in the datasets to the lists
+            arcpy.env.workspace = database
+            featureclassList = arcpy.ListFeatureClasses()
+            tableList = arcpy.ListTables()       
         
-        arcpy.AddMessage("Copying datasets...")        
-        # Load the feature classes into the geodatabase if at least one is in the geodatabase provided
-        if (len(featureclassList) > 0):        
-            # Loop through the feature classes
-            for eachFeatureclass in featureclassList:
-               # Create a Describe object from the dataset
-               describeDataset = arcpy.Describe(eachFeatureclass)
-               # If feature dataset provided, add that to path
-               if featureDataset:
-                   outputDataset = os.path.join(geodatabase + "\\" + featureDataset, describeDataset.name)
-               else:
+            arcpy.AddMessage("Copying datasets...")        
+            # Load the feature classes into the geodatabase if at least one is in the geodatabase provided
+            if (len(featureclassList) > 0):        
+                # Loop through the feature classes
+                for eachFeatureclass in featureclassList:
+                   # Create a Describe object from the dataset
+                   describeDataset = arcpy.Describe(eachFeatureclass)
+                   # If feature dataset provided, add that to path
+                   if featureDataset:
+                       outputDataset = os.path.join(geodatabase + "\\" + featureDataset, describeDataset.name)
+                   else:
+                       outputDataset = os.path.join(geodatabase, describeDataset.name)
+                   exportData = "true"
+                   changeCounts = None
+                   # If update mode is then copy, otherwise delete and appending records                
+                   if (updateMode == "New"):
+                       # Copy feature class into geodatabase using the same dataset name
+                       arcpy.CopyFeatures_management(eachFeatureclass, outputDataset, "", "0", "0", "0")
+                   else:
+                        # If dataset exists in geodatabase, delete features and load in new data
+                        if arcpy.Exists(outputDataset):
+                            # FUNCTION - Get the key field to match records on in incremental mode
+                            keyField = getKeyField(eachFeatureclass,[field.name for field in arcpy.ListFields(eachFeatureclass)],outputDataset,updateMode)
+                            # FUNCTION - Only apply the inserts, updates and deletes, unless records can't be matched on the key field
+                            if (keyField):
+                                changeCounts = updateChangedRecords(os.path.join(arcpy.env.workspace, eachFeatureclass),outputDataset,keyField)
+                            if (changeCounts is None):
+                                arcpy.DeleteFeatures_management(outputDataset)
+                                arcpy.Append_management(os.path.join(arcpy.env.workspace, eachFeatureclass), outputDataset, "NO_TEST", "", "")
+                        else:
+                            exportData = "false"
+                            # Log warning
+                            arcpy.AddWarning("Warning: " + outputDataset + " does not exist and won't be updated")
+                            # Logging
+                            if (enableLogging == "true"):
+                                logger.warning(outputDataset + " does not exist and won't be updated")
+                   if (exportData.lower() == "true"):                            
+                       # Get dataset count - Records inserted, updated and unchanged or copied from the downloaded geodatabase, unless counting the records after loading
+                       if (verifyCounts == "true"):
+                           datasetRecordCount = arcpy.GetCount_management(outputDataset)
+                       elif (changeCounts is not None):
+                           datasetRecordCount = changeCounts["inserted"] + changeCounts["updated"] + changeCounts["unchanged"]
+                       else:
+                           datasetRecordCount = arcpy.GetCount_management(eachFeatureclass)
+                       arcpy.AddMessage(str(outputDataset) + " record count - " + str(datasetRecordCount) + "...")       
+                       # Logging
+                       if (enableLogging == "true"):
+                           logger.info(str(outputDataset) + " record count - " + str(datasetRecordCount) + "...")
+            if (len(tableList) > 0):    
+                # Loop through of the tables
+                for eachTable in tableList:
+                   # Create a Describe object from the dataset
+                   describeDataset = arcpy.Describe(eachTable)
                    outputDataset = os.path.join(geodatabase, describeDataset.name)
-               exportData = "true"
-               # If update mode is then copy, otherwise delete and appending records                
-               if (updateMode == "New"):
-                   # Copy feature class into geodatabase using the same dataset name
-                   arcpy.CopyFeatures_management(eachFeatureclass, outputDataset, "", "0", "0", "0")
-               else:
-                    # If dataset exists in geodatabase, delete features and load in new data
-                    if arcpy.Exists(outputDataset):
-                        arcpy.DeleteFeatures_management(outputDataset)
-                        arcpy.Append_management(os.path.join(arcpy.env.workspace, eachFeatureclass), outputDataset, "NO_TEST", "", "")
-                    else:
-                        exportData = "false"
-                        # Log warning
-                        arcpy.AddWarning("Warning: " + outputDataset + " does not exist and won't be updated")
-                        # Logging
-                        if (enableLogging == "true"):
-                            logger.warning(outputDataset + " does not exist and won't be updated")
-               if (exportData.lower() == "true"):                            
-                   datasetRecordCount = arcpy.GetCount_management(outputDataset)
-                   arcpy.AddMessage(str(outputDataset) + " record count - " + str(datasetRecordCount) + "...")       
-                   # Logging
-                   if (enableLogging == "true"):
-                       logger.info(str(outputDataset) + " record count - " + str(datasetRecordCount) + "...")
-        if (len(tableList) > 0):    
-            # Loop through of the tables
-            for eachTable in tableList:
-               # Create a Describe object from the dataset
-               describeDataset = arcpy.Describe(eachTable)
-               outputDataset = os.path.join(geodatabase, describeDataset.name)
-               exportData = "true"
+                   exportData = "true"
+                   changeCounts = None
                
-               # If update mode is then copy, otherwise delete and appending records                
-               if (updateMode == "New"):               
-                   # Copy feature class into geodatabase using the same dataset name
-                   arcpy.TableSelect_analysis(eachTable, outputDataset, "")
-               else:
-                    # If dataset exists in geodatabase, delete features and load in new data
-                    if arcpy.Exists(os.path.join(geodatabase, eachTable)):
-                        arcpy.DeleteRows_management(os.path.join(geodatabase, eachTable))
-                        arcpy.Append_management(os.path.join(arcpy.env.workspace, eachTable), outputDataset, "NO_TEST", "", "")
-                    else:
-                        exportData = "false"
-                        # Log warning
-                        arcpy.AddWarning("Warning: " + outputDataset + " does not exist and won't be updated")
-                        # Logging
-                        if (enableLogging == "true"):
-                            logger.warning(outputDataset + " does not exist and won't be updated")
-               if (exportData.lower() == "true"):                             
-                   datasetRecordCount = arcpy.GetCount_management(outputDataset)
-                   arcpy.AddMessage(str(outputDataset) + " record count - " + str(datasetRecordCount) + "...")       
-                   # Logging
-                   if (enableLogging == "true"):
-                       logger.info(str(outputDataset) + " record count - " + str(datasetRecordCount) + "...")
+                   # If update mode is then copy, otherwise delete and appending records                
+                   if (updateMode == "New"):               
+                       # Copy feature class into geodatabase using the same dataset name
+                       arcpy.TableSelect_analysis(eachTable, outputDataset, "")
+                   else:
+                        # If dataset exists in geodatabase, delete features and load in new data
+                        if arcpy.Exists(os.path.join(geodatabase, eachTable)):
+                            # FUNCTION - Get the key field to match records on in incremental mode
+                            keyField = getKeyField(eachTable,[field.name for field in arcpy.ListFields(eachTable)],outputDataset,updateMode)
+                            # FUNCTION - Only apply the inserts, updates and deletes, unless records can't be matched on the key field
+                            if (keyField):
+                                changeCounts = updateChangedRecords(os.path.join(arcpy.env.workspace, eachTable),outputDataset,keyField)
+                            if (changeCounts is None):
+                                arcpy.DeleteRows_management(os.path.join(geodatabase, eachTable))
+                                arcpy.Append_management(os.path.join(arcpy.env.workspace, eachTable), outputDataset, "NO_TEST", "", "")
+                        else:
+                            exportData = "false"
+                            # Log warning
+                            arcpy.AddWarning("Warning: " + outputDataset + " does not exist and won't be updated")
+                            # Logging
+                            if (enableLogging == "true"):
+                                logger.warning(outputDataset + " does not exist and won't be updated")
+                   if (exportData.lower() == "true"):                             
+                       # Get dataset count - Records inserted, updated and unchanged or copied from the downloaded geodatabase, unless counting the records after loading
+                       if (verifyCounts == "true"):
+                           datasetRecordCount = arcpy.GetCount_management(outputDataset)
+                       elif (changeCounts is not None):
+                           datasetRecordCount = changeCounts["inserted"] + changeCounts["updated"] + changeCounts["unchanged"]
+                       else:
+                           datasetRecordCount = arcpy.GetCount_management(eachTable)
+                       arcpy.AddMessage(str(outputDataset) + " record count - " + str(datasetRecordCount) + "...")       
+                       # Logging
+                       if (enableLogging == "true"):
+                           logger.info(str(outputDataset) + " record count - " + str(datasetRecordCount) + "...")
+
+            # FUNCTION - Save the download state so the same download isn't applied again
+            saveDownloadState(downloadKey,downloadState)
                 
         # --------------------------------------- End of code --------------------------------------- #
         # If called from gp tool return the arcpy parameter   
@@ -248,6 +307,107 @@ def mainFunction(downloadLink,updateMode,geodatabase,featureDataset): # Get para
 # End of main function
 
 
+# Start of download data function
+def downloadData(downloadLink,downloadFile,lastDownloadState):
+    # Ask the server to only send the file if it has changed since the last update
+    headers = {}
+    if (lastDownloadState) and (forceRefresh != "true"):
+        if (lastDownloadState.get("etag")):
+            headers["If-None-Match"] = lastDownloadState["etag"]
+        if (lastDownloadState.get("lastModified")):
+            headers["If-Modified-Since"] = lastDownloadState["lastModified"]
+    # Download the file - Downloaded as byte ranges at the same time if the server accepts ranges
+    response = HTTPClient.downloadFile(downloadLink, downloadFile, headers)
+    # File hasn't changed
+    if (response.status == 304):
+        return None
+
+    # Hash the downloaded file in chunks
+    fileChunk = 1024 * 1024
+    fileHash = hashlib.sha256()
+    fileSize = 0
+    with open(downloadFile, 'rb') as file:
+        while True:
+            chunk = file.read(fileChunk)
+            if not chunk:
+                break
+            fileHash.update(chunk)
+            fileSize = fileSize + len(chunk)
+    return {"etag": response.headers.get("etag", ""),
+            "lastModified": response.headers.get("last-modified", ""),
+            "sha256": fileHash.hexdigest(),
+            "size": fileSize,
+            "updated": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+# End of download data function
+
+
+# Start of get download state function
+def getDownloadState(downloadKey):
+    # ETag, Last-Modified date and hash of the last download applied from the link - None if there isn't one
+    if (not downloadStateFile) or (not os.path.exists(downloadStateFile)):
+        return None
+    with open(downloadStateFile, "r") as file:
+        downloadStates = json.load(file)
+    return downloadStates.get(downloadKey)
+# End of get download state function
+
+
+# Start of save download state function
+def saveDownloadState(downloadKey,downloadState):
+    if (not downloadStateFile):
+        return
+    downloadStates = {}
+    if os.path.exists(downloadStateFile):
+        with open(downloadStateFile, "r") as file:
+            downloadStates = json.load(file)
+    downloadStates[downloadKey] = downloadState
+    with open(downloadStateFile, "w") as file:
+        json.dump(downloadStates, file, indent=2, sort_keys=True)
+# End of save download state function
+
+
+# Start of get key field function
+def getKeyField(datasetName,sourceFieldNames,outputDataset,updateMode):
+    # Records are only matched on a key field in incremental mode
+    if (updateMode != "Incremental"):
+        return ""
+
+    # FUNCTION - Get the key field for the dataset
+    keyField = RecordChanges.getKeyField(datasetName,keyFields,sourceFieldNames,outputDataset)
+    if (not keyField):
+        arcpy.AddWarning("Warning: " + outputDataset + " has no key field to match records on, deleting and appending records instead...")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning(outputDataset + " has no key field to match records on, deleting and appending records instead...")
+    return keyField
+# End of get key field function
+
+
+# Start of update changed records function
+def updateChangedRecords(sourceDataset,outputDataset,keyField):
+    # FUNCTION - Apply the inserts, updates and deletes from the source records
+    changeCounts = RecordChanges.updateChangedRecords(sourceDataset,outputDataset,keyField)
+    # FUNCTION - Log the number of records changed
+    logChangeCounts(changeCounts,outputDataset,keyField)
+    return changeCounts
+# End of update changed records function
+
+
+# Start of log change counts function
+def logChangeCounts(changeCounts,outputDataset,keyField):
+    # Records couldn't be matched on the key field
+    if (changeCounts is None):
+        arcpy.AddWarning("Warning: " + outputDataset + " has null or duplicate values in the key field " + keyField + ", deleting and appending records instead...")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning(outputDataset + " has null or duplicate values in the key field " + keyField + ", deleting and appending records instead...")
+        return
+    arcpy.AddMessage("Records inserted - " + str(changeCounts["inserted"]) + ", updated - " + str(changeCounts["updated"]) + ", deleted - " + str(changeCounts["deleted"]) + ", unchanged - " + str(changeCounts["unchanged"]))
+    if (enableLogging == "true"):
+        logger.info("Records inserted - " + str(changeCounts["inserted"]) + ", updated - " + str(changeCounts["updated"]) + ", deleted - " + str(changeCounts["deleted"]) + ", unchanged - " + str(changeCounts["unchanged"]))
+# End of log change counts function
+
+
 # Start of print message function
 def printMessage(message,type):
     # If ArcGIS desktop installed
@@ -322,11 +482,16 @@ if __name__ == '__main__':
         logger, logMessage = setLogging(logFile)
         # Log start of process
         logger.info("Process started.")
+    # Get the optional flags from the arguments e.g. --force-refresh
+    argv = list(argv)
+    for argument in list(argv):
+        if (argument.lower() == "--force-refresh"):
+            forceRefresh = "true"
+            argv.remove(argument)
+        elif (argument.lower().startswith("--key-fields=")):
+            keyFields = argument.split("=", 1)[1]
+            argv.remove(argument)
     # Setup the use of a proxy for requests
     if (enableProxy == "true"):
-        # Setup the proxy
-        proxy = urllib2.ProxyHandler({requestProtocol : proxyURL})
-        openURL = urllib2.build_opener(proxy)
-        # Install the proxy
-        urllib2.install_opener(openURL)
+        HTTPClient.proxyURL = proxyURL
     mainFunction(*argv)
\ No newline at end of file
@@ -1,12 +1,25 @@
 #-------------------------------------------------------------
 # Name:       Data Update From Zip
 # Purpose:    Updates data in a geodatabase from a zip file containing a geodatabase. Will get latest
-#             zip file from update folder. Two update options:
+#             zip file from update folder. Three update options:
 #             Existing Mode - Will only update datasets that have the same name and will delete and
 #             append records, so field names need to be the same. If dataset doesn't exist will copy it
 #             over.
 #             New Mode - Copies all datasets from the geodatabase and loads into geodatabase. Requires
 #             no locks on geodatabase.
+#             Incremental Mode - Matches records on the key field set for the dataset and only applies the
+#             inserts, updates and deletes, datasets without a key field or with null or duplicate values in
+#             the key field are deleted and appended as in Existing Mode. The number of records inserted,
+#             updated, deleted and unchanged are logged.
+#             The record count logged for each dataset is the number of records copied from the source, set
+#             verifyCounts to count the records in each dataset after it has been loaded.
+#             Only the shapefiles and geodatabases in the root of the zip file are extracted. Shapefile records
+#             are read straight from the zip file and loaded with an insert cursor, shapefiles with Z or M values
+#             or field types that can't be read are extracted. The extracted datasets are removed once loaded.
+#             Watch Mode - Use --watch to keep running and apply each new zip file in the update folder once, in
+#             the order they arrived, or --watch-once to apply the zip files that haven't been applied yet and
+#             stop. The zip files applied are recorded in a processed manifest, and the queue depth and time
+#             taken to apply each zip file are logged.
 # Author:     Shaun Weston (shaun_weston@eagle.co.nz)
 # Date Created:    31/05/2013
 # Last Updated:    03/04/2019
@@ -38,6 +51,19 @@ emailMessage = ""
 enableProxy = "false"
 requestProtocol = "http" # http or https
 proxyURL = ""
+# Watch mode
+watchMode = "false" # "true" keeps running and applies each new zip file in the update folder once, in the order they arrive, "once" applies the zip files that haven't been applied yet and stops - Can also be set with --watch or --watch-once on the command line
+watchInterval = 60 # Seconds between checks of the update folder for new zip files - Can also be set with --watch-interval=60 on the command line
+processedManifestFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DataUpdateFromZipProcessed.json") # JSON file recording the zip files applied in watch mode, so each one is only applied once
+# Record counts
+verifyCounts = "false" # Count the records in each dataset after it has been loaded, otherwise the number of records copied from the source is logged - Counting can be a full table scan on an enterprise geodatabase
+# Incremental mode
+keyFields = "" # Key field to match records on for each dataset in incremental mode e.g. "Roads:RoadID,Parcels:ParcelID", a key field without a dataset name is used for every dataset e.g. "AssetID" - Can also be set with --key-fields=Roads:RoadID on the command line
+# Shapefiles
+readShapefilesFromZip = "true" # Read the records of shapefiles straight from the zip file rather than extracting them
+shapefileEncoding = "cp1252" # Encoding of the text in shapefiles that don't have a .cpg file
+# Shapefile shape types that can be read from the zip file and the type of feature class to create
+shapefileGeometryTypes = {1:"POINT",3:"POLYLINE",5:"POLYGON",8:"MULTIPOINT"}
 # Output
 output = None
 # ArcGIS desktop installed
@@ -49,6 +75,8 @@ if (arcgisDesktop == "true"):
     import arcpy
     # Enable data to be overwritten
     arcpy.env.overwriteOutput = True
+    # Shared change detection - Only applies the inserts, updates and deletes in incremental mode
+    import RecordChanges
 # Python version check
 if sys.version_info[0] >= 3:
     # Python 3.x
@@ -59,6 +87,13 @@ else:
 import glob
 import uuid
 import zipfile
+import struct
+import codecs
+import shutil
+import datetime
+import time
+import json
+import collections
 
 
 # Start of main function
@@ -69,32 +104,133 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
         # Get the arcgis version
         arcgisVersion = arcpy.GetInstallInfo()['Version']   
 
-        # If a specific file is provided
-        if (fileName):
-            latestFile = os.path.join(updateFolder, fileName)
-        # Otherwise get the latest file in a folder
+        # If watching the update folder for zip files
+        if (watchMode in ["true","once"]):
+            # FUNCTION - Apply each zip file in the update folder that hasn't been applied, in the order they arrived
+            watchUpdateFolder(updateFolder,fileName or "*.zip",updateMode,geodatabase)
         else:
-            # Get the newest zip file from the update folder
-            latestFile = max(glob.iglob(updateFolder + r"\*.zip"), key=os.path.getmtime)
-      
-        # Setup geodatabase to load data into in temporary workspace
-        tempFolder = arcpy.CreateFolder_management(arcpy.env.scratchFolder, "WebData-" + str(uuid.uuid1()))
-        arcpy.AddMessage("Copying datasets...")    
+            # If a specific file is provided
+            if (fileName):
+                latestFile = os.path.join(updateFolder, fileName)
+            # Otherwise get the latest file in a folder
+            else:
+                # Get the newest zip file from the update folder
+                latestFile = max(glob.iglob(updateFolder + r"\*.zip"), key=os.path.getmtime)
+
+            # FUNCTION - Update the datasets from the zip file
+            updateFromZip(latestFile,updateMode,geodatabase)
+        
+        # --------------------------------------- End of code --------------------------------------- #
+        # If called from gp tool return the arcpy parameter   
+        if __name__ == '__main__':
+            # Return the output if there is any
+            if output:
+                # If ArcGIS desktop installed
+                if (arcgisDesktop == "true"):
+                    arcpy.SetParameter(1, output)
+                # ArcGIS desktop not installed
+                else:
+                    return output 
+        # Otherwise return the result          
+        else:
+            # Return the output if there is any
+            if output:
+                return output      
+        # Logging
+        if (enableLogging == "true"):
+            # Log end of process
+            logger.info("Process ended.")
+            # Remove file handler and close log file        
+            logMessage.flush()
+            logMessage.close()
+            logger.handlers = []
+    # If arcpy error
+    except arcpy.ExecuteError:           
+        # Build and show the error message
+        errorMessage = arcpy.GetMessages(2)   
+        printMessage(errorMessage,"error")           
+        # Logging
+        if (enableLogging == "true"):
+            # Log error          
+            logger.error(errorMessage)
+            # Log end of process
+            logger.info("Process ended.")            
+            # Remove file handler and close log file        
+            logMessage.flush()
+            logMessage.close()
+            logger.handlers = []   
+        if (sendErrorEmail == "true"):
+            # Send email
+            sendEmail(errorMessage)
+    # If python error
+    except Exception as e:
+        errorMessage = ""         
+        # Build and show the error message
+        # If many arguments
+        if (e.args):
+            for i in range(len(e.args)):        
+                if (i == 0):
+                    # Python version check
+                    if sys.version_info[0] >= 3:
+                        # Python 3.x
+                        errorMessage = str(e.args[i]).encode('utf-8').decode('utf-8')
+                    else:
+                        # Python 2.x
+                        errorMessage = unicode(e.args[i]).encode('utf-8')
+                else:
+                    # Python version check
+                    if sys.version_info[0] >= 3:
+                        # Python 3.x
+                        errorMessage = errorMessage + " " + str(e.args[i]).encode('utf-8').decode('utf-8')
+                    else:
+                        # Python 2.x
+                        errorMessage = errorMessage + " " + unicode(e.args[i]).encode('utf-8')
+        # Else just one argument
+        else:
+            errorMessage = e
+        printMessage(errorMessage,"error")
+        # Logging
+        if (enableLogging == "true"):
+            # Log error            
+            logger.error(errorMessage)
+            # Log end of process
+            logger.info("Process ended.")            
+            # Remove file handler and close log file        
+            logMessage.flush()
+            logMessage.close()
+            logger.handlers = []   
+        if (sendErrorEmail == "true"):
+            # Send email
+            sendEmail(errorMessage)            
+# End of main function
+
+
+# Start of update from zip function
+def updateFromZip(latestFile,updateMode,geodatabase):
+    # Setup folder to extract datasets into in temporary workspace
+    tempFolder = arcpy.CreateFolder_management(arcpy.env.scratchFolder, "WebData-" + str(uuid.uuid1()))
+    arcpy.AddMessage("Copying datasets...")    
           
-        # Extract the zip file to a temporary location
-        zip = zipfile.ZipFile(latestFile, mode="r")
-        zip.extractall(str(tempFolder))
-
-        # Loop through the files in the extracted folder
-        for file in os.listdir(str(tempFolder)):               
-            # If it's a shapefile
-            if file.endswith(".shp"):
+    # Open the zip file
+    zip = zipfile.ZipFile(latestFile, mode="r")
+    try:
+        # FUNCTION - Get the datasets in the zip file and extract the ones that can't be read from the zip file
+        datasetFiles,zipShapefiles = extractDatasets(zip,str(tempFolder))
+
+        # Loop through the datasets in the zip file
+        for file in datasetFiles:
+            # If it's a shapefile that can be read from the zip file
+            if (file in zipShapefiles):
+                # FUNCTION - Load the records from the shapefile in the zip file
+                loadZipShapefile(zip,file,zipShapefiles[file],updateMode,geodatabase)
+            # If it's a shapefile that has been extracted
+            elif file.endswith(".shp"):
                # Get count of the source dataset
                datasetCount = arcpy.GetCount_management(os.path.join(str(tempFolder), file))
                eachFeatureclass = file.replace(".shp","")
           
                # Check Dataset record count is more than 0
-               if (long(str(datasetCount)) > 0):
+               if (int(str(datasetCount)) > 0):
                    # If update mode is then copy, otherwise delete and appending records                
                    if (updateMode == "New"):                                           
                        # Logging
@@ -105,8 +241,9 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
                        # Copy feature class into geodatabase using the same dataset name
                        arcpy.CopyFeatures_management(os.path.join(str(tempFolder), file), os.path.join(geodatabase, eachFeatureclass), "", "0", "0", "0")
 
-                       # Get dataset count
-                       datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, eachFeatureclass)) 
+                       # Get dataset count - Records copied from the source, unless counting the records after loading
+                       if (verifyCounts == "true"):
+                           datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, eachFeatureclass))
                        arcpy.AddMessage("Dataset record count - " + str(datasetCount))
                        if (enableLogging == "true"):
                            logger.info("Dataset record count - " + str(datasetCount))   
@@ -118,11 +255,16 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
                             if (enableLogging == "true"):
                                logger.info("Updating feature class - " + os.path.join(geodatabase, eachFeatureclass) + "...")
              
-                            arcpy.DeleteFeatures_management(os.path.join(geodatabase, eachFeatureclass))
-                            arcpy.Append_management(os.path.join(str(tempFolder), file), os.path.join(geodatabase, eachFeatureclass), "NO_TEST", "", "")
+                            # FUNCTION - Get the key field to match records on in incremental mode
+                            keyField = getKeyField(eachFeatureclass,[field.name for field in arcpy.ListFields(os.path.join(str(tempFolder), file))],os.path.join(geodatabase, eachFeatureclass),updateMode)
+                            # FUNCTION - Only apply the inserts, updates and deletes, unless records can't be matched on the key field
+                            if (not keyField) or (updateChangedRecords(os.path.join(str(tempFolder), file),os.path.join(geodatabase, eachFeatureclass),keyField) is None):
+                                arcpy.DeleteFeatures_management(os.path.join(geodatabase, eachFeatureclass))
+                                arcpy.Append_management(os.path.join(str(tempFolder), file), os.path.join(geodatabase, eachFeatureclass), "NO_TEST", "", "")
 
-                            # Get dataset count
-                            datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, eachFeatureclass)) 
+                            # Get dataset count - Records copied from the source, unless counting the records after loading
+                            if (verifyCounts == "true"):
+                                datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, eachFeatureclass))
                             arcpy.AddMessage("Dataset record count - " + str(datasetCount))
                             if (enableLogging == "true"):
                                logger.info("Dataset record count - " + str(datasetCount))   
@@ -155,7 +297,7 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
                        # Get count of the source dataset
                        datasetCount = arcpy.GetCount_management(eachFeatureclass)                   
                        # Check Dataset record count is more than 0
-                       if (long(str(datasetCount)) > 0):
+                       if (int(str(datasetCount)) > 0):
                            # Create a Describe object from the dataset
                            describeDataset = arcpy.Describe(eachFeatureclass)
                            # If update mode is then copy, otherwise delete and appending records                
@@ -168,8 +310,9 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
                                # Copy feature class into geodatabase using the same dataset name
                                arcpy.CopyFeatures_management(eachFeatureclass, os.path.join(geodatabase, describeDataset.name), "", "0", "0", "0")
 
-                               # Get dataset count
-                               datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, describeDataset.name)) 
+                               # Get dataset count - Records copied from the source, unless counting the records after loading
+                               if (verifyCounts == "true"):
+                                   datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, describeDataset.name))
                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
                                if (enableLogging == "true"):
                                    logger.info("Dataset record count - " + str(datasetCount))   
@@ -181,11 +324,16 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
                                     if (enableLogging == "true"):
                                        logger.info("Updating feature class - " + os.path.join(geodatabase, eachFeatureclass) + "...")
                      
-                                    arcpy.DeleteFeatures_management(os.path.join(geodatabase, eachFeatureclass))
-                                    arcpy.Append_management(os.path.join(arcpy.env.workspace, eachFeatureclass), os.path.join(geodatabase, eachFeatureclass), "NO_TEST", "", "")
+                                    # FUNCTION - Get the key field to match records on in incremental mode
+                                    keyField = getKeyField(eachFeatureclass,[field.name for field in arcpy.ListFields(eachFeatureclass)],os.path.join(geodatabase, eachFeatureclass),updateMode)
+                                    # FUNCTION - Only apply the inserts, updates and deletes, unless records can't be matched on the key field
+                                    if (not keyField) or (updateChangedRecords(os.path.join(arcpy.env.workspace, eachFeatureclass),os.path.join(geodatabase, eachFeatureclass),keyField) is None):
+                                        arcpy.DeleteFeatures_management(os.path.join(geodatabase, eachFeatureclass))
+                                        arcpy.Append_management(os.path.join(arcpy.env.workspace, eachFeatureclass), os.path.join(geodatabase, eachFeatureclass), "NO_TEST", "", "")
 
-                                    # Get dataset count
-                                    datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, eachFeatureclass)) 
+                                    # Get dataset count - Records copied from the source, unless counting the records after loading
+                                    if (verifyCounts == "true"):
+                                        datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, eachFeatureclass))
                                     arcpy.AddMessage("Dataset record count - " + str(datasetCount))
                                     if (enableLogging == "true"):
                                        logger.info("Dataset record count - " + str(datasetCount))   
@@ -211,7 +359,7 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
                        # Get count of the source dataset
                        datasetCount = arcpy.GetCount_management(eachTable)                   
                        # Check Dataset record count is more than 0
-                       if (long(str(datasetCount)) > 0):
+                       if (int(str(datasetCount)) > 0):
                            # Create a Describe object from the dataset
                            describeDataset = arcpy.Describe(eachTable)
                            # If update mode is then copy, otherwise delete and appending records                
@@ -224,8 +372,9 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
                                # Copy table into geodatabase using the same dataset name
                                arcpy.TableSelect_analysis(eachTable, os.path.join(geodatabase, describeDataset.name), "")
 
-                               # Get dataset count
-                               datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, describeDataset.name)) 
+                               # Get dataset count - Records copied from the source, unless counting the records after loading
+                               if (verifyCounts == "true"):
+                                   datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, describeDataset.name))
                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
                                if (enableLogging == "true"):
                                    logger.info("Dataset record count - " + str(datasetCount))   
@@ -237,11 +386,16 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
                                     if (enableLogging == "true"):
                                        logger.info("Updating table - " + os.path.join(geodatabase, eachTable) + "...")
 
-                                    arcpy.DeleteFeatures_management(os.path.join(geodatabase, eachTable))
-                                    arcpy.Append_management(os.path.join(arcpy.env.workspace, eachTable), os.path.join(geodatabase, eachTable), "NO_TEST", "", "")
+                                    # FUNCTION - Get the key field to match records on in incremental mode
+                                    keyField = getKeyField(eachTable,[field.name for field in arcpy.ListFields(eachTable)],os.path.join(geodatabase, eachTable),updateMode)
+                                    # FUNCTION - Only apply the inserts, updates and deletes, unless records can't be matched on the key field
+                                    if (not keyField) or (updateChangedRecords(os.path.join(arcpy.env.workspace, eachTable),os.path.join(geodatabase, eachTable),keyField) is None):
+                                        arcpy.DeleteRows_management(os.path.join(geodatabase, eachTable))
+                                        arcpy.Append_management(os.path.join(arcpy.env.workspace, eachTable), os.path.join(geodatabase, eachTable), "NO_TEST", "", "")
 
-                                    # Get dataset count
-                                    datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, eachTable)) 
+                                    # Get dataset count - Records copied from the source, unless counting the records after loading
+                                    if (verifyCounts == "true"):
+                                        datasetCount = arcpy.GetCount_management(os.path.join(geodatabase, eachTable))
                                     arcpy.AddMessage("Dataset record count - " + str(datasetCount))
                                     if (enableLogging == "true"):
                                        logger.info("Dataset record count - " + str(datasetCount))   
@@ -258,91 +412,507 @@ def mainFunction(updateFolder,fileName,updateMode,geodatabase): # Get parameters
                            arcpy.AddWarning("Dataset " + eachTable + " is empty and won't be copied...")                        
                            # Logging
                            if (enableLogging == "true"):
-                               logger.warning("Dataset " + eachTable + " is empty and won't be copied...")             
-        
-        # --------------------------------------- End of code --------------------------------------- #
-        # If called from gp tool return the arcpy parameter   
-        if __name__ == '__main__':
-            # Return the output if there is any
-            if output:
-                # If ArcGIS desktop installed
-                if (arcgisDesktop == "true"):
-                    arcpy.SetParameter(1, output)
-                # ArcGIS desktop not installed
-                else:
-                    return output 
-        # Otherwise return the result          
-        else:
-            # Return the output if there is any
-            if output:
-                return output      
+                               logger.warning("Dataset " + eachTable + " is empty and won't be copied...")
+    finally:
+        zip.close()
+        # Remove the extracted datasets from the scratch folder once loaded
+        arcpy.env.workspace = None
+        shutil.rmtree(str(tempFolder), True)
+# End of update from zip function
+
+
+# Start of watch update folder function
+def watchUpdateFolder(updateFolder,filePattern,updateMode,geodatabase):
+    # Zip files waiting to be applied in the order they arrived
+    queue = collections.deque()
+    queuedFiles = set()
+    # FUNCTION - Get the zip files that have already been applied
+    manifest = getProcessedManifest()
+    if (watchMode == "true"):
+        printMessage("Watching " + updateFolder + " for zip files every " + str(watchInterval) + " seconds...","info")
         # Logging
         if (enableLogging == "true"):
-            # Log end of process
-            logger.info("Process ended.")
-            # Remove file handler and close log file        
-            logMessage.flush()
-            logMessage.close()
-            logger.handlers = []
+            logger.info("Watching " + updateFolder + " for zip files every " + str(watchInterval) + " seconds...")
+    try:
+        while True:
+            # FUNCTION - Queue the zip files that have arrived since the last check
+            queueNewFiles(updateFolder,filePattern,manifest,queue,queuedFiles)
+            # Check for zip files that arrive while each one is applied, so they are queued in order
+            if (queue):
+                queuedFile = queue.popleft()
+                queuedFiles.discard(queuedFile["key"])
+                # FUNCTION - Apply the zip file and record it in the manifest
+                applyQueuedFile(queuedFile,len(queue),updateMode,geodatabase,manifest)
+            # All the zip files have been applied
+            elif (watchMode == "once"):
+                break
+            else:
+                time.sleep(float(watchInterval))
+    # Stop watching with Ctrl+C
+    except KeyboardInterrupt:
+        printMessage("Stopped watching " + updateFolder + " with " + str(len(queue)) + " zip files queued...","warning")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning("Stopped watching " + updateFolder + " with " + str(len(queue)) + " zip files queued...")
+# End of watch update folder function
+
+
+# Start of queue new files function
+def queueNewFiles(updateFolder,filePattern,manifest,queue,queuedFiles):
+    newFiles = []
+    for filePath in glob.glob(os.path.join(updateFolder, filePattern)):
+        # FUNCTION - Get the key for this version of the zip file
+        fileKey = getZipFileKey(filePath)
+        if (fileKey in manifest) or (fileKey in queuedFiles):
+            continue
+        # Zip files still being copied into the folder can't be opened yet
+        if not zipfile.is_zipfile(filePath):
+            continue
+        # Copying a file keeps its modified date, so the order they arrived is when they were created in the folder
+        newFiles.append({"path": filePath, "key": fileKey, "arrived": os.path.getctime(filePath), "queued": time.time()})
+
+    for newFile in sorted(newFiles, key=lambda newFile: (newFile["arrived"], newFile["path"])):
+        queue.append(newFile)
+        queuedFiles.add(newFile["key"])
+        printMessage("Queued " + os.path.basename(newFile["path"]) + " - Queue depth " + str(len(queue)) + "...","info")
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Queued " + os.path.basename(newFile["path"]) + " - Queue depth " + str(len(queue)) + "...")
+# End of queue new files function
+
+
+# Start of apply queued file function
+def applyQueuedFile(queuedFile,queueDepth,updateMode,geodatabase,manifest):
+    fileName = os.path.basename(queuedFile["path"])
+    startTime = time.time()
+    queueSeconds = round(startTime - queuedFile["queued"], 1)
+    printMessage("Applying " + fileName + " - Waited " + str(queueSeconds) + " seconds, queue depth " + str(queueDepth) + "...","info")
+    # Logging
+    if (enableLogging == "true"):
+        logger.info("Applying " + fileName + " - Waited " + str(queueSeconds) + " seconds, queue depth " + str(queueDepth) + "...")
+
+    applyFailed = False
+    errorMessage = ""
+    try:
+        # FUNCTION - Update the datasets from the zip file
+        updateFromZip(queuedFile["path"],updateMode,geodatabase)
     # If arcpy error
-    except arcpy.ExecuteError:           
-        # Build and show the error message
-        errorMessage = arcpy.GetMessages(2)   
-        printMessage(errorMessage,"error")           
+    except arcpy.ExecuteError:
+        applyFailed = True
+        errorMessage = arcpy.GetMessages(2)
+    # If python error
+    except Exception as e:
+        applyFailed = True
+        errorMessage = str(e)
+    applySeconds = round(time.time() - startTime, 1)
+
+    # Carry on watching if the zip file couldn't be applied, it is recorded as failed so it isn't applied again
+    if (applyFailed):
+        printMessage("Failed to apply " + fileName + " after " + str(applySeconds) + " seconds - " + errorMessage,"error")
         # Logging
         if (enableLogging == "true"):
-            # Log error          
-            logger.error(errorMessage)
-            # Log end of process
-            logger.info("Process ended.")            
-            # Remove file handler and close log file        
-            logMessage.flush()
-            logMessage.close()
-            logger.handlers = []   
+            logger.error("Failed to apply " + fileName + " after " + str(applySeconds) + " seconds - " + errorMessage)
         if (sendErrorEmail == "true"):
             # Send email
             sendEmail(errorMessage)
-    # If python error
-    except Exception as e:
-        errorMessage = ""         
-        # Build and show the error message
-        # If many arguments
-        if (e.args):
-            for i in range(len(e.args)):        
-                if (i == 0):
-                    # Python version check
-                    if sys.version_info[0] >= 3:
-                        # Python 3.x
-                        errorMessage = str(e.args[i]).encode('utf-8').decode('utf-8')
-                    else:
-                        # Python 2.x
-                        errorMessage = unicode(e.args[i]).encode('utf-8')
-                else:
-                    # Python version check
-                    if sys.version_info[0] >= 3:
-                        # Python 3.x
-                        errorMessage = errorMessage + " " + str(e.args[i]).encode('utf-8').decode('utf-8')
-                    else:
-                        # Python 2.x
-                        errorMessage = errorMessage + " " + unicode(e.args[i]).encode('utf-8')
-        # Else just one argument
+    else:
+        printMessage("Applied " + fileName + " in " + str(applySeconds) + " seconds...","info")
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Applied " + fileName + " in " + str(applySeconds) + " seconds...")
+
+    manifest[queuedFile["key"]] = {"file": queuedFile["path"],
+                                   "status": "Failed" if applyFailed else "Applied",
+                                   "error": errorMessage,
+                                   "applied": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                   "queueSeconds": queueSeconds,
+                                   "applySeconds": applySeconds}
+    # FUNCTION - Save the manifest
+    saveProcessedManifest(manifest)
+# End of apply queued file function
+
+
+# Start of get zip file key function
+def getZipFileKey(filePath):
+    # Path, size and modified date, so a zip file replaced with a new version is applied again
+    return os.path.normcase(os.path.abspath(filePath)) + "|" + str(os.path.getsize(filePath)) + "|" + str(int(os.path.getmtime(filePath)))
+# End of get zip file key function
+
+
+# Start of get processed manifest function
+def getProcessedManifest():
+    # If the manifest is missing the last save stopped before replacing it, so use the new manifest or otherwise the old one
+    for manifestFile in [processedManifestFile, processedManifestFile + ".part", processedManifestFile + ".bak"]:
+        if os.path.exists(manifestFile):
+            try:
+                with open(manifestFile, "r") as file:
+                    return json.load(file)
+            # If the file was only partly written
+            except ValueError:
+                continue
+    return {}
+# End of get processed manifest function
+
+
+# Start of save processed manifest function
+def saveProcessedManifest(manifest):
+    # Write to a new file and then replace the manifest, so the manifest is never half written - The old manifest is
+    # kept as a backup until the new one has replaced it
+    with open(processedManifestFile + ".part", "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+        file.flush()
+        os.fsync(file.fileno())
+    if os.path.exists(processedManifestFile + ".bak"):
+        os.remove(processedManifestFile + ".bak")
+    if os.path.exists(processedManifestFile):
+        os.rename(processedManifestFile, processedManifestFile + ".bak")
+    os.rename(processedManifestFile + ".part", processedManifestFile)
+    if os.path.exists(processedManifestFile + ".bak"):
+        os.remove(processedManifestFile + ".bak")
+# End of save processed manifest function
+
+
+# Start of extract datasets function
+def extractDatasets(zipFile,folder):
+    # Group the files in the root of the zip file into shapefiles and geodatabase folders
+    shapefileMembers = {}
+    geodatabaseMembers = {}
+    for member in zipFile.namelist():
+        memberParts = member.split("/")
+        if (len(memberParts) > 1) and (memberParts[0].lower().endswith(".gdb")):
+            geodatabaseMembers.setdefault(memberParts[0], []).append(member)
+        elif (len(memberParts) == 1):
+            baseName,extension = os.path.splitext(member)
+            shapefileMembers.setdefault(baseName, {})[extension.lower()] = member
+    shapefiles = dict([(members[".shp"], members) for members in shapefileMembers.values() if (".shp" in members)])
+
+    # Shapefiles that can be read from the zip file
+    zipShapefiles = {}
+    for shapefile in shapefiles:
+        schema = None
+        if (readShapefilesFromZip == "true"):
+            # FUNCTION - Get the shape type and fields of the shapefile
+            schema = getShapefileSchema(zipFile,shapefiles[shapefile])
+        if (schema):
+            zipShapefiles[shapefile] = schema
+        # Otherwise extract the files for the shapefile
         else:
-            errorMessage = e
-        printMessage(errorMessage,"error")
+            for member in shapefiles[shapefile].values():
+                zipFile.extract(member, folder)
+    # Extract the geodatabases
+    for geodatabase in geodatabaseMembers:
+        for member in geodatabaseMembers[geodatabase]:
+            zipFile.extract(member, folder)
+
+    datasetFiles = sorted(list(shapefiles) + list(geodatabaseMembers))
+    arcpy.AddMessage("Zip file has " + str(len(datasetFiles)) + " datasets, " + str(len(zipShapefiles)) + " shapefiles read from the zip file...")
+    # Logging
+    if (enableLogging == "true"):
+        logger.info("Zip file has " + str(len(datasetFiles)) + " datasets, " + str(len(zipShapefiles)) + " shapefiles read from the zip file...")
+    return datasetFiles,zipShapefiles
+# End of extract datasets function
+
+
+# Start of get shapefile schema function
+def getShapefileSchema(zipFile,members):
+    # Shape type, fields and number of records in a shapefile in the zip file - None if it needs to be extracted to be read
+    if (".dbf" not in members):
+        return None
+    shapeFile = zipFile.open(members[".shp"])
+    shapefileHeader = shapeFile.read(100)
+    shapeFile.close()
+    if (len(shapefileHeader) < 100) or (struct.unpack(">i", shapefileHeader[0:4])[0] != 9994):
+        return None
+    shapeType = struct.unpack("<i", shapefileHeader[32:36])[0]
+    if (shapeType not in shapefileGeometryTypes):
+        return None
+
+    # Encoding of the text from the code page file
+    encoding = shapefileEncoding
+    if (".cpg" in members):
+        codePage = zipFile.read(members[".cpg"]).decode("ascii", "ignore").strip().upper().replace("ANSI ", "")
+        if (codePage == "65001"):
+            codePage = "UTF-8"
+        elif (codePage.isdigit()):
+            codePage = "cp" + codePage
+        try:
+            encoding = codecs.lookup(codePage).name
+        except LookupError:
+            pass
+    # Projection of the shapefile
+    projection = ""
+    if (".prj" in members):
+        projection = zipFile.read(members[".prj"]).decode("utf-8", "replace").strip()
+
+    # Read the field descriptors from the dbf header
+    dbfFile = zipFile.open(members[".dbf"])
+    dbfHeader = dbfFile.read(32)
+    recordCount,headerLength,recordLength = struct.unpack("<IHH", dbfHeader[4:12])
+    fieldDescriptors = dbfFile.read(headerLength - 32)
+    dbfFile.close()
+    fields = []
+    for position in range(0, len(fieldDescriptors) - 31, 32):
+        fieldDescriptor = fieldDescriptors[position:position + 32]
+        # End of the field descriptors
+        if (fieldDescriptor[0:1] == b"\r"):
+            break
+        fieldType = fieldDescriptor[11:12].decode("ascii", "ignore").upper()
+        # Text, number, float and date fields can be read
+        if (fieldType not in ["C","N","F","D"]):
+            return None
+        fieldLength,fieldDecimals = struct.unpack("<BB", fieldDescriptor[16:18])
+        fields.append({"name": fieldDescriptor[0:11].split(b"\x00")[0].decode(encoding, "replace").strip(),
+                       "type": fieldType,
+                       "length": fieldLength,
+                       "decimals": fieldDecimals})
+    return {"members": members, "shapeType": shapeType, "fields": fields, "encoding": encoding, "projection": projection,
+            "recordCount": recordCount, "headerLength": headerLength, "recordLength": recordLength}
+# End of get shapefile schema function
+
+
+# Start of load zip shapefile function
+def loadZipShapefile(zipFile,shapefile,schema,updateMode,geodatabase):
+    eachFeatureclass = shapefile.replace(".shp","")
+    outputDataset = os.path.join(geodatabase, eachFeatureclass)
+    # Check Dataset record count is more than 0
+    if (schema["recordCount"] == 0):
+        arcpy.AddWarning("Dataset " + eachFeatureclass + " is empty and won't be copied...")
         # Logging
         if (enableLogging == "true"):
-            # Log error            
-            logger.error(errorMessage)
-            # Log end of process
-            logger.info("Process ended.")            
-            # Remove file handler and close log file        
-            logMessage.flush()
-            logMessage.close()
-            logger.handlers = []   
-        if (sendErrorEmail == "true"):
-            # Send email
-            sendEmail(errorMessage)            
-# End of main function
+            logger.warning("Dataset " + eachFeatureclass + " is empty and won't be copied...")
+        return
+
+    createDataset = "true"
+    keyField = ""
+    # If update mode is then copy, otherwise delete and appending records
+    if (updateMode == "New"):
+        # Logging
+        arcpy.AddMessage("Copying over feature class - " + outputDataset + "...")
+        if (enableLogging == "true"):
+            logger.info("Copying over feature class - " + outputDataset + "...")
+    # If dataset exists in geodatabase, delete features and load in new data
+    elif arcpy.Exists(outputDataset):
+        createDataset = "false"
+        # Logging
+        arcpy.AddMessage("Updating feature class - " + outputDataset + "...")
+        if (enableLogging == "true"):
+            logger.info("Updating feature class - " + outputDataset + "...")
+        # FUNCTION - Get the key field to match records on in incremental mode
+        keyField = getKeyField(eachFeatureclass,[arcpy.ValidateFieldName(field["name"], geodatabase) for field in schema["fields"]],outputDataset,updateMode)
+        if (not keyField):
+            arcpy.DeleteFeatures_management(outputDataset)
+    else:
+        # Log warning
+        arcpy.AddWarning("Warning: " + outputDataset + " does not exist. Copying over...")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning(outputDataset + " does not exist. Copying over...")
+
+    # Create the feature class with the same fields as the shapefile
+    if (createDataset == "true"):
+        spatialReference = None
+        if (schema["projection"]):
+            spatialReference = arcpy.SpatialReference()
+            spatialReference.loadFromString(schema["projection"])
+        arcpy.CreateFeatureclass_management(geodatabase, eachFeatureclass, shapefileGeometryTypes[schema["shapeType"]], "", "DISABLED", "DISABLED", spatialReference)
+        for field in schema["fields"]:
+            # FUNCTION - Get the type of field to add
+            fieldType = getShapefileFieldType(field)
+            fieldLength = ""
+            if (fieldType == "TEXT"):
+                fieldLength = field["length"]
+            arcpy.AddField_management(outputDataset, arcpy.ValidateFieldName(field["name"], geodatabase), fieldType, "", "", fieldLength)
+
+    # Load the shapefile fields that are in the feature class, matched on name
+    datasetFields = dict([(field.name.lower(), field.name) for field in arcpy.ListFields(outputDataset) if (field.editable) and (field.type not in ["OID","Geometry"])])
+    cursorFields = []
+    fieldIndexes = []
+    for index,field in enumerate(schema["fields"]):
+        fieldName = arcpy.ValidateFieldName(field["name"], geodatabase).lower()
+        if (fieldName in datasetFields) and (datasetFields[fieldName] not in cursorFields):
+            cursorFields.append(datasetFields[fieldName])
+            fieldIndexes.append(index)
+    # If matching records on the key field, only apply the inserts, updates and deletes
+    if (keyField):
+        # Key field first and the geometry last
+        fieldPositions = dict([(cursorField.lower(), fieldIndexes[position]) for position,cursorField in enumerate(cursorFields)])
+        updateFields = [keyField] + [cursorField for cursorField in cursorFields if (cursorField.lower() != keyField.lower())]
+        updateIndexes = [fieldPositions[updateField.lower()] for updateField in updateFields]
+        # FUNCTION - Read the records from the shapefile in the zip file
+        sourceRows = ([values[index] for index in updateIndexes] + [arcpy.AsShape(geometry, True) if geometry else None] for geometry,values in readZipShapefile(zipFile,schema))
+        # FUNCTION - Apply the inserts, updates and deletes from the shapefile records
+        changeCounts = RecordChanges.applyChanges(sourceRows,outputDataset,updateFields + ["SHAPE@"])
+        # FUNCTION - Log the number of records changed
+        logChangeCounts(changeCounts,outputDataset,keyField)
+        if (changeCounts is not None):
+            recordCount = changeCounts["inserted"] + changeCounts["updated"] + changeCounts["unchanged"]
+            # Get dataset count - Records read from the shapefile, unless counting the records after loading
+            if (verifyCounts == "true"):
+                recordCount = int(str(arcpy.GetCount_management(outputDataset)))
+            arcpy.AddMessage("Dataset record count - " + str(recordCount))
+            if (enableLogging == "true"):
+                logger.info("Dataset record count - " + str(recordCount))
+            return
+        # Records can't be matched on the key field so delete them and insert the records from the shapefile
+        arcpy.DeleteFeatures_management(outputDataset)
+
+    recordCount = 0
+    with arcpy.da.InsertCursor(outputDataset, ["SHAPE@"] + cursorFields) as insertCursor:
+        # FUNCTION - Read the records from the shapefile in the zip file
+        for geometry,values in readZipShapefile(zipFile,schema):
+            row = [None]
+            if (geometry):
+                row = [arcpy.AsShape(geometry, True)]
+            insertCursor.insertRow(row + [values[index] for index in fieldIndexes])
+            recordCount = recordCount + 1
+
+    # Get dataset count - Records inserted, unless counting the records after loading
+    if (verifyCounts == "true"):
+        recordCount = int(str(arcpy.GetCount_management(outputDataset)))
+    arcpy.AddMessage("Dataset record count - " + str(recordCount))
+    if (enableLogging == "true"):
+        logger.info("Dataset record count - " + str(recordCount))
+# End of load zip shapefile function
+
+
+# Start of get shapefile field type function
+def getShapefileFieldType(field):
+    # Same field types as copying a shapefile into a geodatabase
+    if (field["type"] == "C"):
+        return "TEXT"
+    if (field["type"] == "D"):
+        return "DATE"
+    if (field["type"] == "N") and (field["decimals"] == 0):
+        if (field["length"] <= 4):
+            return "SHORT"
+        if (field["length"] <= 9):
+            return "LONG"
+    return "DOUBLE"
+# End of get shapefile field type function
+
+
+# Start of read zip shapefile function
+def readZipShapefile(zipFile,schema):
+    # Read the geometry and attribute values of each record from the shp and dbf files as they are decompressed
+    shapeFile = zipFile.open(schema["members"][".shp"])
+    dbfFile = zipFile.open(schema["members"][".dbf"])
+    try:
+        shapeFile.read(100)
+        dbfFile.read(schema["headerLength"])
+        for recordNumber in range(schema["recordCount"]):
+            recordHeader = shapeFile.read(8)
+            if (len(recordHeader) < 8):
+                raise Exception("Shapefile " + schema["members"][".shp"] + " has fewer shapes than records...")
+            shapeContent = shapeFile.read(struct.unpack(">ii", recordHeader)[1] * 2)
+            record = dbfFile.read(schema["recordLength"])
+            # Skip records marked as deleted
+            if (record[0:1] == b"*"):
+                continue
+            # FUNCTION - Get the geometry and attribute values
+            yield getShapefileGeometry(shapeContent),getShapefileValues(record,schema)
+    finally:
+        shapeFile.close()
+        dbfFile.close()
+# End of read zip shapefile function
+
+
+# Start of get shapefile geometry function
+def getShapefileGeometry(shapeContent):
+    # Shape record to Esri JSON - None for a null shape
+    shapeType = struct.unpack("<i", shapeContent[0:4])[0]
+    if (shapeType == 1):
+        x,y = struct.unpack("<2d", shapeContent[4:20])
+        return {"x": x, "y": y}
+    if (shapeType == 8):
+        pointCount = struct.unpack("<i", shapeContent[36:40])[0]
+        coordinates = struct.unpack("<" + str(pointCount * 2) + "d", shapeContent[40:40 + (16 * pointCount)])
+        return {"points": [[coordinates[index], coordinates[index + 1]] for index in range(0, len(coordinates), 2)]}
+    if (shapeType in [3,5]):
+        partCount,pointCount = struct.unpack("<2i", shapeContent[36:44])
+        partStarts = list(struct.unpack("<" + str(partCount) + "i", shapeContent[44:44 + (4 * partCount)])) + [pointCount]
+        pointsStart = 44 + (4 * partCount)
+        coordinates = struct.unpack("<" + str(pointCount * 2) + "d", shapeContent[pointsStart:pointsStart + (16 * pointCount)])
+        points = [[coordinates[index], coordinates[index + 1]] for index in range(0, len(coordinates), 2)]
+        parts = [points[partStarts[index]:partStarts[index + 1]] for index in range(partCount)]
+        # Rings of a polygon are in the same order and direction as Esri JSON
+        if (shapeType == 5):
+            return {"rings": parts}
+        return {"paths": parts}
+    return None
+# End of get shapefile geometry function
+
+
+# Start of get shapefile values function
+def getShapefileValues(record,schema):
+    # Attribute values from a dbf record, after the deleted flag
+    values = []
+    position = 1
+    for field in schema["fields"]:
+        value = record[position:position + field["length"]]
+        position = position + field["length"]
+        if (field["type"] == "C"):
+            values.append(value.decode(schema["encoding"], "replace").rstrip(" \x00"))
+            continue
+        value = value.decode("ascii", "ignore").strip(" \x00")
+        # Dates are YYYYMMDD
+        if (field["type"] == "D"):
+            try:
+                values.append(datetime.datetime.strptime(value, "%Y%m%d"))
+            except ValueError:
+                values.append(None)
+            continue
+        # Numbers - Blank or overflowed numbers are null
+        try:
+            if (field["decimals"] == 0) and (field["type"] == "N"):
+                values.append(int(value))
+            else:
+                values.append(float(value))
+        except ValueError:
+            values.append(None)
+    return values
+# End of get shapefile values function
+
+
+# Start of get key field function
+def getKeyField(datasetName,sourceFieldNames,outputDataset,updateMode):
+    # Records are only matched on a key field in incremental mode
+    if (updateMode != "Incremental"):
+        return ""
+
+    # FUNCTION - Get the key field for the dataset
+    keyField = RecordChanges.getKeyField(datasetName,keyFields,sourceFieldNames,outputDataset)
+    if (not keyField):
+        arcpy.AddWarning("Warning: " + outputDataset + " has no key field to match records on, deleting and appending records instead...")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning(outputDataset + " has no key field to match records on, deleting and appending records instead...")
+    return keyField
+# End of get key field function
+
+
+# Start of update changed records function
+def updateChangedRecords(sourceDataset,outputDataset,keyField):
+    # FUNCTION - Apply the inserts, updates and deletes from the source records
+    changeCounts = RecordChanges.updateChangedRecords(sourceDataset,outputDataset,keyField)
+    # FUNCTION - Log the number of records changed
+    logChangeCounts(changeCounts,outputDataset,keyField)
+    return changeCounts
+# End of update changed records function
+
+
+# Start of log change counts function
+def logChangeCounts(changeCounts,outputDataset,keyField):
+    # Records couldn't be matched on the key field
+    if (changeCounts is None):
+        arcpy.AddWarning("Warning: " + outputDataset + " has null or duplicate values in the key field " + keyField + ", deleting and appending records instead...")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning(outputDataset + " has null or duplicate values in the key field " + keyField + ", deleting and appending records instead...")
+        return
+    arcpy.AddMessage("Records inserted - " + str(changeCounts["inserted"]) + ", updated - " + str(changeCounts["updated"]) + ", deleted - " + str(changeCounts["deleted"]) + ", unchanged - " + str(changeCounts["unchanged"]))
+    if (enableLogging == "true"):
+        logger.info("Records inserted - " + str(changeCounts["inserted"]) + ", updated - " + str(changeCounts["updated"]) + ", deleted - " + str(changeCounts["deleted"]) + ", unchanged - " + str(changeCounts["unchanged"]))
+# End of log change counts function
 
 
 # Start of print message function
@@ -422,6 +992,21 @@ if __name__ == '__main__':
         logger, logMessage = setLogging(logFile)
         # Log start of process
         logger.info("Process started.")
+    # Get the optional flags from the arguments e.g. --watch
+    argv = list(argv)
+    for argument in list(argv):
+        if (argument.lower() == "--watch"):
+            watchMode = "true"
+            argv.remove(argument)
+        elif (argument.lower() == "--watch-once"):
+            watchMode = "once"
+            argv.remove(argument)
+        elif (argument.lower().startswith("--watch-interval=")):
+            watchInterval = float(argument.split("=")[1])
+            argv.remove(argument)
+        elif (argument.lower().startswith("--key-fields=")):
+            keyFields = argument.split("=", 1)[1]
+            argv.remove(argument)
     # Setup the use of a proxy for requests
     if (enableProxy == "true"):
         # Setup the proxy
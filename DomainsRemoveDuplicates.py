@@ -17,6 +17,7 @@ import logging
 import smtplib
 import arcpy
 import csv
+import WorkspaceCatalog
 
 # Enable data to be overwritten
 arcpy.env.overwriteOutput = True
@@ -49,27 +50,27 @@ def mainFunction(geodatabase,configFile): # Get parameters from ArcGIS Desktop t
         
         # Get a list of the feature datasets in the database
         arcpy.env.workspace = geodatabase
-        featureDatasetList = arcpy.ListDatasets("", "Feature")
+        featureDatasetList = WorkspaceCatalog.listDatasets(geodatabase, "", "Feature")
         # FUNCTION - Get the domains for these feature datasets
         assignedDomains = assignedDomains + getDomains(geodatabase,featureDatasetList,configFile,"Feature Dataset")
         
         # Get a list of the feature classes in the database
-        featureClassList = arcpy.ListFeatureClasses()
+        featureClassList = WorkspaceCatalog.listFeatureClasses(geodatabase)
         # FUNCTION - Get the domains for these feature calsses
         assignedDomains = assignedDomains + getDomains(geodatabase,featureClassList,configFile,"Feature Class")
 
          # Get a list of the tables in the database
-        mosaicList = arcpy.ListDatasets("", "Mosaic")
+        mosaicList = WorkspaceCatalog.listDatasets(geodatabase, "", "Mosaic")
         # FUNCTION - Get the domains for these tables
         assignedDomains = assignedDomains + getDomains(geodatabase,mosaicList,configFile,"Mosaic")
 
         # Get a list of mosaic rasters in the database
-        tableList = arcpy.ListTables()
+        tableList = WorkspaceCatalog.listTables(geodatabase)
         # FUNCTION - Get the domains for these tables
-        assignedDomains = assignedDomains + getDomains(geodatabase,featureClassList,configFile,"Table")
+        assignedDomains = assignedDomains + getDomains(geodatabase,tableList,configFile,"Table")
         
         # Get a list of domains on the geodatabase
-        geodatabaseDomains = arcpy.da.ListDomains(geodatabase)      
+        geodatabaseDomains = WorkspaceCatalog.listDomains(geodatabase)
         # For each of the domains
         for domain in geodatabaseDomains:
             usedDomainCount = 0
@@ -87,7 +88,9 @@ def mainFunction(geodatabase,configFile): # Get parameters from ArcGIS Desktop t
                     # Logging
                     if (enableLogging == "true"):
                         logger.info("Removing domain " + domain.name + " as not being used...")
-                    arcpy.DeleteDomain_management(geodatabase, domain.name)              
+                    arcpy.DeleteDomain_management(geodatabase, domain.name)
+        # Domains have changed in the geodatabase
+        WorkspaceCatalog.invalidate(geodatabase)
         
         # --------------------------------------- End of code --------------------------------------- #  
             
@@ -163,7 +166,7 @@ def getDomains(geodatabase,datasetList,configFile,dataType):
         # If feature datasets
         if (dataType == "Feature Dataset"):
             # Get a list of the feature classes in the feature dataset
-            featureClassList = arcpy.ListFeatureClasses("","",dataset)
+            featureClassList = WorkspaceCatalog.listFeatureClasses(geodatabase, "", "", dataset)
 
             # Change dataset name to be just name (remove user and schema if SDE database)
             splitDataset = dataset.split('.')
@@ -181,7 +184,7 @@ def getDomains(geodatabase,datasetList,configFile,dataType):
                     sourceDatasetPath = os.path.join(geodatabase + "\\" + dataset, featureClass)
                     
                     # List fields in feature class
-                    fields = arcpy.ListFields(featureClass)
+                    fields = WorkspaceCatalog.listFields(sourceDatasetPath)
 
                     # Loop through fields
                     for field in fields:
@@ -214,7 +217,7 @@ def getDomains(geodatabase,datasetList,configFile,dataType):
                                                     logger.info("Reassigning domain on feature class " + featureClass + " from " + field.domain + " to " + originalDomain + " as it is duplicated...")
 
                                                 # Check for subtypes on the dataset
-                                                describeDataset = arcpy.Describe(featureClass)
+                                                describeDataset = WorkspaceCatalog.describe(sourceDatasetPath)
                                                 defaultSubtype = describeDataset.defaultSubtypeCode
                                                 # If a subtype exists
                                                 if (defaultSubtype != -1):
@@ -231,6 +234,7 @@ def getDomains(geodatabase,datasetList,configFile,dataType):
                                                 else:
                                                     # Re-assign domain to other domain
                                                     arcpy.AssignDomainToField_management(sourceDatasetPath, field.name, originalDomain, "")
+                                                WorkspaceCatalog.invalidate(sourceDatasetPath)
                                                 
                                         count = count + 1
                                         
@@ -243,7 +247,7 @@ def getDomains(geodatabase,datasetList,configFile,dataType):
         # If feature classes/tables/mosaics
         else:       
             # List fields in feature class
-            fields = arcpy.ListFields(dataset)
+            fields = WorkspaceCatalog.listFields(sourceDatasetPath)
 
             # Change dataset name to be just name (remove user and schema if SDE database)
             splitDataset = dataset.split('.')
@@ -283,7 +287,7 @@ def getDomains(geodatabase,datasetList,configFile,dataType):
                                                 logger.info("Reassigning domain on feature class " + dataset + " from " + field.domain + " to " + originalDomain + " as it is duplicated...")                                            
 
                                             # Check for subtypes on the dataset
-                                            describeDataset = arcpy.Describe(dataset)
+                                            describeDataset = WorkspaceCatalog.describe(sourceDatasetPath)
                                             defaultSubtype = describeDataset.defaultSubtypeCode
 
                                             # If a subtype exists
@@ -301,6 +305,7 @@ def getDomains(geodatabase,datasetList,configFile,dataType):
                                             else:
                                                 # Re-assign domain to other domain
                                                 arcpy.AssignDomainToField_management(sourceDatasetPath, field.name, originalDomain, "")
+                                            WorkspaceCatalog.invalidate(sourceDatasetPath)
                                                 
                                             domain = originalDomain
 
@@ -28,7 +28,8 @@ if (useArcPy == "true"):
 if (useArcGISAPIPython == "true"):
     # Import arcgis module
     import arcgis
-import urllib.request
+import urllib.parse
+import HTTPClient
 import json
 import tempfile
 import zipfile
@@ -71,8 +72,7 @@ emailUser = "" # Address of email sent from e.g. "name1@example.com"
 emailPassword = ""
 # Proxy
 enableProxy = "false"
-requestProtocol = "http" # http or https
-proxyURL = ""
+proxyURL = "" # Proxy for http and https requests e.g. http://proxy.example.com:8080
 # Output
 output = None
 
@@ -141,7 +141,7 @@ def mainFunction(): # Add parameters sent to the script here e.g. (var1 is 1st p
     
                 # Query web service
                 printMessage("Querying web service - " + propertyMapWebService + " at extent - " + str(row[0].extent.XMin) + "," + str(row[0].extent.YMin) + "," + str(row[0].extent.XMax) + "," + str(row[0].extent.YMax) + "...","info")
-                response = json.loads(urllib.request.urlopen(propertyMapWebService + "?" + parameters).read())
+                response = json.loads(HTTPClient.urlopen(propertyMapWebService + "?" + parameters).read())
                 
                 # Download data
                 printMessage("Downloading data - " + os.path.join(tempfile.gettempdir(), "Download.json") + "...","info")
@@ -301,7 +301,7 @@ def mainFunction(): # Add parameters sent to the script here e.g. (var1 is 1st p
 def queryPropertyCard(propertyCardWebService,propertyURL):
         # Query web service
         printMessage("Querying web service - " + propertyCardWebService.replace("%url", propertyURL) + "...","info")
-        response = json.loads(urllib.request.urlopen(propertyCardWebService.replace("%url", propertyURL)).read())
+        response = json.loads(HTTPClient.urlopen(propertyCardWebService.replace("%url", propertyURL)).read())
 
         # If there is a sale date
         if (response["card"]["date"]):
@@ -317,7 +317,7 @@ def queryPropertyCard(propertyCardWebService,propertyURL):
 def queryPropertyDetails(propertyDetailsWebService,propertyID):
         # Query web service
         printMessage("Querying web service - " + propertyDetailsWebService.replace("%id", propertyID) + "...","info")
-        response = json.loads(urllib.request.urlopen(propertyDetailsWebService.replace("%id", propertyID)).read())
+        response = json.loads(HTTPClient.urlopen(propertyDetailsWebService.replace("%id", propertyID)).read())
 
         # If there are upper and lower rental estimates
         if (response["property"]["estimated_rental_upper_value"] and response["property"]["estimated_rental_lower_value"]):
@@ -333,7 +333,7 @@ def queryPropertyDetails(propertyDetailsWebService,propertyID):
 def queryPropertySales(propertyTimelineWebService,propertyURL):
         # Query web service
         printMessage("Querying web service - " + propertyTimelineWebService.replace("%id", propertyID) + "...","info")
-        response = json.loads(urllib.request.urlopen(propertyTimelineWebService.replace("%id", propertyID)).read())
+        response = json.loads(HTTPClient.urlopen(propertyTimelineWebService.replace("%id", propertyID)).read())
         # Return data
         return response
 # End of query property sales function
@@ -440,9 +440,5 @@ if __name__ == '__main__':
         logger.info("Process started.")
     # Setup the use of a proxy for requests
     if (enableProxy == "true"):
-        # Setup the proxy
-        proxy = urllib2.ProxyHandler({requestProtocol : proxyURL})
-        openURL = urllib2.build_opener(proxy)
-        # Install the proxy
-        urllib2.install_opener(openURL)
+        HTTPClient.proxyURL = proxyURL
     mainFunction(*argv)
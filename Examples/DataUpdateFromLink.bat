@@ -1,4 +1,6 @@
 REM ----- Data Update From Link -----
+REM Only downloads and updates if the file has changed since the last update, add --force-refresh after the parameters to update anyway
+REM Update mode - "New", "Existing" or "Incremental" (only applies the inserts, updates and deletes, matched on the key field set for each dataset with --key-fields=Roads:RoadID,Parcels:ParcelID)
 c:\python27\arcgis10.2\python "C:\Development\Projects\ArcGIS Data Toolkit\DataUpdateFromLink.py" ^
  "https://dl.dropbox.com/s/5gtp2te864zd8pj/kcdc.zip?dl=1" ^
  "Existing" ^
@@ -1,4 +1,10 @@
 REM ----- Data Update From Zip -----
+REM Update mode - "New", "Existing" or "Incremental" (only applies the inserts, updates and deletes, matched on the key field set for each dataset)
+REM Optional flags (added after the parameters):
+REM	--watch - Keep running and apply each new zip file in the update folder once, in the order they arrive
+REM	--watch-once - Apply the zip files in the update folder that haven't been applied yet and stop
+REM	--watch-interval=60 - Seconds between checks of the update folder
+REM	--key-fields=Roads:RoadID,Parcels:ParcelID - Key field to match records on for each dataset in incremental mode
 c:\python27\arcgis10.2\python "C:\Development\Projects\ArcGIS Data Toolkit\DataUpdateFromZip.py" ^
  "C:\Data\Dropbox\WCRC" ^
  "Existing" ^
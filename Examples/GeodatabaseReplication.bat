@@ -3,10 +3,17 @@
 ::	Source geodatabase connection file or location
 ::	Destination geodatabase connection file or location
 ::	Option for copying datasets - "All" will copy all datasets in database or "Only From Configuration File" will only copy those listed in the configuration file
-::	Update mode - "New" will copy and overwrite any existing datasets in the destination geodatabase or "Existing" will truncate and append the datasets in the destination geodatabase
+::	Update mode - "New" will copy and overwrite any existing datasets in the destination geodatabase or "Existing" will truncate and append the datasets in the destination geodatabase or "Incremental" will only apply the inserts, updates and deletes (matched on GlobalID or the key column in the configuration file)
 ::	Location of the configuration CSV file that lists the dataset names to copy over
 ::	Exclude list - List of dataset names to exclude from copying
 :: 	Include views - "true" or "false" - Will include database views in the copying process (Views will have "vw" in the name of the dataset)
+:: Optional flags (added after the parameters):
+::	--plan-only - Print the resolved replication plan without copying any data
+::	--workers=4 - Copy datasets with a pool of worker processes
+::	--force-refresh - Copy all datasets even if they are unchanged since the last successful run
+::	--resume - Continue the last run from the first incomplete dataset if it didn't complete
+::	--staging - Load records into a staging dataset and only replace the destination once its record count matches the source
+::	--full-history - Copy the full history of archive datasets (_H) rather than only the rows added or closed since the last run
 c:\python27\arcgis10.7\python "%~dp0..\GeodatabaseReplication.py" ^
  "C:\Temp\Data\GeneralData.gdb" ^
  "C:\Temp\Scratch.gdb" ^
@@ -1,4 +1,9 @@
 REM --- Download data from Map Service ---
+REM Update mode - "New", "Existing" or "Incremental" (only downloads the records edited since the last run, needs editor tracking on the layer)
+REM Optional flags (added after the parameters):
+REM	--threads=4 - Number of pages of records to download at the same time
+REM	--layers=0,2 - Layer IDs or names to download when a service URL is given, all layers and tables are downloaded if not set
+REM To download every layer in a service, give the MapServer or FeatureServer URL and a geodatabase or feature dataset as the output
 
 c:\python27\arcgis10.3\python "T:\GIS_Data\Python\ArcGIS Data Toolkit\MapServiceDownload.py" ^
  "https://hbrcwebmap.hbrc.govt.nz/arcgis/rest/services/Hazards/HawkesBay_EarthquakeLiquefaction/MapServer/0" ^
@@ -17,6 +17,7 @@ import logging
 import smtplib
 import arcpy
 import csv
+import WorkspaceCatalog
 import xml.etree.ElementTree as ET
 from xml.etree.ElementTree import ElementTree
 
@@ -44,12 +45,12 @@ def mainFunction(geodatabase,outputFolder): # Get parameters from ArcGIS Desktop
 
         # Get a list of the feature classes and tables in the database
         arcpy.env.workspace = geodatabase
-        featureClassList = arcpy.ListFeatureClasses()
-        tableList = arcpy.ListTables()
+        featureClassList = WorkspaceCatalog.listFeatureClasses(geodatabase)
+        tableList = WorkspaceCatalog.listTables(geodatabase)
         datasetList = featureClassList + tableList
         
         # Describe the workspace
-        descWorkspace = arcpy.Describe(geodatabase)
+        descWorkspace = WorkspaceCatalog.describe(geodatabase)
         workspaceType = descWorkspace.workspaceType
 
         # Create the CSV files and setup headers
@@ -74,7 +75,7 @@ def mainFunction(geodatabase,outputFolder): # Get parameters from ArcGIS Desktop
         # For each dataset
         for dataset in datasetList:
             # Describe the dataset
-            descDataset = arcpy.Describe(dataset)
+            descDataset = WorkspaceCatalog.describe(os.path.join(geodatabase, dataset))
             datasetName = descDataset.name
             dataType = descDataset.dataType
 
@@ -135,7 +136,7 @@ def mainFunction(geodatabase,outputFolder): # Get parameters from ArcGIS Desktop
                 singleDatasetWriter.writerow(singleDatasetHeaderRow)
                 
                 # Get a list of fields
-                fields = arcpy.ListFields(dataset)
+                fields = WorkspaceCatalog.listFields(os.path.join(geodatabase, dataset))
                 
                 # Iterate through the list of fields
                 for field in fields:
@@ -143,7 +144,7 @@ def mainFunction(geodatabase,outputFolder): # Get parameters from ArcGIS Desktop
                     singleDatasetWriter.writerow(fieldInfo)
 
         # Get a list of domains on the geodatabase
-        geodatabaseDomains = arcpy.da.ListDomains(geodatabase)      
+        geodatabaseDomains = WorkspaceCatalog.listDomains(geodatabase)
         # For each of the domains
         for domain in geodatabaseDomains:
             domainName = domain.name
@@ -169,7 +170,7 @@ def mainFunction(geodatabase,outputFolder): # Get parameters from ArcGIS Desktop
 
         # Get a list of relationship classes in the geodatabase
         # For each relationship class
-        for dataset in arcpy.Describe(geodatabase).children:
+        for dataset in descWorkspace.children:
             if dataset.datatype == "RelationshipClass":    
                 rcName = dataset.name
                 rcCardinality = dataset.cardinality
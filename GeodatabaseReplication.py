@@ -1,8 +1,29 @@
 #-------------------------------------------------------------
 # Name:       Geodatabase Replication
-# Purpose:    Copies data from one geodatabase to another using a CSV file to map dataset names. Two update options:
+# Purpose:    Copies data from one geodatabase to another using a CSV file to map dataset names. Three update options:
 #             Existing Mode - Will delete and append records, so field names need to be the same.
 #             New Mode - Copies full dataset over to destination. Can set a list of dataset names to exclude.
+#             Incremental Mode - Matches records on GlobalID or the key field in the configuration file and
+#             only applies the inserts, updates and deletes, so field names need to be the same. GlobalIDs are
+#             kept when records are copied so they match in the next run, datasets with null or duplicate key
+#             values are deleted and appended.
+#             The configuration file is read once into a replication plan before any data is copied. Use
+#             --plan-only to print the plan without copying any data. Use --workers=4 to copy datasets with a
+#             pool of worker processes, datasets in the same destination feature dataset are copied by one worker.
+#             Datasets whose fingerprint (record count, schema, last edit date and sampled content hash) matches
+#             the last successful run are skipped, use --force-refresh to copy all datasets. Each step is recorded
+#             in a run journal, use --resume to continue the last run from the first incomplete dataset if it didn't
+#             complete. The update mode each dataset was copied with is journalled so the steps after it are the same.
+#             The time taken for each step of each dataset is written to a JSON lines run report and the slowest
+#             datasets are listed at the end of the log. Archive datasets (_H) are copied in full on the first
+#             sync, after that only the history rows added or closed since the last run are copied, use
+#             --full-history to copy the full history again. Use --staging to load records into a staging dataset
+#             next to the destination and check its record count before the destination is changed. In New mode
+#             the staging dataset is renamed to replace the destination, in Existing mode the destination is
+#             truncated and the staging records appended, so it is only empty between the truncate and the append.
+#             Source datasets are only counted for their fingerprint, otherwise the record count is taken from the
+#             changes applied or the fingerprint count. Set verifyCounts to true to count each dataset after it
+#             has been loaded and check the staging dataset has the same number of records as the source.
 # Author:     Shaun Weston (shaun_weston@eagle.co.nz)
 # Date Created:    10/04/2014
 # Last Updated:    09/10/2017
@@ -36,6 +57,25 @@ requestProtocol = "http" # http or https
 proxyURL = ""
 # Output
 output = None
+# Replication plan
+planOnly = "false" # Print the replication plan without copying any data - Can also be set with --plan-only on the command line
+# Skip unchanged datasets
+stateDatabase = os.path.join(os.path.dirname(__file__), "GeodatabaseReplication.sqlite") # SQLite database storing the fingerprint of each dataset from the last successful run
+skipUnchanged = "true" # Skip datasets whose fingerprint matches the last successful run
+forceRefresh = "false" # Copy all datasets regardless of their fingerprint - Can also be set with --force-refresh on the command line
+fingerprintSampleSize = 0 # Number of records to sample for a content hash in the fingerprint, 0 won't hash any records
+# Staging load
+stagingLoad = "false" # Load records into a staging dataset and only replace the destination once its record count matches the source - Can also be set with --staging on the command line
+verifyCounts = "true" # Count the records in each dataset after it has been loaded and check the staging dataset against the source before it replaces the destination, set to false to use the changes applied or the fingerprint count - Counting can be a full table scan on an enterprise geodatabase
+# Archive datasets
+fullArchiveCopy = "false" # Copy the full history of archive datasets (_H) rather than only the rows added or closed since the last run - Can also be set with --full-history on the command line
+# Run journal
+resumeRun = "false" # Continue the last run from the first incomplete dataset if it didn't complete - Can also be set with --resume on the command line
+# Parallel replication
+workerProcesses = 1 # Number of worker processes to copy datasets with, 1 copies one dataset at a time - Can also be set with --workers=4 on the command line
+# Run report
+runReportFile = os.path.join(os.path.dirname(__file__), "GeodatabaseReplication.jsonl") # JSON lines file the timings for each dataset are added to after each run, leave blank to not write a report
+slowestDatasetCount = 10 # Number of the slowest datasets to list at the end of the log
 # ArcGIS desktop installed
 arcgisDesktop = "true"
 
@@ -43,6 +83,7 @@ arcgisDesktop = "true"
 if (arcgisDesktop == "true"):
     # Import extra modules
     import arcpy
+    import WorkspaceCatalog
     # Enable data to be overwritten
     arcpy.env.overwriteOutput = True
 # Python version check
@@ -53,6 +94,14 @@ else:
     # Python 2.x
     import urllib2
 import csv
+import multiprocessing
+import hashlib
+import numbers
+import sqlite3
+import datetime
+import uuid
+import time
+import json
 
 
 # Start of main function
@@ -61,21 +110,20 @@ def mainFunction(sourceGeodatabase,destinationGeodatabase,datasetsOption,updateM
         # Convert exclude list to a list
         excludeList = excludeList.split(',')
 
-        # Get a list of the feature datasets in the database
-        arcpy.env.workspace = sourceGeodatabase
-        featureDatasetList = arcpy.ListDatasets("", "Feature")
-        # FUNCTION - Copy over these feature datasets
-        copyDatasets(sourceGeodatabase,destinationGeodatabase,datasetsOption,updateMode,configFile,excludeList,featureDatasetList,"Feature Dataset",includeViews)
+        # FUNCTION - Get the replication plan for the datasets in the source geodatabase
+        replicationPlan = getReplicationPlan(sourceGeodatabase,destinationGeodatabase,datasetsOption,configFile,excludeList,includeViews)
 
-        # Get a list of the feature classes in the database
-        featureClassList = arcpy.ListFeatureClasses()
-        # FUNCTION - Copy over these feature classes
-        copyDatasets(sourceGeodatabase,destinationGeodatabase,datasetsOption,updateMode,configFile,excludeList,featureClassList,"Feature Class",includeViews)
-
-         # Get a list of the tables in the database
-        tableList = arcpy.ListTables()
-        # FUNCTION - Copy over these tables
-        copyDatasets(sourceGeodatabase,destinationGeodatabase,datasetsOption,updateMode,configFile,excludeList,tableList,"Table",includeViews)
+        # If only showing the plan
+        if (planOnly == "true"):
+            # FUNCTION - Print the replication plan
+            printReplicationPlan(replicationPlan)
+        else:
+            # FUNCTION - Start a run in the journal or resume the last incomplete run
+            runID = startJournalRun()
+            # FUNCTION - Copy over the datasets in the plan
+            results = copyDatasets(replicationPlan,destinationGeodatabase,updateMode,runID)
+            # FUNCTION - Record the run as finished in the journal
+            finishJournalRun(runID,results)
 
         # --------------------------------------- End of code --------------------------------------- #
         # If called from gp tool return the arcpy parameter
@@ -162,425 +210,1308 @@ def mainFunction(sourceGeodatabase,destinationGeodatabase,datasetsOption,updateM
 # End of main function
 
 
-# Copy datasets function
-def copyDatasets(sourceGeodatabase,destinationGeodatabase,datasetsOption,updateMode,configFile,excludeList,datasetList,dataType,includeViews):
-    # Loop through the datasets
-    for dataset in datasetList:
-        # If feature datasets
-        if (dataType == "Feature Dataset"):
-            # Get a list of the feature classes in the feature dataset
-            dataset2List = arcpy.ListFeatureClasses("","",dataset)
-        # Feature classes and tables
+# Start of read configuration file function
+def readConfigFile(configFile):
+    # Setup dictionary of the source dataset names in the configuration file
+    configDict = {}
+
+    # Set CSV delimiter
+    csvDelimiter = ","
+    # Open the CSV file
+    # Python version check
+    if sys.version_info[0] >= 3:
+        # Python 3.x
+        csvFile = open(configFile, 'r', newline='')
+    else:
+        # Python 2.x
+        csvFile = open(configFile, 'rb')
+    with csvFile:
+        # Read the CSV file
+        rows = csv.reader(csvFile, delimiter=csvDelimiter)
+
+        # For each row in the CSV
+        count = 0
+        for row in rows:
+            # Ignore the first line containing headers
+            if (count > 0) and (len(row) >= 3):
+                # Add source dataset to dictionary - Source dataset is the dataset name or feature dataset and dataset name e.g. "Roads" or "Transport\\Roads"
+                configDict[row[0]] = {"destination": row[1],
+                                      "version": row[2],
+                                      "key": ""}
+                # Optional key field used to match records in incremental mode
+                if (len(row) >= 4):
+                    configDict[row[0]]["key"] = row[3].strip()
+            count = count + 1
+
+    return configDict
+# End of read configuration file function
+
+
+# Start of get replication plan function
+def getReplicationPlan(sourceGeodatabase,destinationGeodatabase,datasetsOption,configFile,excludeList,includeViews):
+    # If configuration provided - Read it into a dictionary once for the run
+    configDict = {}
+    if (configFile):
+        configDict = readConfigFile(configFile)
+
+    replicationPlan = []
+    # Walk the source geodatabase once to catalog the datasets in it
+    WorkspaceCatalog.walkWorkspace(sourceGeodatabase)
+    # Get a list of the feature datasets in the database
+    for featureDataset in WorkspaceCatalog.listDatasets(sourceGeodatabase, "", "Feature"):
+        # Get a list of the feature classes in the feature dataset
+        for featureClass in WorkspaceCatalog.listFeatureClasses(sourceGeodatabase, "", "", featureDataset):
+            # FUNCTION - Add the feature class to the plan
+            replicationPlan.append(getPlanEntry(sourceGeodatabase,destinationGeodatabase,datasetsOption,configDict,excludeList,includeViews,featureClass,"Feature Class",featureDataset))
+    # Get a list of the feature classes in the database
+    for featureClass in WorkspaceCatalog.listFeatureClasses(sourceGeodatabase):
+        # FUNCTION - Add the feature class to the plan
+        replicationPlan.append(getPlanEntry(sourceGeodatabase,destinationGeodatabase,datasetsOption,configDict,excludeList,includeViews,featureClass,"Feature Class",""))
+    # Get a list of the tables in the database
+    for table in WorkspaceCatalog.listTables(sourceGeodatabase):
+        # FUNCTION - Add the table to the plan
+        replicationPlan.append(getPlanEntry(sourceGeodatabase,destinationGeodatabase,datasetsOption,configDict,excludeList,includeViews,table,"Table",""))
+
+    # Logging
+    datasetsToCopy = len([planEntry for planEntry in replicationPlan if (planEntry["action"] == "Copy")])
+    printMessage("Replication plan - " + str(datasetsToCopy) + " of " + str(len(replicationPlan)) + " datasets will be copied...","info")
+    if (enableLogging == "true"):
+        logger.info("Replication plan - " + str(datasetsToCopy) + " of " + str(len(replicationPlan)) + " datasets will be copied...")
+
+    return replicationPlan
+# End of get replication plan function
+
+
+# Start of get plan entry function
+def getPlanEntry(sourceGeodatabase,destinationGeodatabase,datasetsOption,configDict,excludeList,includeViews,dataset,dataType,featureDataset):
+    # Change dataset names to be just name (remove user and schema if SDE database) - Used just for source dataset
+    datasetName = dataset.split('.')[-1]
+    featureDatasetName = featureDataset.split('.')[-1]
+
+    # If in a feature dataset
+    if (featureDataset):
+        # Setup the source and destination paths - Source needs to have full name including schema and user
+        sourceDatasetPath = os.path.join(sourceGeodatabase + "\\" + featureDataset, dataset)
+        destinationDatasetPath = os.path.join(destinationGeodatabase + "\\" + featureDatasetName, datasetName)
+        sourceName = featureDatasetName + "\\" + datasetName
+    # Feature classes and tables
+    else:
+        # Setup the source and destination paths - Source needs to have full name including schema and user
+        sourceDatasetPath = os.path.join(sourceGeodatabase, dataset)
+        destinationDatasetPath = os.path.join(destinationGeodatabase, datasetName)
+        sourceName = datasetName
+
+    planEntry = {"sourceName": sourceName,
+                 "name": datasetName,
+                 "dataType": dataType,
+                 "sourcePath": sourceDatasetPath,
+                 "destinationPath": destinationDatasetPath,
+                 "featureDataset": featureDatasetName,
+                 "inConfig": "false",
+                 "versionDataset": "false",
+                 "keyField": "",
+                 "action": "Copy",
+                 "reason": ""}
+
+    # If dataset is in config file
+    if (sourceName in configDict):
+        planEntry["inConfig"] = "true"
+        destinationDataset = configDict[sourceName]["destination"]
+        # Change the destination path
+        planEntry["destinationPath"] = os.path.join(destinationGeodatabase, destinationDataset)
+        # Check for a backslash in dataset name - If split has occured, feature dataset is necessary in destination database
+        splitDataset = destinationDataset.split('\\')
+        if (len(splitDataset) > 1):
+            planEntry["featureDataset"] = splitDataset[0]
+        else:
+            planEntry["featureDataset"] = ""
+        # If versioning the dataset
+        if (configDict[sourceName]["version"] == "yes"):
+            planEntry["versionDataset"] = "true"
+        # Key field to match records on in incremental mode
+        planEntry["keyField"] = configDict[sourceName]["key"]
+
+    # Set the path to version - Feature dataset if dataset is in one, otherwise the dataset
+    if (planEntry["featureDataset"]):
+        planEntry["versionPath"] = os.path.join(destinationGeodatabase, planEntry["featureDataset"])
+    else:
+        planEntry["versionPath"] = planEntry["destinationPath"]
+
+    # Set the archive dataset paths
+    planEntry["sourceArchivePath"] = os.path.join(sourceGeodatabase, datasetName + "_H")
+    planEntry["destinationArchivePath"] = os.path.join(destinationGeodatabase, datasetName + "_H")
+
+    # If dataset is in the excluded list
+    if (datasetName in excludeList):
+        planEntry["action"] = "Skip"
+        planEntry["reason"] = "Excluded"
+    # If not copying all datasets and dataset is not in the configuration file
+    elif ((datasetsOption != "All") and (planEntry["inConfig"] == "false")):
+        planEntry["action"] = "Skip"
+        planEntry["reason"] = "Not in configuration file"
+    # Don't include _H - archive table
+    elif (datasetName[-2:].lower() == "_h"):
+        planEntry["action"] = "Skip"
+        planEntry["reason"] = "Archive dataset"
+    # Don't include views if specified
+    elif ((("VW" in datasetName) or ("vw" in datasetName)) and (includeViews != "true")):
+        planEntry["action"] = "Skip"
+        planEntry["reason"] = "View"
+
+    return planEntry
+# End of get plan entry function
+
+
+# Start of print replication plan function
+def printReplicationPlan(replicationPlan):
+    # For each dataset in the plan
+    for planEntry in replicationPlan:
+        if (planEntry["action"] == "Copy"):
+            message = "Copy " + planEntry["dataType"].lower() + " - " + planEntry["sourcePath"] + " to " + planEntry["destinationPath"]
+            if (planEntry["versionDataset"] == "true"):
+                message = message + " (versioned - " + planEntry["versionPath"] + ")"
         else:
-            # Reassign list
-            dataset2List = datasetList
-            datasetList = []
-
-        # Change dataset name to be just name (remove user and schema if SDE database) - Used just for source dataset
-        splitDataset = dataset.split('.')
-        newDataset = splitDataset[-1]
-
-        # Store current dataset working on
-        currentDataset = newDataset
-
-        # Loop through the datasets
-        for dataset2 in dataset2List:
-            # Change feature class name to be just name (remove user and schema if SDE database) - Used just for source dataset
-            splitDataset = dataset2.split('.')
-            newDataset2 = splitDataset[-1]
-
-            # If dataset is not in the excluded list
-            if (newDataset2 not in excludeList):
-                # Set default variables
-                datasetInConfig = "false"
-                versionDataset = "false"
-                # If feature datasets
-                if (dataType == "Feature Dataset"):
-                    needFeatureDataset = "true"
-                # Feature classes and tables
+            message = "Skip " + planEntry["dataType"].lower() + " - " + planEntry["sourcePath"] + " (" + planEntry["reason"] + ")"
+        printMessage(message,"info")
+        # Logging
+        if (enableLogging == "true"):
+            logger.info(message)
+# End of print replication plan function
+
+
+# Start of copy datasets function
+def copyDatasets(replicationPlan,destinationGeodatabase,updateMode,runID):
+    results = []
+    # Log the datasets in the excluded list
+    for planEntry in replicationPlan:
+        if (planEntry["reason"] == "Excluded"):
+            printMessage("Dataset " + planEntry["name"] + " is excluded and won't be copied...","info")
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Dataset " + planEntry["name"] + " is excluded and won't be copied...")
+    datasetsToCopy = [planEntry for planEntry in replicationPlan if (planEntry["action"] == "Copy")]
+    # Walk the destination geodatabase once to catalog the datasets already in it
+    WorkspaceCatalog.walkWorkspace(destinationGeodatabase)
+
+    # If copying datasets with a pool of worker processes
+    if (int(workerProcesses) > 1):
+        # FUNCTION - Group the datasets so datasets in the same destination feature dataset are copied by the same worker
+        datasetGroups = getDatasetGroups(datasetsToCopy)
+        printMessage("Copying " + str(len(datasetsToCopy)) + " datasets in " + str(len(datasetGroups)) + " groups with " + str(workerProcesses) + " worker processes...","info")
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Copying " + str(len(datasetsToCopy)) + " datasets in " + str(len(datasetGroups)) + " groups with " + str(workerProcesses) + " worker processes...")
+
+        # If running inside ArcGIS desktop, worker processes need to be started with python rather than the application
+        if (os.path.basename(sys.executable).lower() in ["arcgispro.exe","arcmap.exe","arccatalog.exe"]):
+            multiprocessing.set_executable(os.path.join(sys.exec_prefix, "python.exe"))
+        # Start the worker processes - Each worker gets its own scratch area
+        pool = multiprocessing.Pool(int(workerProcesses), initialiseWorker, (arcpy.env.scratchFolder,forceRefresh,fullArchiveCopy,stagingLoad))
+        try:
+            # For each group of datasets as they are completed
+            for groupResults in pool.imap_unordered(copyDatasetGroup, [(datasetGroup,destinationGeodatabase,updateMode,runID) for datasetGroup in datasetGroups]):
+                for result in groupResults:
+                    # FUNCTION - Log the result from the worker
+                    logDatasetResult(result)
+                    results.append(result)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        # Loop through the datasets in the plan
+        for planEntry in datasetsToCopy:
+            datasetStartTime = time.time()
+            # FUNCTION - Copy the dataset
+            result = copyDataset(planEntry,destinationGeodatabase,updateMode,runID)
+            # FUNCTION - Add the total time taken for the dataset
+            addTiming(result,"total",datasetStartTime)
+            results.append(result)
+
+    # FUNCTION - Log a summary of the datasets copied
+    logReplicationSummary(results)
+    # FUNCTION - Write the timings for each dataset to the run report
+    writeRunReport(runID,results)
+    return results
+# End of copy datasets function
+
+
+# Start of get dataset groups function
+def getDatasetGroups(datasetsToCopy):
+    # Setup dictionary of groups keyed by destination feature dataset - Datasets not in a feature dataset are in a group of their own
+    datasetGroups = {}
+    groupOrder = []
+    for planEntry in datasetsToCopy:
+        if (planEntry["featureDataset"]):
+            groupKey = planEntry["featureDataset"].lower()
+        else:
+            groupKey = planEntry["destinationPath"].lower()
+        if (groupKey not in datasetGroups):
+            datasetGroups[groupKey] = []
+            groupOrder.append(groupKey)
+        datasetGroups[groupKey].append(planEntry)
+
+    return [datasetGroups[groupKey] for groupKey in groupOrder]
+# End of get dataset groups function
+
+
+# Start of initialise worker function
+def initialiseWorker(scratchFolder,refresh,fullHistory,staging):
+    global enableLogging
+    global forceRefresh
+    global fullArchiveCopy
+    global stagingLoad
+    # Log file is written to by the main process from the results
+    enableLogging = "false"
+    # Use the options from the main process
+    forceRefresh = refresh
+    fullArchiveCopy = fullHistory
+    stagingLoad = staging
+    # Setup a scratch area for this worker
+    workerScratchFolder = os.path.join(scratchFolder, "Worker-" + str(os.getpid()))
+    if not os.path.exists(workerScratchFolder):
+        os.makedirs(workerScratchFolder)
+    arcpy.env.scratchWorkspace = workerScratchFolder
+    arcpy.env.overwriteOutput = True
+# End of initialise worker function
+
+
+# Start of copy dataset group function
+def copyDatasetGroup(parameters):
+    datasetGroup,destinationGeodatabase,updateMode,runID = parameters
+    groupResults = []
+    # For each dataset in the group
+    for planEntry in datasetGroup:
+        datasetStartTime = time.time()
+        try:
+            # FUNCTION - Copy the dataset - This worker has its own connection to the geodatabases
+            result = copyDataset(planEntry,destinationGeodatabase,updateMode,runID)
+        # If arcpy error
+        except arcpy.ExecuteError:
+            result = {"dataset": planEntry["destinationPath"],
+                      "status": "Failed",
+                      "count": 0,
+                      "rows": 0,
+                      "timings": {},
+                      "error": arcpy.GetMessages(2)}
+        # If python error
+        except Exception as e:
+            result = {"dataset": planEntry["destinationPath"],
+                      "status": "Failed",
+                      "count": 0,
+                      "rows": 0,
+                      "timings": {},
+                      "error": " ".join([str(arg) for arg in e.args])}
+        # FUNCTION - Add the total time taken for the dataset
+        addTiming(result,"total",datasetStartTime)
+        groupResults.append(result)
+
+    return groupResults
+# End of copy dataset group function
+
+
+# Start of log dataset result function
+def logDatasetResult(result):
+    if (result["status"] == "Failed"):
+        printMessage("Dataset " + result["dataset"] + " failed - " + result["error"],"warning")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning("Dataset " + result["dataset"] + " failed - " + result["error"])
+    else:
+        # Record count isn't known if the dataset wasn't counted for the fingerprint or after loading
+        countText = str(result["count"]) + " records"
+        if (result["count"] is None):
+            countText = "records not counted"
+        printMessage("Dataset " + result["dataset"] + " " + result["status"].lower() + " - " + countText,"info")
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Dataset " + result["dataset"] + " " + result["status"].lower() + " - " + countText)
+# End of log dataset result function
+
+
+# Start of log replication summary function
+def logReplicationSummary(results):
+    # Get the number of datasets for each status
+    statusCounts = {}
+    for result in results:
+        statusCounts[result["status"]] = statusCounts.get(result["status"], 0) + 1
+    summary = "Replication summary - " + ", ".join([str(statusCounts[status]) + " " + status.lower() for status in sorted(statusCounts)])
+    if not statusCounts:
+        summary = "Replication summary - No datasets copied"
+    printMessage(summary,"info")
+    # Logging
+    if (enableLogging == "true"):
+        logger.info(summary)
+
+    # Log each of the failed datasets
+    for result in results:
+        if (result["status"] == "Failed"):
+            printMessage("Failed - " + result["dataset"] + " - " + result["error"],"warning")
+            # Logging
+            if (enableLogging == "true"):
+                logger.warning("Failed - " + result["dataset"] + " - " + result["error"])
+
+    # Log the slowest datasets
+    slowestResults = sorted(results, key=lambda result: result["timings"].get("total", 0), reverse=True)[:int(slowestDatasetCount)]
+    if (len(slowestResults) > 0):
+        printMessage("Slowest datasets...","info")
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Slowest datasets...")
+    for result in slowestResults:
+        # Get the time taken for each of the steps
+        stepTimings = ", ".join([step + " " + str(result["timings"][step]) + "s" for step in ["count","fingerprint","delete","copy","replace","archive","version"] if (step in result["timings"])])
+        message = result["dataset"] + " - " + str(result["timings"].get("total", 0)) + " seconds (" + stepTimings + ") - " + str(result["rows"]) + " rows at " + str(getRowsPerSecond(result)) + " rows per second"
+        printMessage(message,"info")
+        # Logging
+        if (enableLogging == "true"):
+            logger.info(message)
+# End of log replication summary function
+
+
+# Start of write run report function
+def writeRunReport(runID,results):
+    # If writing a run report
+    if (runReportFile):
+        # Add a line for each dataset to the report
+        with open(runReportFile, "a") as reportFile:
+            for result in results:
+                reportFile.write(json.dumps({"runID": runID,
+                                             "finished": str(datetime.datetime.now()),
+                                             "dataset": result["dataset"],
+                                             "status": result["status"],
+                                             "count": result["count"],
+                                             "rows": result["rows"],
+                                             "rowsPerSecond": getRowsPerSecond(result),
+                                             "timings": result["timings"],
+                                             "error": result["error"]}) + "\n")
+# End of write run report function
+
+
+# Start of add timing function
+def addTiming(result,step,startTime):
+    # Add the seconds taken for the step - Steps done more than once are added together
+    result["timings"][step] = round(result["timings"].get(step, 0) + (time.time() - startTime), 3)
+# End of add timing function
+
+
+# Start of get rows per second function
+def getRowsPerSecond(result):
+    # Rows copied for each second taken to delete and copy the records
+    loadTime = result["timings"].get("delete", 0) + result["timings"].get("copy", 0)
+    if (result["rows"] > 0) and (loadTime > 0):
+        return round(result["rows"] / loadTime, 1)
+    return 0
+# End of get rows per second function
+
+
+# Start of copy dataset function
+def copyDataset(planEntry,destinationGeodatabase,updateMode,runID):
+    sourceDatasetPath = planEntry["sourcePath"]
+    destinationDatasetPath = planEntry["destinationPath"]
+    result = {"dataset": destinationDatasetPath,
+              "status": "Copied",
+              "count": 0,
+              "rows": 0,
+              "timings": {},
+              "error": ""}
+
+    # If dataset is in the configuration file
+    if (planEntry["inConfig"] == "true"):
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Changing dataset name from " + sourceDatasetPath + " to " + destinationDatasetPath + "...")
+        arcpy.AddMessage("Changing dataset name from " + sourceDatasetPath + " to " + destinationDatasetPath + "...")
+
+    # FUNCTION - Get the steps already completed for this dataset if resuming a run
+    completedSteps = getJournalSteps(runID,planEntry)
+    # If dataset was completed in a previous attempt at this run
+    if ("Complete" in completedSteps):
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Dataset " + destinationDatasetPath + " was completed in a previous attempt and won't be copied...")
+        arcpy.AddMessage("Dataset " + destinationDatasetPath + " was completed in a previous attempt and won't be copied...")
+        result["status"] = "Resumed"
+        return result
+
+    # Get count of the source dataset if skipping unchanged datasets - Deleted records only change the count in the
+    # fingerprint, otherwise the count is taken from the records loaded
+    datasetCount = None
+    if (skipUnchanged == "true"):
+        stepStartTime = time.time()
+        datasetCount = WorkspaceCatalog.getCount(sourceDatasetPath)
+        result["count"] = datasetCount
+        addTiming(result,"count",stepStartTime)
+    # Check Dataset has records - Reads the first record if the dataset hasn't been counted
+    if (WorkspaceCatalog.hasRecords(sourceDatasetPath)):
+        # If skipping unchanged datasets
+        fingerprint = None
+        if (skipUnchanged == "true"):
+            stepStartTime = time.time()
+            # FUNCTION - Get the fingerprint of the source dataset
+            fingerprint = getDatasetFingerprint(sourceDatasetPath,datasetCount)
+            # If dataset hasn't been copied yet, compare the fingerprint to the last successful run
+            if ("Copy" not in completedSteps):
+                # FUNCTION - Compare the fingerprint to the last successful run
+                copyData,reason = checkDatasetFingerprint(planEntry,fingerprint)
+                addTiming(result,"fingerprint",stepStartTime)
+                # Logging
+                if (enableLogging == "true"):
+                    logger.info(copyData + " dataset - " + destinationDatasetPath + " (" + reason + ")...")
+                arcpy.AddMessage(copyData + " dataset - " + destinationDatasetPath + " (" + reason + ")...")
+                if (copyData == "Skip"):
+                    # FUNCTION - Record the dataset as completed in the journal
+                    writeJournalStep(runID,planEntry,"Complete")
+                    result["status"] = "Skipped"
+                    return result
+
+        # If dataset was copied in a previous attempt at this run
+        if ("Copy" in completedSteps):
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Dataset " + destinationDatasetPath + " was copied in a previous attempt, resuming from the next step...")
+            arcpy.AddMessage("Dataset " + destinationDatasetPath + " was copied in a previous attempt, resuming from the next step...")
+            # Use the update mode the records were copied with e.g. new if the dataset didn't exist
+            if (completedSteps["Copy"]):
+                updateMode = completedSteps["Copy"]
+        # FUNCTION - Copy the records for the dataset
+        else:
+            updateMode = copyRecords(planEntry,destinationGeodatabase,updateMode,datasetCount,result)
+            # If records failed to load, leave the dataset to be redone when resuming
+            if (result["status"] == "Failed"):
+                return result
+            # FUNCTION - Record the copy step and the update mode used in the journal
+            writeJournalStep(runID,planEntry,"Copy",updateMode)
+
+        # If creating new dataset - Copy over archive dataset (_H) too if dataset is archived
+        if (updateMode == "New") and ("Archive" not in completedSteps):
+            stepStartTime = time.time()
+            # FUNCTION - Copy over the archive dataset
+            copyArchiveDataset(planEntry,result["count"])
+            addTiming(result,"archive",stepStartTime)
+            # FUNCTION - Record the archive step in the journal
+            writeJournalStep(runID,planEntry,"Archive")
+
+        if (planEntry["versionDataset"] == "true") and ("Version" not in completedSteps):
+            # If dataset is not versioned already and update mode is new
+            datasetVersioned = WorkspaceCatalog.describe(planEntry["versionPath"]).isVersioned
+            if ((datasetVersioned == 0) and (updateMode == "New")):
+                # Logging
+                if (enableLogging == "true"):
+                    logger.info("Versioning dataset - " + planEntry["versionPath"] + "...")
+                arcpy.AddMessage("Versioning dataset - " + planEntry["versionPath"] + "...")
+                stepStartTime = time.time()
+                arcpy.RegisterAsVersioned_management(planEntry["versionPath"], "NO_EDITS_TO_BASE")
+                addTiming(result,"version",stepStartTime)
+                WorkspaceCatalog.invalidate(planEntry["versionPath"])
+            # FUNCTION - Record the version step in the journal
+            writeJournalStep(runID,planEntry,"Version")
+
+        # If dataset copied successfully, store the fingerprint for the next run
+        if (fingerprint):
+            # FUNCTION - Save the dataset fingerprint
+            saveDatasetFingerprint(planEntry,fingerprint)
+    else:
+        arcpy.AddWarning("Dataset " + destinationDatasetPath + " is empty and won't be copied...")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning("Dataset " + destinationDatasetPath + " is empty and won't be copied...")
+        result["status"] = "Empty"
+
+    # FUNCTION - Record the dataset as completed in the journal
+    writeJournalStep(runID,planEntry,"Complete")
+    return result
+# End of copy dataset function
+
+
+# Start of copy records function
+def copyRecords(planEntry,destinationGeodatabase,updateMode,datasetCount,result):
+    # Keep the GlobalIDs when copying records if they are the key used to match records in incremental mode,
+    # otherwise the destination gets new GlobalIDs and no records would match in the next incremental run
+    preserveGlobalIds = arcpy.env.preserveGlobalIds
+    describeSource = WorkspaceCatalog.describe(planEntry["sourcePath"])
+    if (getattr(describeSource, "hasGlobalID", False)) and (getKeyField(planEntry).lower() == describeSource.globalIDFieldName.lower()):
+        arcpy.env.preserveGlobalIds = True
+    try:
+        # FUNCTION - Load the records for the dataset
+        return loadRecords(planEntry,destinationGeodatabase,updateMode,datasetCount,result)
+    finally:
+        arcpy.env.preserveGlobalIds = preserveGlobalIds
+# End of copy records function
+
+
+# Start of load records function
+def loadRecords(planEntry,destinationGeodatabase,updateMode,datasetCount,result):
+    sourceDatasetPath = planEntry["sourcePath"]
+    destinationDatasetPath = planEntry["destinationPath"]
+
+    # If feature dataset is necessary in destination database and doesn't exist
+    if (planEntry["featureDataset"]) and (not WorkspaceCatalog.exists(os.path.join(destinationGeodatabase, planEntry["featureDataset"]))):
+        # Create feature dataset
+        arcpy.CreateFeatureDataset_management(destinationGeodatabase, planEntry["featureDataset"], sourceDatasetPath)
+        WorkspaceCatalog.invalidate(os.path.join(destinationGeodatabase, planEntry["featureDataset"]))
+
+    # If applying changes and dataset doesn't exist yet - Copy the full dataset over
+    if ((updateMode == "Incremental") and (not WorkspaceCatalog.exists(destinationDatasetPath))):
+        printMessage("Dataset " + destinationDatasetPath + " does not exist. Copying over...","warning")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning("Dataset " + destinationDatasetPath + " does not exist. Copying over...")
+        updateMode = "New"
+
+    # If loading into a staging dataset before replacing the destination
+    if ((stagingLoad == "true") and (updateMode != "Incremental") and (WorkspaceCatalog.exists(destinationDatasetPath))):
+        # FUNCTION - Load the records into a staging dataset and replace the destination with it
+        loadStagingDataset(planEntry,destinationGeodatabase,updateMode,datasetCount,result)
+        return updateMode
+
+    # If dataset already exists when doing a data copy
+    if ((updateMode == "New") and (WorkspaceCatalog.exists(destinationDatasetPath))):
+        # Delete the dataset first
+        stepStartTime = time.time()
+        arcpy.Delete_management(destinationDatasetPath, "FeatureClass")
+        addTiming(result,"delete",stepStartTime)
+        WorkspaceCatalog.invalidate(destinationDatasetPath)
+
+    # If only applying the changes - updateMode is Incremental
+    changeCounts = None
+    if (updateMode == "Incremental"):
+        stepStartTime = time.time()
+        # FUNCTION - Apply the inserts, updates and deletes to the destination dataset
+        changeCounts = updateChangedRecords(planEntry,destinationGeodatabase)
+        addTiming(result,"copy",stepStartTime)
+        result["status"] = "Updated"
+        # If records were matched on the key field - Otherwise the records are deleted and appended below
+        if (changeCounts is not None):
+            result["rows"] = changeCounts["inserted"] + changeCounts["updated"] + changeCounts["deleted"]
+            result["inserted"] = changeCounts["inserted"]
+            result["updated"] = changeCounts["updated"]
+            result["deleted"] = changeCounts["deleted"]
+            # FUNCTION - Get the number of records loaded - Records inserted, updated and unchanged
+            result["count"] = getLoadedCount(destinationDatasetPath,changeCounts["inserted"] + changeCounts["updated"] + changeCounts["unchanged"])
+
+    # If creating new dataset - updateMode is New
+    if (updateMode == "New"):
+        stepStartTime = time.time()
+        # If table
+        if (planEntry["dataType"] == "Table"):
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Copying over table - " + destinationDatasetPath + "...")
+            arcpy.AddMessage("Copying over table - " + destinationDatasetPath + "...")
+            # Copy over table
+            arcpy.CopyRows_management(sourceDatasetPath, destinationDatasetPath, "")
+            WorkspaceCatalog.invalidate(destinationDatasetPath)
+        # Feature classes
+        else:
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Copying over feature class - " + destinationDatasetPath + "...")
+            arcpy.AddMessage("Copying over feature class - " + destinationDatasetPath + "...")
+            # Copy over feature class
+            arcpy.CopyFeatures_management(sourceDatasetPath, destinationDatasetPath, "", "0", "0", "0")
+            WorkspaceCatalog.invalidate(destinationDatasetPath)
+        addTiming(result,"copy",stepStartTime)
+        # FUNCTION - Get the number of records loaded
+        result["count"] = getLoadedCount(destinationDatasetPath,datasetCount)
+        result["rows"] = result["count"] or 0
+        # FUNCTION - Log the dataset record count
+        logRecordCount(result["count"])
+
+    # Else refreshing existing dataset - updateMode is Existing, or Incremental if records can't be matched on the key field
+    elif (changeCounts is None):
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Loading in records for " + planEntry["dataType"].lower() + " - " + destinationDatasetPath + "...")
+        arcpy.AddMessage("Loading in records for " + planEntry["dataType"].lower() + " - " + destinationDatasetPath + "...")
+        stepStartTime = time.time()
+        # If table
+        if (planEntry["dataType"] == "Table"):
+            # Refreshing table
+            arcpy.DeleteRows_management(destinationDatasetPath)
+        # Feature classes
+        else:
+            # Refreshing feature class
+            arcpy.DeleteFeatures_management(destinationDatasetPath)
+        addTiming(result,"delete",stepStartTime)
+        # Try append in data - Catch error if there are any and continue
+        try:
+            stepStartTime = time.time()
+            arcpy.Append_management(sourceDatasetPath, destinationDatasetPath, "NO_TEST", "", "")
+            addTiming(result,"copy",stepStartTime)
+            # FUNCTION - Get the number of records loaded
+            result["count"] = getLoadedCount(destinationDatasetPath,datasetCount)
+            result["rows"] = result["count"] or 0
+            # FUNCTION - Log the dataset record count
+            logRecordCount(result["count"])
+        # If python error
+        except Exception as e:
+            errorMessage = ""
+            # Build and show the error message
+            for i in range(len(e.args)):
+                if (i == 0):
+                    errorMessage = str(e.args[i])
                 else:
-                    needFeatureDataset = "false"
+                    errorMessage = errorMessage + " " + str(e.args[i])
+            arcpy.AddError(errorMessage)
+            # Logging
+            if (enableLogging == "true"):
+                logger.warning(errorMessage)
+            result["status"] = "Failed"
+            result["error"] = errorMessage
+
+    # Return the update mode used - New if dataset had to be copied over in full
+    return updateMode
+# End of load records function
+
+
+# Start of get loaded count function
+def getLoadedCount(datasetPath,datasetCount):
+    # Count the records after loading if verifying counts, otherwise use the count known from loading or the fingerprint
+    if (verifyCounts == "true"):
+        datasetCount = int(str(arcpy.GetCount_management(datasetPath)))
+    WorkspaceCatalog.setCount(datasetPath,datasetCount)
+    return datasetCount
+# End of get loaded count function
+
+
+# Start of log record count function
+def logRecordCount(datasetCount):
+    # Count isn't known if the source wasn't counted for the fingerprint and counts aren't being verified
+    countText = "Not counted"
+    if (datasetCount is not None):
+        countText = str(datasetCount)
+    arcpy.AddMessage("Dataset record count - " + countText)
+    if (enableLogging == "true"):
+        logger.info("Dataset record count - " + countText)
+# End of log record count function
 
-                # If feature datasets
-                if (dataType == "Feature Dataset"):
-                    # Setup the source and destination paths - Source needs to have full name including schema and user
-                    sourceDatasetPath = os.path.join(sourceGeodatabase + "\\" + dataset, dataset2)
-                    destinationDatasetPath = os.path.join(destinationGeodatabase + "\\" + newDataset, newDataset2)
 
-                # Feature classes and tables
-                else:
-                    # Setup the source and destination paths - Source needs to have full name including schema and user
-                    sourceDatasetPath = os.path.join(sourceGeodatabase, dataset2)
-                    destinationDatasetPath = os.path.join(destinationGeodatabase, newDataset2)
-
-                # If configuration provided
-                if (configFile):
-                    # Set CSV delimiter
-                    csvDelimiter = ","
-                    # Look through configuration file to see if source dataset is in there
-                    # Open the CSV file
-                    with open(configFile, 'rb') as csvFile:
-                        # Read the CSV file
-                        rows = csv.reader(csvFile, delimiter=csvDelimiter)
-
-                        # For each row in the CSV
-                        count = 0
-                        for row in rows:
-                            # Ignore the first line containing headers
-                            if (count > 0):
-                                sourceDataset = row[0]
-                                destinationDataset = row[1]
-                                version = row[2]
-
-                                # If feature datasets
-                                if (dataType == "Feature Dataset"):
-                                    selectDataset = newDataset + "\\" + newDataset2
-                                # Feature classes and tables
-                                else:
-                                    selectDataset = newDataset2
-
-                                # If dataset is in config file
-                                if ((selectDataset) == sourceDataset):
-                                    datasetInConfig = "true"
-                                    # Change the destination path
-                                    destinationDatasetPath = os.path.join(destinationGeodatabase, destinationDataset)
-                                    # Logging
-                                    if (enableLogging == "true"):
-                                        logger.info("Changing dataset name from " + sourceDatasetPath + " to " + destinationDatasetPath + "...")
-                                    arcpy.AddMessage("Changing dataset name from " + sourceDatasetPath + " to " + destinationDatasetPath + "...")
-
-                                    # Check for a backslash in dataset name
-                                    splitDataset = destinationDataset.split('\\')
-                                    # If split has occured, dataset is necessary in destination database
-                                    if (len(splitDataset) > 1):
-                                        newDataset = splitDataset[0]
-                                        needFeatureDataset = "true"
-                                    else:
-                                        needFeatureDataset = "false"
-
-                                    # If versioning the dataset
-                                    if (version == "yes"):
-                                        versionDataset = "true"
-
-                            count = count + 1
-
-                # If feature dataset already exists in destination database
-                if arcpy.Exists(os.path.join(destinationGeodatabase, newDataset)):
-                    # Copy over dataset if necessary
-                    if ((datasetsOption == "All") or (datasetInConfig == "true")):
-                        # Get count of the source dataset
-                        datasetCount = arcpy.GetCount_management(sourceDatasetPath)
-                        # Check Dataset record count is more than 0
-                        if (long(str(datasetCount)) > 0):
-                            # Don't include _H - archive table
-                            if (newDataset2[-2:].lower() != "_h"):
-                                # Don't include views if specified
-                                if (("VW" not in newDataset2) and ("vw" not in newDataset2)) or ((("VW" in newDataset2) or ("vw" in newDataset2)) and (includeViews == "true")):
-                                    # If dataset already exists when doing a data copy
-                                    if ((arcpy.Exists(destinationDatasetPath)) and (updateMode == "New")):
-                                        # Delete the dataset first
-                                        arcpy.Delete_management(destinationDatasetPath, "FeatureClass")
-
-                                    # If creating new dataset - updateMode is New
-                                    if (updateMode == "New"):
-                                        # If table
-                                        if (dataType == "Table"):
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Copying over table - " + destinationDatasetPath + "...")
-                                            arcpy.AddMessage("Copying over table - " + destinationDatasetPath + "...")
-                                            # Copy over table
-                                            arcpy.CopyRows_management(sourceDatasetPath, destinationDatasetPath, "")
-                                            arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                            if (enableLogging == "true"):
-                                                logger.info("Dataset record count - " + str(datasetCount))
-
-                                            # Set the archive dataset paths
-                                            sourceArchiveDatasetPath = os.path.join(sourceGeodatabase, newDataset2 + "_H")
-                                            destinationArchiveDatasetPath = os.path.join(destinationGeodatabase, newDataset2 + "_H")
-
-                                            # Check if dataset is archived
-                                            datasetArchived =  arcpy.Exists(sourceArchiveDatasetPath)
-
-                                            if (datasetArchived == 1):
-                                                # Logging
-                                                if (enableLogging == "true"):
-                                                    logger.info("Copying over archive table - " + destinationArchiveDatasetPath + "...")
-                                                arcpy.AddMessage("Copying over archive table - " + destinationArchiveDatasetPath + "...")
-                                                # Copy over archive dataset (_H) too
-                                                arcpy.CopyRows_management(sourceArchiveDatasetPath, destinationArchiveDatasetPath, "")
-                                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                                if (enableLogging == "true"):
-                                                    logger.info("Dataset record count - " + str(datasetCount))
-
-                                        # Feature classes
-                                        else:
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Copying over feature class - " + destinationDatasetPath + "...")
-                                            arcpy.AddMessage("Copying over feature class - " + destinationDatasetPath + "...")
-                                            # Copy over feature class
-                                            arcpy.CopyFeatures_management(sourceDatasetPath, destinationDatasetPath, "", "0", "0", "0")
-                                            arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                            if (enableLogging == "true"):
-                                                logger.info("Dataset record count - " + str(datasetCount))
-
-                                            # Set the archive dataset paths
-                                            sourceArchiveDatasetPath = os.path.join(sourceGeodatabase, newDataset2 + "_H")
-                                            destinationArchiveDatasetPath = os.path.join(destinationGeodatabase, newDataset2 + "_H")
-
-                                            # Check if dataset is archived
-                                            datasetArchived =  arcpy.Exists(sourceArchiveDatasetPath)
-
-                                            if (datasetArchived == 1):
-                                                # Logging
-                                                if (enableLogging == "true"):
-                                                    logger.info("Copying over archive feature class - " + destinationArchiveDatasetPath + "...")
-                                                arcpy.AddMessage("Copying over archive feature class - " + destinationArchiveDatasetPath + "...")
-                                                # Copy over archive dataset (_H) too
-                                                arcpy.CopyFeatures_management(sourceArchiveDatasetPath, destinationArchiveDatasetPath, "", "0", "0", "0")
-                                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                                if (enableLogging == "true"):
-                                                    logger.info("Dataset record count - " + str(datasetCount))
-
-                                    # Else refreshing existing dataset - updateMode is Existing
-                                    else:
-                                        # If table
-                                        if (dataType == "Table"):
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Loading in records for table - " + destinationDatasetPath + "...")
-                                            arcpy.AddMessage("Loading in records for table - " + destinationDatasetPath + "...")
-                                            # Refreshing table
-                                            arcpy.DeleteRows_management(destinationDatasetPath)
-                                            # Try append in data - Catch error if there are any and continue
-                                            try:
-                                                arcpy.Append_management(sourceDatasetPath, destinationDatasetPath, "NO_TEST", "", "")
-                                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                                if (enableLogging == "true"):
-                                                    logger.info("Dataset record count - " + str(datasetCount))
-
-                                            # If python error
-                                            except Exception as e:
-                                                errorMessage = ""
-                                                # Build and show the error message
-                                                for i in range(len(e.args)):
-                                                    if (i == 0):
-                                                        errorMessage = str(e.args[i])
-                                                    else:
-                                                        errorMessage = errorMessage + " " + str(e.args[i])
-                                                arcpy.AddError(errorMessage)
-                                                logger.warning(errorMessage)
-
-                                        # Feature classes
-                                        else:
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Loading in records for feature class - " + destinationDatasetPath + "...")
-                                            arcpy.AddMessage("Loading in records for feature class - " + destinationDatasetPath + "...")
-                                            # Refreshing feature class
-                                            arcpy.DeleteFeatures_management(destinationDatasetPath)
-                                            # Try append in data - Catch error if there are any and continue
-                                            try:
-                                                arcpy.Append_management(sourceDatasetPath, destinationDatasetPath, "NO_TEST", "", "")
-                                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                                if (enableLogging == "true"):
-                                                    logger.info("Dataset record count - " + str(datasetCount))
-
-                                            # If python error
-                                            except Exception as e:
-                                                errorMessage = ""
-                                                # Build and show the error message
-                                                for i in range(len(e.args)):
-                                                    if (i == 0):
-                                                        errorMessage = str(e.args[i])
-                                                    else:
-                                                        errorMessage = errorMessage + " " + str(e.args[i])
-                                                arcpy.AddError(errorMessage)
-                                                logger.warning(errorMessage)
-
-                                    if (versionDataset == "true"):
-                                        # If dataset is not versioned already and update mode is new - Feature dataset
-                                        datasetVersioned = arcpy.Describe(os.path.join(destinationGeodatabase, dataset)).isVersioned
-                                        if ((datasetVersioned == 0) and (updateMode == "New")):
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Versioning dataset - " + os.path.join(destinationGeodatabase, newDataset) + "...")
-                                            arcpy.AddMessage("Versioning dataset - " + os.path.join(destinationGeodatabase, newDataset) + "...")
-                                            arcpy.RegisterAsVersioned_management(os.path.join(destinationGeodatabase, newDataset), "NO_EDITS_TO_BASE")
-                        else:
-                            arcpy.AddWarning("Dataset " + destinationDatasetPath + " is empty and won't be copied...")
-                            # Logging
-                            if (enableLogging == "true"):
-                                logger.warning("Dataset " + destinationDatasetPath + " is empty and won't be copied...")
-
-
-                # Otherwise
+# Start of load staging dataset function
+def loadStagingDataset(planEntry,destinationGeodatabase,updateMode,datasetCount,result):
+    sourceDatasetPath = planEntry["sourcePath"]
+    destinationDatasetPath = planEntry["destinationPath"]
+    # Staging dataset is next to the destination dataset
+    stagingDatasetPath = destinationDatasetPath + "_STAGING"
+
+    try:
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Loading records into staging " + planEntry["dataType"].lower() + " - " + stagingDatasetPath + "...")
+        arcpy.AddMessage("Loading records into staging " + planEntry["dataType"].lower() + " - " + stagingDatasetPath + "...")
+        stepStartTime = time.time()
+        # If table
+        if (planEntry["dataType"] == "Table"):
+            arcpy.CopyRows_management(sourceDatasetPath, stagingDatasetPath, "")
+        # Feature classes
+        else:
+            arcpy.CopyFeatures_management(sourceDatasetPath, stagingDatasetPath, "", "0", "0", "0")
+        WorkspaceCatalog.invalidate(stagingDatasetPath)
+        addTiming(result,"copy",stepStartTime)
+
+        # Check all the records were loaded before replacing the destination - Source is counted if it wasn't for the fingerprint
+        stagingCount = datasetCount
+        if (verifyCounts == "true"):
+            datasetCount = WorkspaceCatalog.getCount(sourceDatasetPath)
+            stagingCount = int(str(arcpy.GetCount_management(stagingDatasetPath)))
+            if (stagingCount != datasetCount):
+                raise Exception("Staging dataset " + stagingDatasetPath + " has " + str(stagingCount) + " records but the source has " + str(datasetCount) + ", destination has not been changed")
+
+        stepStartTime = time.time()
+        # If creating new dataset - Swap by replacing the destination with the staging dataset
+        if (updateMode == "New"):
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Renaming staging " + planEntry["dataType"].lower() + " to " + destinationDatasetPath + "...")
+            arcpy.AddMessage("Renaming staging " + planEntry["dataType"].lower() + " to " + destinationDatasetPath + "...")
+            arcpy.Delete_management(destinationDatasetPath)
+            arcpy.Rename_management(stagingDatasetPath, destinationDatasetPath)
+            WorkspaceCatalog.invalidate(destinationDatasetPath)
+            WorkspaceCatalog.invalidate(stagingDatasetPath)
+            WorkspaceCatalog.setCount(destinationDatasetPath,stagingCount)
+        # Refreshing existing dataset - Not a swap, the destination is emptied and the checked staging records appended, so the
+        # destination is only empty between the truncate and the append
+        else:
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Replacing records in " + planEntry["dataType"].lower() + " with the staging records - " + destinationDatasetPath + "...")
+            arcpy.AddMessage("Replacing records in " + planEntry["dataType"].lower() + " with the staging records - " + destinationDatasetPath + "...")
+            # Truncate doesn't log each deleted row, but can't be used on versioned data
+            if (WorkspaceCatalog.describe(destinationDatasetPath).isVersioned):
+                if (planEntry["dataType"] == "Table"):
+                    arcpy.DeleteRows_management(destinationDatasetPath)
                 else:
-                    # Copy over dataset if necessary
-                    if ((datasetsOption == "All") or (datasetInConfig == "true")):
-                        # Get count of the source dataset
-                        datasetCount = arcpy.GetCount_management(sourceDatasetPath)
-                        # Check Dataset record count is more than 0
-                        if (long(str(datasetCount)) > 0):
-                            # Don't include _H - archive table
-                            if (newDataset2[-2:].lower() != "_h"):
-                                # Don't include views if specified
-                                if (("VW" not in newDataset2) and ("vw" not in newDataset2)) or ((("VW" in newDataset2) or ("vw" in newDataset2)) and (includeViews == "true")):
-                                    # If feature dataset is necessary in destination database
-                                    if (needFeatureDataset == "true"):
-                                        # Create feature dataset
-                                        arcpy.CreateFeatureDataset_management(destinationGeodatabase, newDataset, sourceDatasetPath)
-
-                                    # If creating new dataset - updateMode is New
-                                    if (updateMode == "New"):
-                                        # If table
-                                        if (dataType == "Table"):
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Copying over table - " + destinationDatasetPath + "...")
-                                            arcpy.AddMessage("Copying over table - " + destinationDatasetPath + "...")
-                                            # Copy over table
-                                            arcpy.CopyRows_management(sourceDatasetPath, destinationDatasetPath, "")
-                                            arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                            if (enableLogging == "true"):
-                                                logger.info("Dataset record count - " + str(datasetCount))
-
-                                            # Set the archive dataset paths
-                                            sourceArchiveDatasetPath = os.path.join(sourceGeodatabase, newDataset2 + "_H")
-                                            destinationArchiveDatasetPath = os.path.join(destinationGeodatabase, newDataset2 + "_H")
-
-                                            # Check if dataset is archived
-                                            datasetArchived =  arcpy.Exists(sourceArchiveDatasetPath)
-
-                                            if (datasetArchived == 1):
-                                                # Logging
-                                                if (enableLogging == "true"):
-                                                    logger.info("Copying over archive table - " + destinationArchiveDatasetPath + "...")
-                                                arcpy.AddMessage("Copying over archive table - " + destinationArchiveDatasetPath + "...")
-                                                # Copy over archive dataset (_H) too
-                                                arcpy.CopyRows_management(sourceArchiveDatasetPath, destinationArchiveDatasetPath, "")
-                                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                                if (enableLogging == "true"):
-                                                    logger.info("Dataset record count - " + str(datasetCount))
-
-                                        # Feature classes
-                                        else:
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Copying over feature class - " + destinationDatasetPath + "...")
-                                            arcpy.AddMessage("Copying over feature class - " + destinationDatasetPath + "...")
-                                            # Copy over feature class
-                                            arcpy.CopyFeatures_management(sourceDatasetPath, destinationDatasetPath, "", "0", "0", "0")
-                                            arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                            if (enableLogging == "true"):
-                                                logger.info("Dataset record count - " + str(datasetCount))
-
-                                            # Set the archive dataset paths
-                                            sourceArchiveDatasetPath = os.path.join(sourceGeodatabase, newDataset2 + "_H")
-                                            destinationArchiveDatasetPath = os.path.join(destinationGeodatabase, newDataset2 + "_H")
-
-                                            # Check if dataset is archived
-                                            datasetArchived =  arcpy.Exists(sourceArchiveDatasetPath)
-
-                                            if (datasetArchived == 1):
-                                                # Logging
-                                                if (enableLogging == "true"):
-                                                    logger.info("Copying over archive feature class - " + destinationArchiveDatasetPath + "...")
-                                                arcpy.AddMessage("Copying over archive feature class - " + destinationArchiveDatasetPath + "...")
-                                                # Copy over archive dataset (_H) too
-                                                arcpy.CopyFeatures_management(sourceArchiveDatasetPath, destinationArchiveDatasetPath, "", "0", "0", "0")
-                                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                                if (enableLogging == "true"):
-                                                    logger.info("Dataset record count - " + str(datasetCount))
-
-                                    # Else refreshing existing dataset - updateMode is Existing
-                                    else:
-                                        # If table
-                                        if (dataType == "Table"):
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Loading in records for table - " + destinationDatasetPath + "...")
-                                            arcpy.AddMessage("Loading in records for table - " + destinationDatasetPath + "...")
-                                            # Refreshing table
-                                            arcpy.DeleteRows_management(destinationDatasetPath)
-                                            # Try append in data - Catch error if there are any and continue
-                                            try:
-                                                arcpy.Append_management(sourceDatasetPath, destinationDatasetPath, "NO_TEST", "", "")
-                                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                                if (enableLogging == "true"):
-                                                    logger.info("Dataset record count - " + str(datasetCount))
-
-                                            # If python error
-                                            except Exception as e:
-                                                errorMessage = ""
-                                                # Build and show the error message
-                                                for i in range(len(e.args)):
-                                                    if (i == 0):
-                                                        errorMessage = str(e.args[i])
-                                                    else:
-                                                        errorMessage = errorMessage + " " + str(e.args[i])
-                                                arcpy.AddError(errorMessage)
-                                                logger.warning(errorMessage)
-
-                                        # Feature classes
-                                        else:
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Loading in records for feature class - " + destinationDatasetPath + "...")
-                                            arcpy.AddMessage("Loading in records for feature class - " + destinationDatasetPath + "...")
-                                            # Refreshing feature class
-                                            arcpy.DeleteFeatures_management(destinationDatasetPath)
-                                            # Try append in data - Catch error if there are any and continue
-                                            try:
-                                                arcpy.Append_management(sourceDatasetPath, destinationDatasetPath, "NO_TEST", "", "")
-                                                arcpy.AddMessage("Dataset record count - " + str(datasetCount))
-                                                if (enableLogging == "true"):
-                                                    logger.info("Dataset record count - " + str(datasetCount))
-
-                                            # If python error
-                                            except Exception as e:
-                                                errorMessage = ""
-                                                # Build and show the error message
-                                                for i in range(len(e.args)):
-                                                    if (i == 0):
-                                                        errorMessage = str(e.args[i])
-                                                    else:
-                                                        errorMessage = errorMessage + " " + str(e.args[i])
-                                                arcpy.AddError(errorMessage)
-                                                logger.warning(errorMessage)
-
-                                    if (versionDataset == "true"):
-                                        # If feature dataset has been created - Set path to that
-                                        if (needFeatureDataset == "true"):
-                                            datasetPath = os.path.join(destinationGeodatabase, newDataset)
-                                        # Otherwise - Set path to feature class
-                                        else:
-                                            datasetPath = destinationDatasetPath
-
-                                        # If dataset is not versioned already and update mode is new
-                                        datasetVersioned = arcpy.Describe(datasetPath).isVersioned
-                                        if ((datasetVersioned == 0) and (updateMode == "New")):
-                                            # Logging
-                                            if (enableLogging == "true"):
-                                                logger.info("Versioning dataset - " + datasetPath + "...")
-                                            arcpy.AddMessage("Versioning dataset - " + datasetPath + "...")
-                                            arcpy.RegisterAsVersioned_management(datasetPath, "NO_EDITS_TO_BASE")
-                        else:
-                            arcpy.AddWarning("Dataset " + destinationDatasetPath + " is empty and won't be copied...")
-                            # Logging
-                            if (enableLogging == "true"):
-                                logger.warning("Dataset " + destinationDatasetPath + " is empty and won't be copied...")
-
-                # Change dataset name back to current dataset
-                newDataset = currentDataset
-                versionDataset = "false"
-            # Dataset is in the excluded list
+                    arcpy.DeleteFeatures_management(destinationDatasetPath)
+            else:
+                arcpy.TruncateTable_management(destinationDatasetPath)
+            arcpy.Append_management(stagingDatasetPath, destinationDatasetPath, "NO_TEST", "", "")
+            arcpy.Delete_management(stagingDatasetPath)
+            WorkspaceCatalog.invalidate(stagingDatasetPath)
+            WorkspaceCatalog.setCount(destinationDatasetPath,stagingCount)
+        addTiming(result,"replace",stepStartTime)
+        result["count"] = stagingCount
+        result["rows"] = stagingCount or 0
+        # FUNCTION - Log the dataset record count
+        logRecordCount(stagingCount)
+    # If python error
+    except Exception as e:
+        errorMessage = " ".join([str(arg) for arg in e.args])
+        arcpy.AddError(errorMessage)
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning(errorMessage)
+        result["status"] = "Failed"
+        result["error"] = errorMessage
+        # Remove the staging dataset, the destination is left as it was
+        WorkspaceCatalog.invalidate(stagingDatasetPath)
+        if (WorkspaceCatalog.exists(stagingDatasetPath)):
+            arcpy.Delete_management(stagingDatasetPath)
+            WorkspaceCatalog.invalidate(stagingDatasetPath)
+# End of load staging dataset function
+
+
+# Start of copy archive dataset function
+def copyArchiveDataset(planEntry,datasetCount):
+    sourceArchiveDatasetPath = planEntry["sourceArchivePath"]
+    destinationArchiveDatasetPath = planEntry["destinationArchivePath"]
+
+    # Check if dataset is archived
+    datasetArchived = WorkspaceCatalog.exists(sourceArchiveDatasetPath)
+    if (datasetArchived == 1):
+        # FUNCTION - Get the archive dates copied over in the last run
+        watermark = getArchiveWatermark(planEntry)
+        # Copy the full history on the first sync or if requested
+        copyFullHistory = (fullArchiveCopy == "true") or (not watermark) or (not WorkspaceCatalog.exists(destinationArchiveDatasetPath))
+        if (not copyFullHistory):
+            # FUNCTION - Copy over the archive rows added or closed since the last run
+            copyFullHistory = not updateArchiveRecords(planEntry,watermark)
+
+        if (copyFullHistory):
+            # If table
+            if (planEntry["dataType"] == "Table"):
+                # Logging
+                if (enableLogging == "true"):
+                    logger.info("Copying over archive table - " + destinationArchiveDatasetPath + "...")
+                arcpy.AddMessage("Copying over archive table - " + destinationArchiveDatasetPath + "...")
+                # Copy over archive dataset (_H) too
+                arcpy.CopyRows_management(sourceArchiveDatasetPath, destinationArchiveDatasetPath, "")
+                WorkspaceCatalog.invalidate(destinationArchiveDatasetPath)
+            # Feature classes
             else:
-                printMessage("Dataset " + newDataset2 + " is excluded and won't be copied...","info")
                 # Logging
                 if (enableLogging == "true"):
-                    logger.info("Dataset " + newDataset2 + " is excluded and won't be copied...")
+                    logger.info("Copying over archive feature class - " + destinationArchiveDatasetPath + "...")
+                arcpy.AddMessage("Copying over archive feature class - " + destinationArchiveDatasetPath + "...")
+                # Copy over archive dataset (_H) too
+                arcpy.CopyFeatures_management(sourceArchiveDatasetPath, destinationArchiveDatasetPath, "", "0", "0", "0")
+                WorkspaceCatalog.invalidate(destinationArchiveDatasetPath)
+            # FUNCTION - Log the dataset record count
+            logRecordCount(datasetCount)
+
+        # FUNCTION - Store the archive dates copied over for the next run
+        saveArchiveWatermark(planEntry)
+# End of copy archive dataset function
+
+
+# Start of update archive records function
+def updateArchiveRecords(planEntry,watermark):
+    sourceArchiveDatasetPath = planEntry["sourceArchivePath"]
+    destinationArchiveDatasetPath = planEntry["destinationArchivePath"]
+    # Archive rows that are still current have a to date of 31/12/9999
+    openDate = datetime.datetime(9999, 12, 31)
+
+    # Archive rows are matched on the object ID of the base dataset and the from date
+    keyField = WorkspaceCatalog.describe(planEntry["sourcePath"]).OIDFieldName
+    destinationFields = [field.name.lower() for field in WorkspaceCatalog.listFields(destinationArchiveDatasetPath) if (field.type != "OID")]
+    # FUNCTION - Get the fields in both archive datasets
+    compareFields = getCompareFields(sourceArchiveDatasetPath,destinationArchiveDatasetPath,keyField)
+    insertFields = [keyField] + compareFields
+    if (planEntry["dataType"] != "Table"):
+        insertFields.append("SHAPE@")
+    lowerInsertFields = [field.lower() for field in insertFields]
+    # If the fields to match on are not in the destination, the full history needs to be copied
+    if (keyField.lower() not in destinationFields) or ("gdb_from_date" not in lowerInsertFields) or ("gdb_to_date" not in lowerInsertFields):
+        printMessage("Archive dataset " + destinationArchiveDatasetPath + " does not have the " + keyField + ", GDB_FROM_DATE and GDB_TO_DATE fields to match rows on, copying the full history...","warning")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning("Archive dataset " + destinationArchiveDatasetPath + " does not have the " + keyField + ", GDB_FROM_DATE and GDB_TO_DATE fields to match rows on, copying the full history...")
+        return False
+    fromDateIndex = lowerInsertFields.index("gdb_from_date")
+
+    # Logging
+    if (enableLogging == "true"):
+        logger.info("Copying over archive rows since " + str(watermark["fromDate"]) + " - " + destinationArchiveDatasetPath + "...")
+    arcpy.AddMessage("Copying over archive rows since " + str(watermark["fromDate"]) + " - " + destinationArchiveDatasetPath + "...")
+
+    # Get the rows copied in previous runs that have been closed since - Dates are compared to the second as databases store them to different precisions
+    closedRecords = {}
+    closedQuery = getDateQuery(sourceArchiveDatasetPath,"GDB_TO_DATE","<",openDate)
+    if (watermark["toDate"]):
+        closedQuery = closedQuery + " AND " + getDateQuery(sourceArchiveDatasetPath,"GDB_TO_DATE",">=",watermark["toDate"])
+    with arcpy.da.SearchCursor(sourceArchiveDatasetPath, [keyField,"GDB_FROM_DATE","GDB_TO_DATE"], closedQuery) as searchCursor:
+        for row in searchCursor:
+            if (row[1].replace(microsecond=0) <= watermark["fromDate"]):
+                closedRecords[(row[0], row[1].replace(microsecond=0))] = row[2]
+    # Close the rows in the destination
+    closedCount = 0
+    if (len(closedRecords) > 0):
+        with arcpy.da.UpdateCursor(destinationArchiveDatasetPath, [keyField,"GDB_FROM_DATE","GDB_TO_DATE"], getDateQuery(destinationArchiveDatasetPath,"GDB_TO_DATE",">=",openDate)) as updateCursor:
+            for row in updateCursor:
+                if ((row[0], row[1].replace(microsecond=0)) in closedRecords):
+                    row[2] = closedRecords[(row[0], row[1].replace(microsecond=0))]
+                    updateCursor.updateRow(row)
+                    closedCount = closedCount + 1
+
+    # Get the rows already in the destination from the last second of the last run, so they aren't added twice
+    existingRecords = set()
+    with arcpy.da.SearchCursor(destinationArchiveDatasetPath, [keyField,"GDB_FROM_DATE"], getDateQuery(destinationArchiveDatasetPath,"GDB_FROM_DATE",">=",watermark["fromDate"])) as searchCursor:
+        for row in searchCursor:
+            existingRecords.add((row[0], row[1].replace(microsecond=0)))
+    # Add the rows created since the last run
+    insertCount = 0
+    with arcpy.da.SearchCursor(sourceArchiveDatasetPath, insertFields, getDateQuery(sourceArchiveDatasetPath,"GDB_FROM_DATE",">=",watermark["fromDate"])) as searchCursor:
+        with arcpy.da.InsertCursor(destinationArchiveDatasetPath, insertFields) as insertCursor:
+            for row in searchCursor:
+                if ((row[0], row[fromDateIndex].replace(microsecond=0)) not in existingRecords):
+                    insertCursor.insertRow(row)
+                    insertCount = insertCount + 1
+
+    arcpy.AddMessage("Archive rows added - " + str(insertCount) + ", closed - " + str(closedCount))
+    if (enableLogging == "true"):
+        logger.info("Archive rows added - " + str(insertCount) + ", closed - " + str(closedCount))
+    return True
+# End of update archive records function
+
+
+# Start of get date query function
+def getDateQuery(datasetPath,fieldName,operator,dateValue):
+    # Date format depends on the type of database the dataset is in
+    dateString = dateValue.strftime("%Y-%m-%d %H:%M:%S")
+    describeWorkspace = WorkspaceCatalog.describe(os.path.dirname(datasetPath))
+    # If enterprise geodatabase
+    if (getattr(describeWorkspace, "workspaceType", "") == "RemoteDatabase"):
+        databaseClient = str(getattr(describeWorkspace.connectionProperties, "dbclient", "")).lower()
+        if ("oracle" in databaseClient):
+            dateString = "TIMESTAMP '" + dateString + "'"
+        else:
+            dateString = "'" + dateString + "'"
+    # File geodatabase
+    else:
+        dateString = "date '" + dateString + "'"
+
+    return arcpy.AddFieldDelimiters(datasetPath, fieldName) + " " + operator + " " + dateString
+# End of get date query function
+
+
+# Start of get archive watermark function
+def getArchiveWatermark(planEntry):
+    connection = getStateConnection()
+    try:
+        lastWatermark = connection.execute("SELECT FromDate, ToDate FROM ArchiveWatermarks WHERE Source = ? AND Destination = ?", (planEntry["sourceArchivePath"], planEntry["destinationArchivePath"])).fetchone()
+    finally:
+        connection.close()
+
+    # If archive dataset hasn't been copied before
+    if not lastWatermark:
+        return None
+    watermark = {"fromDate": datetime.datetime.strptime(lastWatermark[0], "%Y-%m-%d %H:%M:%S"),
+                 "toDate": None}
+    if (lastWatermark[1]):
+        watermark["toDate"] = datetime.datetime.strptime(lastWatermark[1], "%Y-%m-%d %H:%M:%S")
+    return watermark
+# End of get archive watermark function
+
+
+# Start of save archive watermark function
+def saveArchiveWatermark(planEntry):
+    destinationArchiveDatasetPath = planEntry["destinationArchivePath"]
+    # Archive rows that are still current have a to date of 31/12/9999
+    openDate = datetime.datetime(9999, 12, 31)
+
+    # Get the latest from date and the latest to date of the closed rows in the destination
+    watermarkDates = []
+    for fieldName,whereClause in [("GDB_FROM_DATE",None),("GDB_TO_DATE",getDateQuery(destinationArchiveDatasetPath,"GDB_TO_DATE","<",openDate))]:
+        watermarkDate = None
+        with arcpy.da.SearchCursor(destinationArchiveDatasetPath, [fieldName], whereClause, sql_clause=(None, "ORDER BY " + fieldName + " DESC")) as searchCursor:
+            for row in searchCursor:
+                if (row[0]):
+                    watermarkDate = row[0].strftime("%Y-%m-%d %H:%M:%S")
+                break
+        watermarkDates.append(watermarkDate)
+
+    # If there are no rows in the archive dataset
+    if not watermarkDates[0]:
+        return
+    connection = getStateConnection()
+    try:
+        connection.execute("INSERT OR REPLACE INTO ArchiveWatermarks VALUES (?, ?, ?, ?, ?)", (planEntry["sourceArchivePath"], destinationArchiveDatasetPath, watermarkDates[0], watermarkDates[1], str(datetime.datetime.now())))
+        connection.commit()
+    finally:
+        connection.close()
+# End of save archive watermark function
+
+
+# Start of get state connection function
+def getStateConnection():
+    # Connect to the state database - Timeout allows for worker processes writing at the same time
+    connection = sqlite3.connect(stateDatabase, timeout=60)
+    # Create the tables if they don't exist
+    connection.execute("CREATE TABLE IF NOT EXISTS Fingerprints (Source TEXT, Destination TEXT, RecordCount INTEGER, SchemaHash TEXT, EditDate TEXT, ContentHash TEXT, Updated TEXT, PRIMARY KEY (Source, Destination))")
+    connection.execute("CREATE TABLE IF NOT EXISTS Runs (RunID TEXT PRIMARY KEY, Started TEXT, Finished TEXT, Status TEXT)")
+    connection.execute("CREATE TABLE IF NOT EXISTS Journal (RunID TEXT, Source TEXT, Destination TEXT, Step TEXT, Updated TEXT, UpdateMode TEXT, PRIMARY KEY (RunID, Source, Destination, Step))")
+    # Add the update mode to journals created before it was recorded
+    if ("UpdateMode" not in [row[1] for row in connection.execute("PRAGMA table_info(Journal)").fetchall()]):
+        connection.execute("ALTER TABLE Journal ADD COLUMN UpdateMode TEXT")
+    connection.execute("CREATE TABLE IF NOT EXISTS ArchiveWatermarks (Source TEXT, Destination TEXT, FromDate TEXT, ToDate TEXT, Updated TEXT, PRIMARY KEY (Source, Destination))")
+    return connection
+# End of get state connection function
+
+
+# Start of start journal run function
+def startJournalRun():
+    connection = getStateConnection()
+    try:
+        # If resuming, get the last run if it didn't complete - A run that didn't complete before the last complete run isn't resumed
+        if (resumeRun == "true"):
+            lastRun = connection.execute("SELECT RunID, Status FROM Runs ORDER BY Started DESC LIMIT 1").fetchone()
+            if (lastRun) and (lastRun[1] != "Complete"):
+                # Logging
+                if (enableLogging == "true"):
+                    logger.info("Resuming run " + lastRun[0] + "...")
+                printMessage("Resuming run " + lastRun[0] + "...","info")
+                connection.execute("UPDATE Runs SET Status = 'Running' WHERE RunID = ?", (lastRun[0],))
+                connection.commit()
+                return lastRun[0]
+            printMessage("No incomplete run to resume, starting a new run...","warning")
+            # Logging
+            if (enableLogging == "true"):
+                logger.warning("No incomplete run to resume, starting a new run...")
+
+        # Start a new run
+        runID = datetime.datetime.now().strftime("%Y%m%d%H%M%S") + "-" + str(uuid.uuid1())[:8]
+        connection.execute("INSERT INTO Runs VALUES (?, ?, NULL, 'Running')", (runID, str(datetime.datetime.now())))
+        connection.commit()
+    finally:
+        connection.close()
+
+    return runID
+# End of start journal run function
+
+
+# Start of finish journal run function
+def finishJournalRun(runID,results):
+    # Run is complete if every dataset was done, otherwise it can be resumed
+    status = "Complete"
+    if ([result for result in results if (result["status"] == "Failed")]):
+        status = "Incomplete"
+    connection = getStateConnection()
+    try:
+        connection.execute("UPDATE Runs SET Finished = ?, Status = ? WHERE RunID = ?", (str(datetime.datetime.now()), status, runID))
+        connection.commit()
+    finally:
+        connection.close()
+    # Logging
+    if (status == "Incomplete"):
+        printMessage("Run " + runID + " is incomplete, use --resume to continue from the datasets that failed...","warning")
+        if (enableLogging == "true"):
+            logger.warning("Run " + runID + " is incomplete, use --resume to continue from the datasets that failed...")
+# End of finish journal run function
+
+
+# Start of get journal steps function
+def getJournalSteps(runID,planEntry):
+    # Get the steps completed for the dataset in this run and the update mode recorded with each step
+    connection = getStateConnection()
+    try:
+        rows = connection.execute("SELECT Step, UpdateMode FROM Journal WHERE RunID = ? AND Source = ? AND Destination = ?", (runID, planEntry["sourcePath"], planEntry["destinationPath"])).fetchall()
+    finally:
+        connection.close()
+
+    return dict([(row[0], row[1]) for row in rows])
+# End of get journal steps function
+
+
+# Start of write journal step function
+def writeJournalStep(runID,planEntry,step,updateMode=None):
+    # Record the step as completed - Each step is committed on its own so the journal is always consistent
+    connection = getStateConnection()
+    try:
+        connection.execute("INSERT OR REPLACE INTO Journal (RunID, Source, Destination, Step, Updated, UpdateMode) VALUES (?, ?, ?, ?, ?, ?)", (runID, planEntry["sourcePath"], planEntry["destinationPath"], step, str(datetime.datetime.now()), updateMode))
+        connection.commit()
+    finally:
+        connection.close()
+# End of write journal step function
+
+
+# Start of get dataset fingerprint function
+def getDatasetFingerprint(datasetPath,datasetCount):
+    fingerprint = {"count": datasetCount,
+                   "schema": "",
+                   "editDate": "",
+                   "contentHash": ""}
+
+    # Get a hash of the schema
+    fields = WorkspaceCatalog.listFields(datasetPath)
+    schema = [(field.name, field.type, field.length, field.precision, field.scale, field.isNullable, field.domain) for field in fields]
+    fingerprint["schema"] = hashlib.md5(repr(schema).encode('utf-8')).hexdigest()
+
+    # If editor tracking is enabled, get the last edit date
+    describeDataset = WorkspaceCatalog.describe(datasetPath)
+    if (getattr(describeDataset, "editorTrackingEnabled", False)) and (describeDataset.editedAtFieldName):
+        editDateField = describeDataset.editedAtFieldName
+        with arcpy.da.SearchCursor(datasetPath, [editDateField], editDateField + " IS NOT NULL", sql_clause=(None, "ORDER BY " + editDateField + " DESC")) as searchCursor:
+            for row in searchCursor:
+                fingerprint["editDate"] = str(row[0])
+                break
+
+    # If sampling records for a content hash
+    if (int(fingerprintSampleSize) > 0):
+        # Hash every nth record spread across the dataset
+        sampleInterval = max(1, int(datasetCount / int(fingerprintSampleSize)))
+        hashFields = [field.name for field in fields if field.type not in ["OID","Geometry","Raster","Blob"]]
+        if hasattr(describeDataset, "shapeFieldName"):
+            hashFields.append("SHAPE@WKB")
+        contentHash = hashlib.md5()
+        with arcpy.da.SearchCursor(datasetPath, hashFields, sql_clause=(None, "ORDER BY " + describeDataset.OIDFieldName)) as searchCursor:
+            count = 0
+            for row in searchCursor:
+                if (count % sampleInterval == 0):
+                    contentHash.update(repr(row).encode('utf-8'))
+                count = count + 1
+        fingerprint["contentHash"] = contentHash.hexdigest()
+
+    return fingerprint
+# End of get dataset fingerprint function
+
+
+# Start of check dataset fingerprint function
+def checkDatasetFingerprint(planEntry,fingerprint):
+    # If doing a full refresh
+    if (forceRefresh == "true"):
+        return "Copy","Force refresh"
+    # If dataset isn't in the destination
+    if not WorkspaceCatalog.exists(planEntry["destinationPath"]):
+        return "Copy","Destination does not exist"
+
+    # Get the fingerprint from the last successful run
+    connection = getStateConnection()
+    try:
+        lastFingerprint = connection.execute("SELECT RecordCount, SchemaHash, EditDate, ContentHash FROM Fingerprints WHERE Source = ? AND Destination = ?", (planEntry["sourcePath"], planEntry["destinationPath"])).fetchone()
+    finally:
+        connection.close()
+
+    # Compare the fingerprints
+    if not lastFingerprint:
+        return "Copy","No fingerprint from a previous run"
+    if (lastFingerprint[0] != fingerprint["count"]):
+        return "Copy","Record count changed from " + str(lastFingerprint[0]) + " to " + str(fingerprint["count"])
+    if (lastFingerprint[1] != fingerprint["schema"]):
+        return "Copy","Schema changed"
+    # Need an edit date or content hash to know the records haven't changed
+    if (not fingerprint["editDate"]) and (not fingerprint["contentHash"]):
+        return "Copy","No edit date or content hash to compare"
+    if (lastFingerprint[2] != fingerprint["editDate"]):
+        return "Copy","Edited since last run"
+    if (lastFingerprint[3] != fingerprint["contentHash"]):
+        return "Copy","Content changed"
+
+    return "Skip","Unchanged since last run"
+# End of check dataset fingerprint function
+
+
+# Start of save dataset fingerprint function
+def saveDatasetFingerprint(planEntry,fingerprint):
+    # Store the fingerprint from this run
+    connection = getStateConnection()
+    try:
+        connection.execute("INSERT OR REPLACE INTO Fingerprints VALUES (?, ?, ?, ?, ?, ?, ?)", (planEntry["sourcePath"], planEntry["destinationPath"], fingerprint["count"], fingerprint["schema"], fingerprint["editDate"], fingerprint["contentHash"], str(datetime.datetime.now())))
+        connection.commit()
+    finally:
+        connection.close()
+# End of save dataset fingerprint function
+
+
+# Start of update changed records function
+def updateChangedRecords(planEntry,destinationGeodatabase):
+    sourceDatasetPath = planEntry["sourcePath"]
+    destinationDatasetPath = planEntry["destinationPath"]
+    changeCounts = {"inserted": 0,
+                    "updated": 0,
+                    "deleted": 0,
+                    "unchanged": 0}
+
+    # FUNCTION - Get the key field to match records on
+    keyField = getKeyField(planEntry)
+    # If no key field to match records on
+    if (not keyField):
+        printMessage("Dataset " + destinationDatasetPath + " has no GlobalID or key field, deleting and appending records instead...","warning")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning("Dataset " + destinationDatasetPath + " has no GlobalID or key field, deleting and appending records instead...")
+        return None
+
+    # Logging
+    if (enableLogging == "true"):
+        logger.info("Applying changes for " + planEntry["dataType"].lower() + " - " + destinationDatasetPath + " (key field - " + keyField + ")...")
+    arcpy.AddMessage("Applying changes for " + planEntry["dataType"].lower() + " - " + destinationDatasetPath + " (key field - " + keyField + ")...")
+
+    # FUNCTION - Get the fields to compare between the datasets
+    compareFields = getCompareFields(sourceDatasetPath,destinationDatasetPath,keyField)
+    hashFields = [keyField] + compareFields
+    updateFields = [keyField] + compareFields
+    # Compare the geometry too for feature classes
+    if (planEntry["dataType"] != "Table"):
+        hashFields.append("SHAPE@WKB")
+        updateFields.append("SHAPE@")
+
+    # FUNCTION - Get a hash of each record in the source and destination keyed by the key field
+    sourceHashes = getRecordHashes(sourceDatasetPath,hashFields)
+    destinationHashes = None
+    if (sourceHashes is not None):
+        destinationHashes = getRecordHashes(destinationDatasetPath,hashFields)
+    # If the key field has null or duplicate values, records can't be matched on it
+    if (sourceHashes is None) or (destinationHashes is None):
+        printMessage("Dataset " + destinationDatasetPath + " has null or duplicate values in the key field " + keyField + ", deleting and appending records instead...","warning")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning("Dataset " + destinationDatasetPath + " has null or duplicate values in the key field " + keyField + ", deleting and appending records instead...")
+        return None
+
+    # Work out the inserts, updates and deletes
+    insertKeys = set([key for key in sourceHashes if key not in destinationHashes])
+    deleteKeys = set([key for key in destinationHashes if key not in sourceHashes])
+    updateKeys = set([key for key in sourceHashes if (key in destinationHashes) and (sourceHashes[key] != destinationHashes[key])])
+    changeCounts["unchanged"] = len(sourceHashes) - len(insertKeys) - len(updateKeys)
+    del sourceHashes
+    del destinationHashes
+
+    # If there are updates or deletes to apply
+    if (len(updateKeys) > 0) or (len(deleteKeys) > 0):
+        # Get the new values for the records that have been updated
+        updateRecords = {}
+        if (len(updateKeys) > 0):
+            with arcpy.da.SearchCursor(sourceDatasetPath, updateFields) as searchCursor:
+                for row in searchCursor:
+                    if (row[0] in updateKeys):
+                        updateRecords[row[0]] = row
+
+        # If destination is versioned, edits need to be made in an edit session
+        editor = None
+        if (WorkspaceCatalog.describe(destinationDatasetPath).isVersioned):
+            editor = arcpy.da.Editor(destinationGeodatabase)
+            editor.startEditing(False, True)
+            editor.startOperation()
+        try:
+            # Update and delete the records in the destination
+            with arcpy.da.UpdateCursor(destinationDatasetPath, updateFields) as updateCursor:
+                for row in updateCursor:
+                    if (row[0] in deleteKeys):
+                        updateCursor.deleteRow()
+                        changeCounts["deleted"] = changeCounts["deleted"] + 1
+                    elif (row[0] in updateRecords):
+                        updateCursor.updateRow(list(updateRecords[row[0]]))
+                        changeCounts["updated"] = changeCounts["updated"] + 1
+            if editor:
+                editor.stopOperation()
+                editor.stopEditing(True)
+        except:
+            if editor:
+                editor.abortOperation()
+                editor.stopEditing(False)
+            raise
+
+    # If there are inserts to apply
+    if (len(insertKeys) > 0):
+        # Append the new records in batches of keys - GlobalIDs used as the key are kept as copy records preserves them
+        insertKeys = sorted(insertKeys)
+        batchSize = 500
+        for batchStart in range(0, len(insertKeys), batchSize):
+            # FUNCTION - Get the query for this batch of keys
+            keyQuery = getKeyQuery(sourceDatasetPath,keyField,insertKeys[batchStart:batchStart + batchSize])
+            if (planEntry["dataType"] == "Table"):
+                sourceView = arcpy.MakeTableView_management(sourceDatasetPath, "InsertView", keyQuery)
+            else:
+                sourceView = arcpy.MakeFeatureLayer_management(sourceDatasetPath, "InsertView", keyQuery)
+            arcpy.Append_management(sourceView, destinationDatasetPath, "NO_TEST", "", "")
+            arcpy.Delete_management(sourceView)
+        changeCounts["inserted"] = len(insertKeys)
+
+    arcpy.AddMessage("Records inserted - " + str(changeCounts["inserted"]) + ", updated - " + str(changeCounts["updated"]) + ", deleted - " + str(changeCounts["deleted"]) + ", unchanged - " + str(changeCounts["unchanged"]))
+    if (enableLogging == "true"):
+        logger.info("Records inserted - " + str(changeCounts["inserted"]) + ", updated - " + str(changeCounts["updated"]) + ", deleted - " + str(changeCounts["deleted"]) + ", unchanged - " + str(changeCounts["unchanged"]))
+
+    return changeCounts
+# End of update changed records function
+
+
+# Start of get key field function
+def getKeyField(planEntry):
+    # Key field in configuration file, otherwise the GlobalID field
+    keyField = planEntry["keyField"]
+    describeSource = WorkspaceCatalog.describe(planEntry["sourcePath"])
+    if (not keyField) and (getattr(describeSource, "hasGlobalID", False)):
+        keyField = describeSource.globalIDFieldName
+    return keyField
+# End of get key field function
+
+
+# Start of get compare fields function
+def getCompareFields(sourceDatasetPath,destinationDatasetPath,keyField):
+    # Get the fields that can be updated in the destination
+    destinationFields = {}
+    for field in WorkspaceCatalog.listFields(destinationDatasetPath):
+        if (field.editable) and (field.type not in ["OID","GlobalID","Geometry","Raster"]):
+            destinationFields[field.name.lower()] = field.name
+
+    # Get the fields in the source that are also in the destination
+    describeSource = WorkspaceCatalog.describe(sourceDatasetPath)
+    excludeFields = [keyField.lower()]
+    for fieldName in ["lengthFieldName","areaFieldName"]:
+        if hasattr(describeSource, fieldName):
+            excludeFields.append(getattr(describeSource, fieldName).lower())
+    compareFields = []
+    for field in WorkspaceCatalog.listFields(sourceDatasetPath):
+        if (field.name.lower() in destinationFields) and (field.name.lower() not in excludeFields):
+            compareFields.append(destinationFields[field.name.lower()])
+
+    return compareFields
+# End of get compare fields function
+
+
+# Start of get record hashes function
+def getRecordHashes(datasetPath,hashFields):
+    # Setup dictionary of a hash of the attributes and geometry for each record keyed by the key field - None if the key isn't unique
+    recordHashes = {}
+    with arcpy.da.SearchCursor(datasetPath, hashFields) as searchCursor:
+        for row in searchCursor:
+            # Records can't be matched if the key is null or used by more than one record
+            if (row[0] is None) or (row[0] in recordHashes):
+                return None
+            recordHashes[row[0]] = hashlib.md5(repr(row[1:]).encode('utf-8')).digest()
+
+    return recordHashes
+# End of get record hashes function
+
+
+# Start of get key query function
+def getKeyQuery(datasetPath,keyField,keys):
+    # Quote the keys if they are text or GlobalIDs
+    keyValues = []
+    for key in keys:
+        if (key is None):
+            continue
+        if isinstance(key, numbers.Number):
+            keyValues.append(str(key))
+        else:
+            keyValues.append("'" + str(key).replace("'", "''") + "'")
+
+    keyQueries = []
+    if (keyValues):
+        keyQueries.append(arcpy.AddFieldDelimiters(datasetPath, keyField) + " IN (" + ",".join(keyValues) + ")")
+    # Null keys can't be matched with IN
+    if (None in keys):
+        keyQueries.append(arcpy.AddFieldDelimiters(datasetPath, keyField) + " IS NULL")
+    return " OR ".join(keyQueries)
+# End of get key query function
 
 
 # Start of print message function
@@ -654,6 +1585,27 @@ if __name__ == '__main__':
         argv = sys.argv
         # Delete the first argument, which is the script
         del argv[0]
+    # Get the optional flags from the arguments e.g. --plan-only
+    argv = list(argv)
+    for argument in list(argv):
+        if (argument.lower() == "--plan-only"):
+            planOnly = "true"
+            argv.remove(argument)
+        elif (argument.lower() == "--resume"):
+            resumeRun = "true"
+            argv.remove(argument)
+        elif (argument.lower() == "--force-refresh"):
+            forceRefresh = "true"
+            argv.remove(argument)
+        elif (argument.lower() == "--full-history"):
+            fullArchiveCopy = "true"
+            argv.remove(argument)
+        elif (argument.lower() == "--staging"):
+            stagingLoad = "true"
+            argv.remove(argument)
+        elif (argument.lower().startswith("--workers=")):
+            workerProcesses = int(argument.split("=")[1])
+            argv.remove(argument)
     # Logging
     if (enableLogging == "true"):
         # Setup logging
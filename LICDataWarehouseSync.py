@@ -15,6 +15,7 @@ import sys
 import logging
 import smtplib
 import arcpy
+import WorkspaceCatalog
 import string
 import datetime
 import time
@@ -121,7 +122,7 @@ def mainFunction(gisProperty,gisShed,gisEntrance,gisPropertyEntranceRelate,gisPr
             # If GIS property not in Data Warehouse property
             if gisPropertyID not in dwPropertyIDsArray:
                 # Info message
-                describeDataset = arcpy.Describe(dwProperty)
+                describeDataset = WorkspaceCatalog.describe(dwProperty)
                 descriptionString = "Property not in Data Warehouse - " + gisPropertyID + ": " + describeDataset.name
                 arcpy.AddMessage(descriptionString)
                 # Add to logs dictionary
@@ -137,7 +138,7 @@ def mainFunction(gisProperty,gisShed,gisEntrance,gisPropertyEntranceRelate,gisPr
             # If Data Warehouse property not in GIS property
             if dwPropertyID not in gisPropertyIDsArray:
                 # Info message
-                describeDataset = arcpy.Describe(gisProperty)
+                describeDataset = WorkspaceCatalog.describe(gisProperty)
                 descriptionString = "Property not in GIS - " + dwPropertyID + ": " + describeDataset.name
                 arcpy.AddMessage(descriptionString)
                 # Add to logs dictionary
@@ -170,7 +171,7 @@ def mainFunction(gisProperty,gisShed,gisEntrance,gisPropertyEntranceRelate,gisPr
             # Check if property not in property entrance relate
             if propertyGlobalID not in gisPropertyEntranceArray:
                 # Info message    
-                describeDataset = arcpy.Describe(gisPropertyEntranceRelate)
+                describeDataset = WorkspaceCatalog.describe(gisPropertyEntranceRelate)
                 descriptionString = "Property not in Property to Entrance Relationship - " + gisdwPropertyID + ", " + propertyGlobalID + ": " + describeDataset.name
                 arcpy.AddMessage(descriptionString)
                 
@@ -190,7 +191,7 @@ def mainFunction(gisProperty,gisShed,gisEntrance,gisPropertyEntranceRelate,gisPr
                 propertyEntranceGlobalID = gisEntranceRows[-1][0]
 
                 # Info message    
-                describeDataset = arcpy.Describe(gisEntrance)
+                describeDataset = WorkspaceCatalog.describe(gisEntrance)
                 descriptionString = "New feature record created - " + propertyEntranceGlobalID + ": " + describeDataset.name
                 arcpy.AddMessage(descriptionString)
                 # Add to logs dictionary
@@ -216,7 +217,7 @@ def mainFunction(gisProperty,gisShed,gisEntrance,gisPropertyEntranceRelate,gisPr
             for keyProp, valueProp in gisPropertyDict.iteritems():
                 if (str(key) == str(valueProp[0])):
                     # Info message   
-                    describeDataset = arcpy.Describe(gisPropertyEntranceRelate)
+                    describeDataset = WorkspaceCatalog.describe(gisPropertyEntranceRelate)
                     descriptionString = "New relationship record created - " + keyProp + ": " + describeDataset.name
                     arcpy.AddMessage(descriptionString)                        
                     # Add to logs dictionary
@@ -252,7 +253,7 @@ def mainFunction(gisProperty,gisShed,gisEntrance,gisPropertyEntranceRelate,gisPr
             # If property not in property shed relate
             else:
                 # Info message
-                describeDataset = arcpy.Describe(gisPropertyShedRelate)
+                describeDataset = WorkspaceCatalog.describe(gisPropertyShedRelate)
                 descriptionString = "Property not in Property to Shed Relationship - " + gisdwPropertyID + ": " + describeDataset.name
                 arcpy.AddMessage(descriptionString)                   
 
@@ -278,7 +279,7 @@ def mainFunction(gisProperty,gisShed,gisEntrance,gisPropertyEntranceRelate,gisPr
             # If GIS shed not in Data Warehouse sheds
             if gisPropertyShedID not in dwPropertyShedIDsArray:
                 # Info message
-                describeDataset = arcpy.Describe(dwShed)
+                describeDataset = WorkspaceCatalog.describe(dwShed)
                 descriptionString = "Shed not in Data Warehouse - " + gisPropertyShedID + ": " + describeDataset.name
                 arcpy.AddMessage(descriptionString)
                 # Add to logs dictionary
@@ -291,7 +292,7 @@ def mainFunction(gisProperty,gisShed,gisEntrance,gisPropertyEntranceRelate,gisPr
             # If data warehouse shed not in GIS sheds
             if dwPropertyShedID not in gisPropertyShedIDsArray:            
                 # Info message
-                describeDataset = arcpy.Describe(dwShed)
+                describeDataset = WorkspaceCatalog.describe(dwShed)
                 descriptionString = "Shed not in GIS - " + dwPropertyShedID + ": " + describeDataset.name
                 arcpy.AddMessage(descriptionString)
                 # Add to logs dictionary
@@ -410,7 +411,7 @@ def gisPropertyShedSync(gisdwPropertyID,gisPropertyDict,gisShed,gisPropertyShedR
             del gisPropertyShedInsertCursor
 
             # Info message   
-            describeDataset = arcpy.Describe(gisShed)
+            describeDataset = WorkspaceCatalog.describe(gisShed)
             descriptionString = "New feature record created - " + gisShedID + ": " + describeDataset.name
             arcpy.AddMessage(descriptionString)                        
             # Add to logs dictionary
@@ -431,7 +432,7 @@ def gisPropertyShedSync(gisdwPropertyID,gisPropertyDict,gisShed,gisPropertyShedR
                 gisEntranceShedRelateInsertCursor.insertRow([propertyShedGlobalID,propertyEntranceGlobalID])
 
             # Info message   
-            describeDataset = arcpy.Describe(gisshedEntranceRelate)
+            describeDataset = WorkspaceCatalog.describe(gisshedEntranceRelate)
             descriptionString = "New relationship record created - " + gisShedID + ": " + describeDataset.name
             arcpy.AddMessage(descriptionString)                        
             # Add to logs dictionary
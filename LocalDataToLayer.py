@@ -30,8 +30,7 @@ emailSubject = ""
 emailMessage = ""
 # Proxy
 enableProxy = "false"
-requestProtocol = "http" # http or https
-proxyURL = ""
+proxyURL = "" # Proxy for http and https requests e.g. http://proxy.example.com:8080
 # Output
 output = None
 # ArcGIS desktop installed
@@ -43,13 +42,8 @@ if (arcgisDesktop == "true"):
     import arcpy
     # Enable data to be overwritten
     arcpy.env.overwriteOutput = True
-# Python version check
-if sys.version_info[0] >= 3:
-    # Python 3.x
-    import urllib.request as urllib2
-else:
-    # Python 2.x
-    import urllib2  
+# Shared HTTP client - Reuses connections and retries failed requests
+import HTTPClient
 import zipfile
 import uuid
 import glob
@@ -68,7 +62,7 @@ def mainFunction(dataFile,geometryType,inputCoordinateSystemName,outputCoordinat
         if any(file in dataFile for file in urlCheck):
             printMessage("Downloading file from - " + dataFile + "...","info")
             # Download the file from the link
-            file = urllib2.urlopen(dataFile)
+            file = HTTPClient.urlopen(dataFile)
             fileName, fileExt = os.path.splitext(dataFile)
             # Download in chunks
             fileChunk = 16 * 1024
@@ -465,9 +459,5 @@ if __name__ == '__main__':
         logger.info("Process started.")
     # Setup the use of a proxy for requests
     if (enableProxy == "true"):
-        # Setup the proxy
-        proxy = urllib2.ProxyHandler({requestProtocol : proxyURL})
-        openURL = urllib2.build_opener(proxy)
-        # Install the proxy
-        urllib2.install_opener(openURL)
+        HTTPClient.proxyURL = proxyURL
     mainFunction(*argv)
\ No newline at end of file
@@ -4,6 +4,28 @@
 #             and converting to a feature class.
 #             Existing Mode - Will delete and append records, so field names need to be the same.
 #             New Mode - Copies data over (including archive datasets if needed). Requires no locks on geodatabase datasets being overwritten.              
+#             Pages of records are downloaded by a pool of threads while earlier pages are being converted, pages
+#             are converted in object ID order. Use --threads=4 to set the number of pages downloaded at the same time.
+#             The page size, object ID field and paging support are read from the layer information. Layers that
+#             support pagination are paged with resultOffset, otherwise pages are object ID ranges. If the object
+#             IDs can't be queried, the layer extent is split into tiles, and any tile with more records than the
+#             maximum records per request is split into four until each tile fits in a page. Features on the
+#             edges of tiles are only loaded once. Features are
+#             read from the JSON response as it downloads and written straight into the scratch dataset with an
+#             insert cursor, so memory use doesn't depend on the page size. Downloaded pages are kept in a page
+#             cache folder for the layer and query until the download succeeds, so rerunning a failed download
+#             only downloads the pages that are missing.
+#             Incremental Mode - For layers with editor tracking, only downloads the records edited since the
+#             last run and applies the inserts, updates and deletes (matched on the map service object ID).
+#             Requests are made with the shared HTTP client, which reuses connections to the server and retries
+#             requests that time out or fail on the server. Only the fields needed can be downloaded and the
+#             geometry precision reduced to make the pages smaller. The page size is made smaller when pages are
+#             slow to respond or fail and larger again when they are fast.
+#             Service Download - Give a map or feature service URL (ending in MapServer or FeatureServer) and a
+#             geodatabase or feature dataset as the output to download all the layers and tables in the service,
+#             or only the ones chosen with --layers=0,2. Pages for all the layers are downloaded at the same time,
+#             sharing the download threads, while each layer is loaded in turn. A summary of the records,
+#             requests and time for each layer is shown at the end.
 # Author:     Shaun Weston (shaun_weston@eagle.co.nz)
 # Date Created:    14/08/2013
 # Last Updated:    24/11/2015
@@ -14,15 +36,21 @@
 
 # Import modules
 import os
-import sys
+import re
 import logging
 import smtplib
 import arcpy
 import json
 import urllib
-import urllib2
 import uuid
-import math
+import time
+import shutil
+import hashlib
+import datetime
+import threading
+import Queue
+from multiprocessing.pool import ThreadPool
+import HTTPClient
 
 # Enable data to be overwritten
 arcpy.env.overwriteOutput = True
@@ -37,8 +65,30 @@ emailPassword = ""
 emailSubject = ""
 emailMessage = ""
 enableProxy = "false"
-requestProtocol = "http" # http or https
-proxyURL = ""
+proxyURL = "" # Proxy for http and https requests e.g. http://proxy.example.com:8080
+pagingMethod = "Automatic" # Automatic, Offset, Object ID or Tiles - Automatic will page with resultOffset if the layer supports pagination, otherwise with object ID ranges, or with tiles of the layer extent if the object IDs can't be queried
+maxTileDepth = 16 # Number of times a tile can be split into four when it has more records than the maximum records per request
+defaultMaxRecords = 1000 # Number of records per request if the layer doesn't have a maxRecordCount
+downloadThreads = 4 # Number of pages to download at the same time, 1 downloads one page at a time, shared by all the layers when downloading a service - Can also be set with --threads=4 on the command line
+downloadToFile = "false" # Write each page to a JSON file in the scratch folder before loading it, otherwise features are read straight from the response - Always true when downloading a service
+serviceLayers = "" # Layer IDs or names to download when a map or feature service URL is given e.g. "0,2,Roads", leave blank to download all the layers and tables - Can also be set with --layers=0,2 on the command line
+featureQueueSize = 1000 # Number of features each download thread can read ahead of the features being loaded
+outFields = "*" # Fields to download separated by commas e.g. "Name,Category", * downloads all fields - The object ID field is always downloaded
+geometryPrecision = "" # Number of decimal places for the coordinates e.g. 2, leave blank for full precision
+maxAllowableOffset = "" # Generalise the geometry by this distance in the units of the layer e.g. 0.5, leave blank to not generalise
+responseFormat = "json" # json or pjson - pjson is pretty printed, which nearly doubles the size of each page
+adaptivePageSize = "true" # Make the page size smaller when pages are slow to respond or fail and larger again when they are fast, never larger than the maximum records per request
+minimumPageSize = 100 # Smallest number of records to request when the page size is made smaller
+slowPageSeconds = 30 # Pages that take longer than this for the server to respond make the page size smaller
+fastPageSeconds = 5 # Pages that take less than this for the server to respond make the page size larger
+pageCacheFolder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "MapServiceDownloadCache") # Folder to keep downloaded pages in so a failed download can be rerun without downloading them again, leave blank to not cache pages
+pageCacheHours = 24 # Hours to keep the pages from a download that didn't finish before they are removed
+keepPageCache = "false" # Keep the pages after a successful download so a rerun within pageCacheHours doesn't download them again
+watermarkFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "MapServiceDownloadWatermarks.json") # JSON file storing the latest edit date downloaded for each layer and output in incremental mode
+serviceObjectIdField = "ServiceObjectID" # Field added in incremental mode to store the map service object ID, used to match records
+# Field types that are copied from the map service and the type of field to add
+fieldTypes = {"esriFieldTypeString":"TEXT","esriFieldTypeSmallInteger":"SHORT","esriFieldTypeInteger":"LONG","esriFieldTypeSingle":"FLOAT","esriFieldTypeDouble":"DOUBLE","esriFieldTypeDate":"DATE","esriFieldTypeGUID":"GUID","esriFieldTypeGlobalID":"GUID"}
+geometryTypes = {"esriGeometryPoint":"POINT","esriGeometryMultipoint":"MULTIPOINT","esriGeometryPolyline":"POLYLINE","esriGeometryPolygon":"POLYGON"}
 output = None
 
 # Start of main function
@@ -46,110 +96,35 @@ def mainFunction(mapServiceLayer,outputFeatureClass,updateMode): # Get parameter
     try:
         # --------------------------------------- Start of code --------------------------------------- #
 
-        # Querying thet map service to get the count of records
-        arcpy.AddMessage("Querying the map service...")
-        mapServiceQuery1 = mapServiceLayer + "/query?where=1%3D1&returnIdsOnly=true&f=pjson"
-        urlResponse = urllib.urlopen(mapServiceQuery1);
-        # Get json for the response - Object IDs
-        mapServiceQuery1JSONData = json.loads(urlResponse.read())
-        objectIDs = mapServiceQuery1JSONData["objectIds"]
-        objectIDs.sort()
-        arcpy.AddMessage("Number of records in the layer - " + str(len(objectIDs)) + "...")
-        # Set the number of records per request and the number of requests that need to be made
-        maxRecords = 1000
-        # If under maxRecords, just need to make one request
-        if (len(objectIDs) < maxRecords):
-            requestsToMake = 1
+        # If a map or feature service rather than a layer
+        if (re.search(r"/(MapServer|FeatureServer)/?$", mapServiceLayer, re.IGNORECASE)):
+            # FUNCTION - Download the layers in the service into the geodatabase
+            downloadService(mapServiceLayer.rstrip("/"),outputFeatureClass,updateMode)
         else:
-            # Calculate the number of requests - Always round up
-            requestsToMake = math.ceil(float(len(objectIDs)) / float(maxRecords))
-
-        arcpy.AddMessage("Downloading data to " + arcpy.env.scratchFolder + "...")
-        # For every request
-        count = 0
-        while (int(requestsToMake) > count):
-            # Create the query
-            startObjectID = int(objectIDs[count*maxRecords])
-            # If at the final request or if there is only one request that needs to be made
-            if ((int(requestsToMake) == (count+1)) or (requestsToMake == 1)):
-                # Get the last object ID
-                endObjectID = int(objectIDs[len(objectIDs)-1])
-                serviceQuery = "OBJECTID>%3D" + str(startObjectID) + "+AND+OBJECTID<%3D" + str(endObjectID)
+            # FUNCTION - Get the pages of records to download for the layer
+            layerDownload = prepareLayerDownload(mapServiceLayer,outputFeatureClass,updateMode)
+            threadCount = max(1,min(downloadThreads,len([pageRequest for pageRequest in layerDownload["pageRequests"] if not pageRequest.get("cached")])))
+            if (downloadToFile == "true"):
+                # Pages are downloaded to the page cache if there is one, there may be no pages if nothing has been edited
+                downloadFolder = arcpy.env.scratchFolder
+                if (layerDownload["pageCache"]):
+                    downloadFolder = layerDownload["pageCache"]["folder"]
+                arcpy.AddMessage("Downloading data to " + downloadFolder + " with " + str(threadCount) + " thread(s)...")
             else:
-                # Start object ID plus 1000 records
-                endObjectID = int(objectIDs[(count*maxRecords)+maxRecords])
-                serviceQuery = "OBJECTID>%3D" + str(startObjectID) + "+AND+OBJECTID<" + str(endObjectID)
-                
-            # Query the map service to data in json format
+                arcpy.AddMessage("Downloading data with " + str(threadCount) + " thread(s)...")
+            # Download the pages in a pool of threads - Pages are loaded in object ID order while later pages are still downloading
+            threadPool = ThreadPool(threadCount)
             try:
-                mapServiceQuery2 = mapServiceLayer + "/query?where=" + serviceQuery + "&returnCountOnly=false&returnIdsOnly=false&returnGeometry=true&outFields=*&f=pjson"
-                response = urllib2.urlopen(mapServiceQuery2)  
-            except urllib2.URLError, e:
-                arcpy.AddError("There was an error: %r" % e)
-            
-            # Download the data
-            fileChunk = 16 * 1024
-            downloadedFile = os.path.join(arcpy.env.scratchFolder, "Data-" + str(uuid.uuid1()) + ".json")
-            with open(downloadedFile, 'wb') as file:
-                downloadCount = 0
-                while True:
-                    chunk = response.read(fileChunk)
-                    # If data size is small
-                    if ((downloadCount == 0) and (len(chunk) < 1000)):
-                        # Log error and end download
-                        arcpy.AddError("No data returned, check the URL...")  
-                        sys.exit()
-                    if not chunk:
-                        break
-                    # Write chunk to output file
-                    file.write(chunk)
-                    downloadCount = downloadCount + 1
-            file.close()
-     
-            # If it's the first request
-            if (count == 0):
-                # Create new dataset
-                arcpy.JSONToFeatures_conversion(downloadedFile, os.path.join(arcpy.env.scratchGDB, "Dataset"))
-            else:
-                # Create dataset and load into existing
-                arcpy.JSONToFeatures_conversion(downloadedFile, "in_memory\\DatasetTemp")
-                arcpy.Append_management("in_memory\\DatasetTemp", os.path.join(arcpy.env.scratchGDB, "Dataset"), "NO_TEST", "", "")           
+                # FUNCTION - Queue the pages to download
+                startLayerDownload(layerDownload,threadPool,downloadToFile == "true")
+                # FUNCTION - Load the pages into the output
+                loadLayerDownload(layerDownload)
+            finally:
+                # Stop any downloads still running if there was an error
+                layerDownload["stop"].set()
+                threadPool.terminate()
+                threadPool.join()
 
-            # If at the final request or if there is only one request that needs to be made
-            if ((int(requestsToMake) == (count+1)) or (requestsToMake == 1)):
-                arcpy.AddMessage("Downloaded and converted JSON for " + str(len(objectIDs)) + " of " + str(len(objectIDs)) + " features...")                
-            else:
-                arcpy.AddMessage("Downloaded and converted JSON for " + str((count+1)*maxRecords) + " of " + str(len(objectIDs)) + " features...")
-            count = count + 1
-            
-        # Convert JSON to feature class
-        arcpy.AddMessage("Copying over final dataset...")
-        # Overwrite dataset
-        if (updateMode.lower() == "new"):
-            # Get record count
-            recordCount = arcpy.GetCount_management(os.path.join(arcpy.env.scratchGDB, "Dataset"))
-            arcpy.AddMessage("Number of records for " + outputFeatureClass + " - " + str(recordCount))  
-            # Logging 
-            if (enableLogging == "true"): 
-                # Log record count 
-                logger.info("Number of records for " + outputFeatureClass + " - " + str(recordCount)) 
-            # Load in data 
-            if (recordCount > 0): 
-                arcpy.CopyFeatures_management(os.path.join(arcpy.env.scratchGDB, "Dataset"), outputFeatureClass, "", "0", "0", "0")
-        # Delete and append
-        else:
-            # Get record count
-            recordCount = arcpy.GetCount_management(os.path.join(arcpy.env.scratchGDB, "Dataset"))
-            arcpy.AddMessage("Number of records for " + outputFeatureClass + " - " + str(recordCount))  
-            # Logging 
-            if (enableLogging == "true"): 
-                # Log record count 
-                logger.info("Number of records for " + outputFeatureClass + " - " + str(recordCount)) 
-            # Load in data 
-            if (recordCount > 0): 
-                arcpy.DeleteFeatures_management(outputFeatureClass)             
-                arcpy.Append_management(os.path.join(arcpy.env.scratchGDB, "Dataset"), outputFeatureClass, "NO_TEST", "", "")           
-            
         # --------------------------------------- End of code --------------------------------------- #  
             
         # If called from gp tool return the arcpy parameter   
@@ -214,6 +189,1111 @@ def mainFunction(mapServiceLayer,outputFeatureClass,updateMode): # Get parameter
 # End of main function
 
 
+# Start of download service function
+def downloadService(mapService,outputWorkspace,updateMode):
+    # FUNCTION - Get the layers and tables to download from the service
+    serviceLayers = getServiceLayers(mapService)
+    if not serviceLayers:
+        raise Exception("No layers to download from the service...")
+    arcpy.AddMessage("Downloading " + str(len(serviceLayers)) + " layer(s) from the service into " + outputWorkspace + " with " + str(downloadThreads) + " thread(s)...")
+    # Tables can't be in a feature dataset, so they go in the geodatabase
+    tableWorkspace = outputWorkspace
+    if (arcpy.Describe(outputWorkspace).dataType == "FeatureDataset"):
+        tableWorkspace = os.path.dirname(outputWorkspace)
+
+    # Pages for all the layers share the one pool of threads, so no more than the download threads are downloading at a time
+    threadPool = ThreadPool(max(1,downloadThreads))
+    layerSummaries = []
+    layerDownloads = []
+    outputNames = []
+    serviceStart = time.time()
+    try:
+        # Get the pages for each layer and queue them to download - Pages are downloaded to files, so layers keep downloading while earlier layers are loaded
+        for serviceLayer in serviceLayers:
+            layerSummary = {"id": serviceLayer["id"], "name": serviceLayer["name"], "records": 0, "requests": 0, "bytes": 0, "seconds": 0, "error": None}
+            layerSummaries.append(layerSummary)
+            workspace = outputWorkspace
+            if (serviceLayer["table"]):
+                workspace = tableWorkspace
+            outputName = arcpy.ValidateTableName(serviceLayer["name"], workspace)
+            if (outputName.lower() in outputNames):
+                outputName = outputName + "_" + str(serviceLayer["id"])
+            outputNames.append(outputName.lower())
+            arcpy.AddMessage("Layer " + str(serviceLayer["id"]) + " - " + serviceLayer["name"] + " to " + os.path.join(workspace, outputName) + "...")
+            try:
+                # FUNCTION - Get the pages of records to download for the layer
+                layerDownload = prepareLayerDownload(mapService + "/" + str(serviceLayer["id"]),os.path.join(workspace, outputName),updateMode)
+                layerDownload["summary"] = layerSummary
+                # FUNCTION - Queue the pages to download
+                startLayerDownload(layerDownload,threadPool,True)
+                layerDownloads.append(layerDownload)
+            except Exception as e:
+                layerSummary["error"] = getErrorMessage(e)
+                arcpy.AddWarning("Layer " + str(serviceLayer["id"]) + " - " + serviceLayer["name"] + " could not be downloaded - " + layerSummary["error"])
+
+        # Load each layer in turn as its pages are downloaded
+        for layerDownload in layerDownloads:
+            layerSummary = layerDownload["summary"]
+            arcpy.AddMessage("Loading layer " + str(layerSummary["id"]) + " - " + layerSummary["name"] + "...")
+            layerStart = time.time()
+            try:
+                # FUNCTION - Load the pages into the output
+                layerStatistics = loadLayerDownload(layerDownload)
+                layerSummary.update(layerStatistics)
+            except Exception as e:
+                layerSummary["error"] = getErrorMessage(e)
+                arcpy.AddWarning("Layer " + str(layerSummary["id"]) + " - " + layerSummary["name"] + " could not be downloaded - " + layerSummary["error"])
+            finally:
+                # Stop any downloads still running for the layer if there was an error
+                layerDownload["stop"].set()
+            layerSummary["seconds"] = time.time() - layerStart
+    finally:
+        for layerDownload in layerDownloads:
+            layerDownload["stop"].set()
+        threadPool.terminate()
+        threadPool.join()
+
+    # Summary of the records, requests, bytes and time for each layer
+    arcpy.AddMessage("Service download summary - " + str(round(time.time() - serviceStart, 1)) + " seconds:")
+    for layerSummary in layerSummaries:
+        if (layerSummary["error"]):
+            summaryMessage = "Layer " + str(layerSummary["id"]) + " - " + layerSummary["name"] + " - Failed - " + layerSummary["error"]
+        else:
+            summaryMessage = "Layer " + str(layerSummary["id"]) + " - " + layerSummary["name"] + " - " + str(layerSummary["records"]) + " records, " + str(layerSummary["requests"]) + " requests, " + str(round(layerSummary["bytes"] / 1048576.0, 2)) + " MB, loaded in " + str(round(layerSummary["seconds"], 1)) + " seconds"
+        arcpy.AddMessage(summaryMessage)
+        # Logging
+        if (enableLogging == "true"):
+            logger.info(summaryMessage)
+    failedLayers = [layerSummary for layerSummary in layerSummaries if layerSummary["error"]]
+    if (failedLayers):
+        raise Exception(str(len(failedLayers)) + " of " + str(len(layerSummaries)) + " layers could not be downloaded - " + ", ".join([layerSummary["name"] for layerSummary in failedLayers]))
+# End of download service function
+
+
+# Start of get error message function
+def getErrorMessage(e):
+    # Error message from an arcpy or python error
+    if isinstance(e, arcpy.ExecuteError):
+        return arcpy.GetMessages(2)
+    return " ".join([unicode(arg).encode('utf-8') for arg in e.args])
+# End of get error message function
+
+
+# Start of get service layers function
+def getServiceLayers(mapService):
+    # Get the layers and tables in the service
+    serviceJSONData = HTTPClient.getJSON(mapService, [("f","json")])
+    if "error" in serviceJSONData:
+        raise Exception("Could not get the service information - " + str(serviceJSONData["error"].get("message")))
+    layerSelection = [layer.strip().lower() for layer in serviceLayers.split(",") if layer.strip()]
+    layers = []
+    for layer in (serviceJSONData.get("layers") or []) + (serviceJSONData.get("tables") or []):
+        # Group layers have no records and raster layers can't be queried
+        if (layer.get("subLayerIds")) or (layer.get("type", "Feature Layer") not in ["Feature Layer","Table"]):
+            continue
+        # Only the layers chosen by ID or name
+        if (layerSelection) and (str(layer["id"]) not in layerSelection) and (layer.get("name", "").lower() not in layerSelection):
+            continue
+        layers.append({"id": layer["id"], "name": layer.get("name") or ("Layer" + str(layer["id"])), "table": (layer in (serviceJSONData.get("tables") or [])) or (layer.get("type") == "Table")})
+    return layers
+# End of get service layers function
+
+
+# Start of prepare layer download function
+def prepareLayerDownload(mapServiceLayer,outputFeatureClass,updateMode):
+    # Querying the map service to get the layer information
+    arcpy.AddMessage("Querying the map service...")
+    # FUNCTION - Get the page size, object ID field and paging support for the layer
+    layerInformation = getLayerInformation(mapServiceLayer)
+    arcpy.AddMessage("Maximum records per request - " + str(layerInformation["maxRecordCount"]) + ", object ID field - " + layerInformation["objectIdField"] + ", supports pagination - " + str(layerInformation["supportsPagination"]).lower() + "...")
+
+    # Query for the records to download
+    serviceQuery = "1=1"
+    incrementalLoad = False
+    if (updateMode.lower() == "incremental"):
+        if not layerInformation["editDateField"]:
+            raise Exception("Incremental mode needs editor tracking on the layer, use New or Existing mode...")
+        # FUNCTION - Get the latest edit date downloaded by the last run
+        watermark = getWatermark(mapServiceLayer,outputFeatureClass)
+        # Only download the edited records if the output has been loaded before
+        if (watermark) and (arcpy.Exists(outputFeatureClass)) and (serviceObjectIdField.lower() in [field.name.lower() for field in arcpy.ListFields(outputFeatureClass)]):
+            incrementalLoad = True
+            serviceQuery = layerInformation["editDateField"] + " >= TIMESTAMP '" + watermark + "'"
+            arcpy.AddMessage("Downloading records edited since " + watermark + "...")
+        else:
+            arcpy.AddMessage("Output has not been loaded in incremental mode before, downloading all records...")
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Incremental mode query - " + serviceQuery)
+
+    # FUNCTION - Get the fields, geometry and format to download
+    queryOptions = getQueryOptions(layerInformation,updateMode.lower() == "incremental")
+    # Logging
+    if (enableLogging == "true"):
+        logger.info("Query options - " + urllib.urlencode(queryOptions))
+
+    # FUNCTION - Get the query for each page of records
+    pageRequests,recordTotal = getPageRequests(mapServiceLayer,layerInformation,serviceQuery,arcpy.env.scratchFolder)
+    if (incrementalLoad):
+        arcpy.AddMessage("Number of records edited - " + str(recordTotal) + "...")
+    else:
+        arcpy.AddMessage("Number of records in the layer - " + str(recordTotal) + "...")
+        if (recordTotal == 0):
+            raise Exception("No records returned from the map service...")
+    # Logging
+    if (enableLogging == "true"):
+        logger.info("Number of records in the layer - " + str(recordTotal) + ", requests to make - " + str(len(pageRequests)))
+    pageCache = None
+    if (pageCacheFolder):
+        # FUNCTION - Open the page cache for the download and find the pages already downloaded
+        pageCache = openPageCache(mapServiceLayer,serviceQuery + "&" + urllib.urlencode(queryOptions),pageRequests,recordTotal)
+        cachedPages = len([pageRequest for pageRequest in pageRequests if pageRequest["cached"]])
+        if (cachedPages > 0):
+            arcpy.AddMessage("Reusing " + str(cachedPages) + " of " + str(len(pageRequests)) + " pages downloaded by an earlier run...")
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Reusing " + str(cachedPages) + " of " + str(len(pageRequests)) + " pages downloaded by an earlier run")
+
+    layerDownload = {}
+    layerDownload["layer"] = mapServiceLayer
+    layerDownload["output"] = outputFeatureClass
+    layerDownload["updateMode"] = updateMode
+    layerDownload["layerInformation"] = layerInformation
+    layerDownload["incrementalLoad"] = incrementalLoad
+    layerDownload["queryOptions"] = queryOptions
+    layerDownload["pageRequests"] = pageRequests
+    layerDownload["recordTotal"] = recordTotal
+    layerDownload["pageCache"] = pageCache
+    layerDownload["pageSizeController"] = PageSizeController(layerInformation["maxRecordCount"])
+    layerDownload["stop"] = threading.Event()
+    return layerDownload
+# End of prepare layer download function
+
+
+# Start of start layer download function
+def startLayerDownload(layerDownload,threadPool,toFile):
+    for pageRequest in layerDownload["pageRequests"]:
+        pageRequest["queue"] = Queue.Queue(featureQueueSize)
+        pageRequest["stop"] = layerDownload["stop"]
+        pageRequest["queryOptions"] = layerDownload["queryOptions"]
+        pageRequest["pageSizeController"] = layerDownload["pageSizeController"]
+        pageRequest["downloadToFile"] = toFile
+    for pageRequest in layerDownload["pageRequests"]:
+        if not pageRequest.get("cached"):
+            # FUNCTION - Download a page of records
+            threadPool.apply_async(downloadPage, (pageRequest,))
+# End of start layer download function
+
+
+# Start of load layer download function
+def loadLayerDownload(layerDownload):
+    mapServiceLayer = layerDownload["layer"]
+    outputFeatureClass = layerDownload["output"]
+    updateMode = layerDownload["updateMode"]
+    layerInformation = layerDownload["layerInformation"]
+    incrementalLoad = layerDownload["incrementalLoad"]
+    pageRequests = layerDownload["pageRequests"]
+    recordTotal = layerDownload["recordTotal"]
+    pageCache = layerDownload["pageCache"]
+    pageSizeController = layerDownload["pageSizeController"]
+    pageSize = pageSizeController.getPageSize()
+    datasetPath = os.path.join(arcpy.env.scratchGDB, "Dataset")
+    insertCursor = None
+    cursorFields = None
+    hasGeometry = False
+    latestEditDate = None
+    # Features on the edges of tiles are in more than one tile, so keep the object IDs loaded to only load them once
+    loadedObjectIDs = None
+    if (pageRequests) and ("tile" in pageRequests[0]):
+        loadedObjectIDs = set()
+    duplicateCount = 0
+    try:
+        count = 0
+        for pageRequest in pageRequests:
+            # FUNCTION - Get the features in the page as they are downloaded
+            for itemType,item in getPageFeatures(pageRequest):
+                if (itemType == "header"):
+                    # If it's the first page
+                    if (insertCursor is None):
+                        # FUNCTION - Create new dataset from the fields in the page
+                        cursorFields = createDataset(datasetPath,item,updateMode.lower() == "incremental")
+                        hasGeometry = item.get("geometryType") in geometryTypes
+                        if (hasGeometry):
+                            insertCursor = arcpy.da.InsertCursor(datasetPath, ["SHAPE@"] + [cursorField[1] for cursorField in cursorFields])
+                        else:
+                            insertCursor = arcpy.da.InsertCursor(datasetPath, [cursorField[1] for cursorField in cursorFields])
+                else:
+                    objectID = (item.get("attributes") or {}).get(layerInformation["objectIdField"])
+                    if (loadedObjectIDs is not None) and (objectID is not None):
+                        if (objectID in loadedObjectIDs):
+                            duplicateCount = duplicateCount + 1
+                            continue
+                        loadedObjectIDs.add(objectID)
+                    # FUNCTION - Load the feature into the dataset
+                    insertCursor.insertRow(getFeatureRow(item,cursorFields,hasGeometry))
+                    # Get the latest edit date for the watermark
+                    if (layerInformation["editDateField"]):
+                        editDate = (item.get("attributes") or {}).get(layerInformation["editDateField"])
+                        if (editDate is not None) and ((latestEditDate is None) or (editDate > latestEditDate)):
+                            latestEditDate = editDate
+            # Add the page to the manifest once it has been loaded
+            if (pageCache) and (not pageRequest["cached"]):
+                # FUNCTION - Add page to the page cache
+                addCachedPage(pageCache,pageRequest)
+
+            count = count + 1
+            arcpy.AddMessage("Downloaded and converted JSON for " + str(sum([pageRequest["records"] for pageRequest in pageRequests[:count]])) + " of " + str(recordTotal) + " features...")
+            # Logging
+            if (enableLogging == "true") and (pageRequest.get("statistics")):
+                logger.info("Page " + str(count) + " - " + str(pageRequest["records"]) + " records downloaded in " + str(pageRequest["statistics"]["requests"]) + " request(s), " + str(pageRequest["statistics"]["bytes"]) + " bytes, server responded in " + str(round(pageRequest["statistics"]["seconds"], 2)) + " seconds")
+            if (pageSizeController.getPageSize() != pageSize):
+                pageSize = pageSizeController.getPageSize()
+                arcpy.AddMessage("Page size changed to " + str(pageSize) + " records...")
+                # Logging
+                if (enableLogging == "true"):
+                    logger.info("Page size changed to " + str(pageSize) + " records")
+    finally:
+        # Release the lock on the dataset
+        if insertCursor:
+            del insertCursor
+        # Stop any downloads still running if there was an error
+        layerDownload["stop"].set()
+
+    if (duplicateCount > 0):
+        arcpy.AddMessage("Skipped " + str(duplicateCount) + " features on the edges of tiles that were already loaded...")
+
+    # Bytes downloaded and server response time for the pages downloaded
+    layerStatistics = {"records": recordTotal - duplicateCount, "requests": 0, "bytes": 0}
+    pageStatistics = [pageRequest["statistics"] for pageRequest in pageRequests if pageRequest.get("statistics")]
+    if (pageStatistics):
+        requestCount = sum([statistics["requests"] for statistics in pageStatistics])
+        averageSeconds = sum([statistics["seconds"] for statistics in pageStatistics]) / max(1, requestCount)
+        layerStatistics["requests"] = requestCount
+        layerStatistics["bytes"] = sum([statistics["bytes"] for statistics in pageStatistics])
+        arcpy.AddMessage("Downloaded " + str(round(layerStatistics["bytes"] / 1048576.0, 2)) + " MB in " + str(requestCount) + " requests, average server response time - " + str(round(averageSeconds, 2)) + " seconds...")
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Downloaded " + str(layerStatistics["bytes"]) + " bytes in " + str(requestCount) + " requests, average server response time - " + str(round(averageSeconds, 2)) + " seconds")
+
+    # Apply the edited records to the output
+    loadMode = updateMode.lower()
+    if (incrementalLoad):
+        try:
+            # FUNCTION - Get all the object IDs in the layer to find the deleted records
+            objectIDs = getObjectIDs(mapServiceLayer,"1=1")
+        except Exception as e:
+            objectIDs = None
+            arcpy.AddWarning("Object IDs could not be queried (" + getErrorMessage(e) + "), so records deleted from the layer won't be deleted from the output...")
+        arcpy.AddMessage("Applying edits to " + outputFeatureClass + "...")
+        # FUNCTION - Apply the inserts, updates and deletes
+        insertCount,updateCount,deleteCount = applyEdits(datasetPath,outputFeatureClass,cursorFields,hasGeometry,objectIDs)
+        arcpy.AddMessage("Records inserted - " + str(insertCount) + ", updated - " + str(updateCount) + ", deleted - " + str(deleteCount))
+        # Logging
+        if (enableLogging == "true"):
+            logger.info("Records inserted - " + str(insertCount) + ", updated - " + str(updateCount) + ", deleted - " + str(deleteCount))
+    # Loading all records in incremental mode - Delete and append if the output exists, otherwise copy
+    elif (updateMode.lower() == "incremental") and (arcpy.Exists(outputFeatureClass)):
+        # Add the field for the map service object ID to the output
+        if (serviceObjectIdField.lower() not in [field.name.lower() for field in arcpy.ListFields(outputFeatureClass)]):
+            arcpy.AddField_management(outputFeatureClass, serviceObjectIdField, "LONG")
+        loadMode = "existing"
+    elif (updateMode.lower() == "incremental"):
+        loadMode = "new"
+
+    # Overwrite dataset
+    if (loadMode == "new"):
+        arcpy.AddMessage("Copying over final dataset...")
+        # Get record count
+        recordCount = arcpy.GetCount_management(os.path.join(arcpy.env.scratchGDB, "Dataset"))
+        arcpy.AddMessage("Number of records for " + outputFeatureClass + " - " + str(recordCount))  
+        # Logging 
+        if (enableLogging == "true"): 
+            # Log record count 
+            logger.info("Number of records for " + outputFeatureClass + " - " + str(recordCount)) 
+        # Load in data 
+        if (recordCount > 0): 
+            if (hasGeometry):
+                arcpy.CopyFeatures_management(os.path.join(arcpy.env.scratchGDB, "Dataset"), outputFeatureClass, "", "0", "0", "0")
+            else:
+                arcpy.CopyRows_management(os.path.join(arcpy.env.scratchGDB, "Dataset"), outputFeatureClass, "")
+    # Delete and append
+    elif (loadMode != "incremental"):
+        arcpy.AddMessage("Copying over final dataset...")
+        # Get record count
+        recordCount = arcpy.GetCount_management(os.path.join(arcpy.env.scratchGDB, "Dataset"))
+        arcpy.AddMessage("Number of records for " + outputFeatureClass + " - " + str(recordCount))  
+        # Logging 
+        if (enableLogging == "true"): 
+            # Log record count 
+            logger.info("Number of records for " + outputFeatureClass + " - " + str(recordCount)) 
+        # Load in data 
+        if (recordCount > 0): 
+            if (hasGeometry):
+                arcpy.DeleteFeatures_management(outputFeatureClass)
+            else:
+                arcpy.DeleteRows_management(outputFeatureClass)
+            arcpy.Append_management(os.path.join(arcpy.env.scratchGDB, "Dataset"), outputFeatureClass, "NO_TEST", "", "")           
+
+    # Save the latest edit date downloaded for the next incremental run
+    if (updateMode.lower() == "incremental") and (latestEditDate is not None):
+        # FUNCTION - Save the watermark
+        saveWatermark(mapServiceLayer,outputFeatureClass,latestEditDate)
+
+    # Remove the downloaded pages now the download has finished
+    if (pageCache) and (keepPageCache != "true"):
+        shutil.rmtree(pageCache["folder"], True)
+    return layerStatistics
+# End of load layer download function
+
+
+# Start of get layer information function
+def getLayerInformation(mapServiceLayer):
+    # Get the layer information
+    urlResponse = HTTPClient.urlopen(mapServiceLayer + "?f=json")
+    layerJSONData = json.loads(urlResponse.read())
+    if "error" in layerJSONData:
+        raise Exception("Could not get the layer information - " + str(layerJSONData["error"].get("message")))
+
+    layerInformation = {}
+    layerInformation["name"] = layerJSONData.get("name", "")
+    # Extent to split into tiles if the object IDs can't be queried
+    layerInformation["extent"] = layerJSONData.get("extent")
+    # Page size set on the server
+    layerInformation["maxRecordCount"] = int(layerJSONData.get("maxRecordCount") or defaultMaxRecords)
+    # Object ID field - Older services only have it in the field list
+    layerInformation["objectIdField"] = layerJSONData.get("objectIdField")
+    if not layerInformation["objectIdField"]:
+        for field in (layerJSONData.get("fields") or []):
+            if (field.get("type") == "esriFieldTypeOID"):
+                layerInformation["objectIdField"] = field["name"]
+    if not layerInformation["objectIdField"]:
+        layerInformation["objectIdField"] = "OBJECTID"
+    # Pagination support - Moved to advanced query capabilities at 10.3
+    advancedQueryCapabilities = layerJSONData.get("advancedQueryCapabilities") or {}
+    layerInformation["supportsPagination"] = bool(advancedQueryCapabilities.get("supportsPagination", layerJSONData.get("supportsPagination", False)))
+    # Edit date field from editor tracking - Otherwise a date field with a standard editor tracking name
+    layerInformation["editDateField"] = (layerJSONData.get("editFieldsInfo") or {}).get("editDateField")
+    if not layerInformation["editDateField"]:
+        for field in (layerJSONData.get("fields") or []):
+            if (field.get("type") == "esriFieldTypeDate") and (field["name"].lower() in ["editdate","last_edited_date","lastediteddate"]):
+                layerInformation["editDateField"] = field["name"]
+    return layerInformation
+# End of get layer information function
+
+
+# Start of get page requests function
+def getPageRequests(mapServiceLayer,layerInformation,serviceQuery,downloadFolder):
+    # Records per request is the maximum the server will return
+    maxRecords = layerInformation["maxRecordCount"]
+    objectIdField = layerInformation["objectIdField"]
+    pageRequests = []
+    usePagination = (pagingMethod.lower() == "offset") or ((pagingMethod.lower() == "automatic") and (layerInformation["supportsPagination"]))
+
+    # Page with result offset - Only need the record count
+    if (usePagination):
+        # FUNCTION - Get the number of records for the query
+        recordTotal = getRecordCount(mapServiceLayer,serviceQuery)
+        for resultOffset in range(0, recordTotal, maxRecords):
+            pageRequest = {}
+            pageRequest["layer"] = mapServiceLayer
+            pageRequest["query"] = serviceQuery
+            pageRequest["objectIdField"] = objectIdField
+            pageRequest["offset"] = resultOffset
+            pageRequest["parameters"] = [("where",serviceQuery),("orderByFields",objectIdField + " ASC"),("resultOffset",str(resultOffset)),("resultRecordCount",str(maxRecords))]
+            pageRequest["records"] = min(maxRecords, recordTotal - resultOffset)
+            pageRequest["folder"] = downloadFolder
+            pageRequests.append(pageRequest)
+    # Page with tiles of the layer extent
+    elif (pagingMethod.lower() == "tiles"):
+        # FUNCTION - Split the layer extent into tiles
+        return getTilePageRequests(mapServiceLayer,layerInformation,serviceQuery,downloadFolder)
+    # Page with object ID ranges
+    else:
+        try:
+            # FUNCTION - Get the object IDs for the query
+            objectIDs = getObjectIDs(mapServiceLayer,serviceQuery)
+        except Exception as e:
+            # Fall back to tiles if the service won't return the object IDs
+            if (pagingMethod.lower() != "automatic"):
+                raise
+            arcpy.AddMessage("Object IDs could not be queried (" + getErrorMessage(e) + "), downloading in tiles of the layer extent...")
+            # Logging
+            if (enableLogging == "true"):
+                logger.info("Object IDs could not be queried (" + getErrorMessage(e) + "), downloading in tiles of the layer extent")
+            # FUNCTION - Split the layer extent into tiles
+            return getTilePageRequests(mapServiceLayer,layerInformation,serviceQuery,downloadFolder)
+        recordTotal = len(objectIDs)
+        for start in range(0, recordTotal, maxRecords):
+            pageObjectIDs = objectIDs[start:start + maxRecords]
+            pageRequest = {}
+            pageRequest["layer"] = mapServiceLayer
+            pageRequest["query"] = serviceQuery
+            pageRequest["objectIdField"] = objectIdField
+            pageRequest["objectIDs"] = pageObjectIDs
+            # FUNCTION - Get the query for the object ID range
+            pageRequest["parameters"] = [("where",getObjectIDQuery(serviceQuery,objectIdField,pageObjectIDs))]
+            pageRequest["records"] = len(pageObjectIDs)
+            pageRequest["folder"] = downloadFolder
+            pageRequests.append(pageRequest)
+    return pageRequests,recordTotal
+# End of get page requests function
+
+
+# Start of get tile page requests function
+def getTilePageRequests(mapServiceLayer,layerInformation,serviceQuery,downloadFolder):
+    # Tiles are split into four until each tile has no more than the maximum records per request
+    maxRecords = layerInformation["maxRecordCount"]
+    extent = layerInformation["extent"]
+    if not extent:
+        raise Exception("The layer has no extent to split into tiles, so it can't be downloaded without object IDs or pagination...")
+    tiles = [(extent["xmin"],extent["ymin"],extent["xmax"],extent["ymax"])]
+    pageRequests = []
+    depth = 0
+    # Count the records in each level of tiles at the same time
+    threadPool = ThreadPool(max(1,downloadThreads))
+    try:
+        while tiles:
+            # FUNCTION - Get the number of records in each tile
+            tileCounts = threadPool.map(getTileCount, [(mapServiceLayer,serviceQuery,getTileParameters(tile,extent)) for tile in tiles])
+            splitTiles = []
+            for tile,tileCount in zip(tiles,tileCounts):
+                if (tileCount == 0):
+                    continue
+                if (tileCount <= maxRecords):
+                    pageRequest = {}
+                    pageRequest["layer"] = mapServiceLayer
+                    pageRequest["query"] = serviceQuery
+                    pageRequest["objectIdField"] = layerInformation["objectIdField"]
+                    pageRequest["tile"] = tile
+                    pageRequest["parameters"] = [("where",serviceQuery)] + getTileParameters(tile,extent)
+                    pageRequest["records"] = tileCount
+                    pageRequest["folder"] = downloadFolder
+                    pageRequests.append(pageRequest)
+                    continue
+                if (depth >= int(maxTileDepth)):
+                    raise Exception("A tile still has " + str(tileCount) + " records after splitting it " + str(depth) + " times, more than the " + str(maxRecords) + " records the server returns per request...")
+                # Split the tile into four
+                xmin,ymin,xmax,ymax = tile
+                xmid = (xmin + xmax) / 2.0
+                ymid = (ymin + ymax) / 2.0
+                splitTiles.extend([(xmin,ymin,xmid,ymid),(xmid,ymin,xmax,ymid),(xmin,ymid,xmid,ymax),(xmid,ymid,xmax,ymax)])
+            tiles = splitTiles
+            depth = depth + 1
+    finally:
+        threadPool.close()
+        threadPool.join()
+    arcpy.AddMessage("Layer extent split into " + str(len(pageRequests)) + " tiles...")
+    # Records on the edges of tiles are counted in each tile they touch
+    recordTotal = sum([pageRequest["records"] for pageRequest in pageRequests])
+    # Records outside the layer extent aren't in any tile
+    # FUNCTION - Get the number of records for the query
+    layerRecords = getRecordCount(mapServiceLayer,serviceQuery)
+    if (recordTotal < layerRecords):
+        arcpy.AddWarning(str(layerRecords - recordTotal) + " or more records are outside the layer extent and won't be downloaded...")
+        # Logging
+        if (enableLogging == "true"):
+            logger.warning(str(layerRecords - recordTotal) + " or more records are outside the layer extent and won't be downloaded")
+    return pageRequests,recordTotal
+# End of get tile page requests function
+
+
+# Start of get tile parameters function
+def getTileParameters(tile,extent):
+    # Envelope query for the tile in the spatial reference of the layer extent
+    tileParameters = [("geometry",",".join([repr(float(coordinate)) for coordinate in tile])),("geometryType","esriGeometryEnvelope"),("spatialRel","esriSpatialRelIntersects")]
+    spatialReference = extent.get("spatialReference") or {}
+    if (spatialReference.get("latestWkid") or spatialReference.get("wkid")):
+        tileParameters.append(("inSR",str(spatialReference.get("latestWkid") or spatialReference.get("wkid"))))
+    elif (spatialReference.get("wkt")):
+        tileParameters.append(("inSR",json.dumps({"wkt": spatialReference["wkt"]})))
+    return tileParameters
+# End of get tile parameters function
+
+
+# Start of get tile count function
+def getTileCount(tileQuery):
+    # Runs in a thread from the pool, so the arguments are in a tuple
+    mapServiceLayer,serviceQuery,tileParameters = tileQuery
+    # FUNCTION - Get the number of records for the query in the tile
+    return getRecordCount(mapServiceLayer,serviceQuery,tileParameters)
+# End of get tile count function
+
+
+# Start of get record count function
+def getRecordCount(mapServiceLayer,serviceQuery,queryParameters=None):
+    # Get the number of records matching the query
+    urlResponse = HTTPClient.urlopen(mapServiceLayer + "/query?" + urllib.urlencode([("where",serviceQuery)] + (queryParameters or []) + [("returnCountOnly","true"),("f","json")]))
+    countJSONData = json.loads(urlResponse.read())
+    if "error" in countJSONData:
+        raise Exception("Map service error - " + str(countJSONData["error"].get("message")))
+    return int(countJSONData["count"])
+# End of get record count function
+
+
+# Start of get object ID query function
+def getObjectIDQuery(serviceQuery,objectIdField,objectIDs):
+    # Query for the records from the first to the last object ID
+    objectIDQuery = objectIdField + ">=" + str(int(objectIDs[0])) + " AND " + objectIdField + "<=" + str(int(objectIDs[-1]))
+    if (serviceQuery != "1=1"):
+        objectIDQuery = "(" + serviceQuery + ") AND " + objectIDQuery
+    return objectIDQuery
+# End of get object ID query function
+
+
+# Start of get page parameters function
+def getPageParameters(pageRequest,start,records):
+    # Whole page
+    if (start == 0) and (records == pageRequest["records"]):
+        return pageRequest["parameters"]
+    # Part of the page when the page size has been made smaller - Object ID range or offset into the page
+    if "objectIDs" in pageRequest:
+        # FUNCTION - Get the query for the object ID range
+        return [("where",getObjectIDQuery(pageRequest["query"],pageRequest["objectIdField"],pageRequest["objectIDs"][start:start + records]))]
+    return [("where",pageRequest["query"]),("orderByFields",pageRequest["objectIdField"] + " ASC"),("resultOffset",str(pageRequest["offset"] + start)),("resultRecordCount",str(records))]
+# End of get page parameters function
+
+
+# Start of get query options function
+def getQueryOptions(layerInformation,incremental):
+    # Fields to download - The object ID is needed to page and match records and the edit date for the watermark
+    fieldNames = "*"
+    if (outFields.strip() not in ["","*"]):
+        fieldNames = [fieldName.strip() for fieldName in outFields.split(",") if fieldName.strip()]
+        requiredFields = [layerInformation["objectIdField"]]
+        if (incremental) and (layerInformation["editDateField"]):
+            requiredFields.append(layerInformation["editDateField"])
+        for requiredField in requiredFields:
+            if (requiredField.lower() not in [fieldName.lower() for fieldName in fieldNames]):
+                fieldNames.append(requiredField)
+        fieldNames = ",".join(fieldNames)
+    queryOptions = [("returnGeometry","true"),("outFields",fieldNames)]
+    # Reduce the size of the geometry
+    if (str(geometryPrecision).strip()):
+        queryOptions.append(("geometryPrecision",str(geometryPrecision).strip()))
+    if (str(maxAllowableOffset).strip()):
+        queryOptions.append(("maxAllowableOffset",str(maxAllowableOffset).strip()))
+    queryOptions.append(("f",responseFormat))
+    return queryOptions
+# End of get query options function
+
+
+# Start of get object IDs function
+def getObjectIDs(mapServiceLayer,serviceQuery):
+    # Get the object IDs for the records matching the query in order
+    urlResponse = HTTPClient.urlopen(mapServiceLayer + "/query?" + urllib.urlencode([("where",serviceQuery),("returnIdsOnly","true"),("f","json")]))
+    objectIDsJSONData = json.loads(urlResponse.read())
+    if "error" in objectIDsJSONData:
+        raise Exception("Map service error - " + str(objectIDsJSONData["error"].get("message")))
+    # Some services limit the number of object IDs returned
+    if (objectIDsJSONData.get("exceededTransferLimit")):
+        raise Exception("Map service returned only some of the object IDs...")
+    objectIDs = objectIDsJSONData.get("objectIds") or []
+    objectIDs.sort()
+    return objectIDs
+# End of get object IDs function
+
+
+# Start of download page function
+def downloadPage(pageRequest):
+    # Runs in a download thread, so only download the page - Loading is done by the main thread
+    try:
+        pageSizeController = pageRequest["pageSizeController"]
+        pageRequest["statistics"] = {"requests": 0, "seconds": 0, "bytes": 0}
+        start = 0
+        part = 0
+        # Download the page in parts if the page size has been made smaller
+        while (start < pageRequest["records"]):
+            records = min(pageSizeController.getPageSize(), pageRequest["records"] - start)
+            # Tiles are downloaded whole as they can't be split by record
+            canShrink = pageSizeController.canShrink(records) and ("tile" not in pageRequest)
+            if "tile" in pageRequest:
+                records = pageRequest["records"]
+            # Only retry once before making the page size smaller, unless it can't be made any smaller
+            retries = None
+            if (canShrink):
+                retries = 1
+            featureCount = 0
+            downloadedFile = None
+            try:
+                # Query the map service to data in json format
+                mapServiceQuery2 = pageRequest["layer"] + "/query?" + urllib.urlencode(getPageParameters(pageRequest,start,records) + pageRequest["queryOptions"])
+                requestStart = time.time()
+                response = HTTPClient.urlopen(mapServiceQuery2, None, None, retries)
+                responseSeconds = time.time() - requestStart
+
+                # Download the data to a file - Written to a part file first so only complete pages are in the page cache
+                if (pageRequest["downloadToFile"]):
+                    fileChunk = 16 * 1024
+                    if pageRequest.get("cacheFile"):
+                        downloadedFile = getPartFile(pageRequest,part)
+                    else:
+                        downloadedFile = os.path.join(pageRequest["folder"], "Data-" + str(uuid.uuid1()) + ".json")
+                    with open(downloadedFile + ".part", 'wb') as file:
+                        while True:
+                            chunk = response.read(fileChunk)
+                            if not chunk:
+                                break
+                            # Write chunk to output file
+                            file.write(chunk)
+                    os.rename(downloadedFile + ".part", downloadedFile)
+                    putQueueItem(pageRequest,("file",downloadedFile))
+                # Read the features from the response as it downloads
+                else:
+                    # Keep a copy of the response in the page cache as it is read
+                    if pageRequest.get("cacheFile"):
+                        downloadedFile = getPartFile(pageRequest,part)
+                        with open(downloadedFile + ".part", 'wb') as cacheFile:
+                            for queueItem in readFeatures(CopyStream(response,cacheFile)):
+                                putQueueItem(pageRequest,queueItem)
+                                if (queueItem[0] == "feature"):
+                                    featureCount = featureCount + 1
+                        os.rename(downloadedFile + ".part", downloadedFile)
+                    else:
+                        for queueItem in readFeatures(response):
+                            putQueueItem(pageRequest,queueItem)
+                            if (queueItem[0] == "feature"):
+                                featureCount = featureCount + 1
+            except Exception:
+                # Make the page size smaller and try again, unless features from the response have already been loaded
+                if (pageRequest["stop"].is_set()) or (featureCount > 0) or (not canShrink):
+                    raise
+                if (downloadedFile) and (os.path.exists(downloadedFile + ".part")):
+                    os.remove(downloadedFile + ".part")
+                pageSizeController.pageFailed(records)
+                continue
+
+            # FUNCTION - Make the page size smaller or larger from the time the server took to respond
+            pageSizeController.pageDownloaded(records,responseSeconds)
+            pageRequest["statistics"]["requests"] = pageRequest["statistics"]["requests"] + 1
+            pageRequest["statistics"]["seconds"] = pageRequest["statistics"]["seconds"] + responseSeconds
+            pageRequest["statistics"]["bytes"] = pageRequest["statistics"]["bytes"] + response.bytesRead
+            start = start + records
+            part = part + 1
+        pageRequest["parts"] = part
+        putQueueItem(pageRequest,("end",None))
+    # Error is raised in the main thread when the page is loaded
+    except Exception as e:
+        if not pageRequest["stop"].is_set():
+            putQueueItem(pageRequest,("error",e))
+# End of download page function
+
+
+# Start of get part file function
+def getPartFile(pageRequest,part):
+    # First part of a page is the page file in the page cache, later parts are numbered
+    if (part == 0):
+        return pageRequest["cacheFile"]
+    fileName,fileExtension = os.path.splitext(pageRequest["cacheFile"])
+    return fileName + "-" + str(part + 1) + fileExtension
+# End of get part file function
+
+
+# Start of page size controller class
+class PageSizeController(object):
+    # Page size shared by the download threads - Halved when a page is slow or fails and doubled when pages are fast
+    def __init__(self, maxRecords):
+        self.maxRecords = maxRecords
+        self.minRecords = max(1, min(int(minimumPageSize), maxRecords))
+        self.pageSize = maxRecords
+        self.lock = threading.Lock()
+
+    def getPageSize(self):
+        with self.lock:
+            return self.pageSize
+
+    def canShrink(self, records):
+        return (adaptivePageSize == "true") and (records > self.minRecords)
+
+    def pageDownloaded(self, records, seconds):
+        if (adaptivePageSize != "true"):
+            return
+        with self.lock:
+            if (seconds > float(slowPageSeconds)):
+                self.pageSize = max(self.minRecords, min(self.pageSize, records) // 2)
+            # Only grow for full size pages, not the last page
+            elif (seconds < float(fastPageSeconds)) and (records >= self.pageSize):
+                self.pageSize = min(self.maxRecords, self.pageSize * 2)
+
+    def pageFailed(self, records):
+        with self.lock:
+            self.pageSize = max(self.minRecords, min(self.pageSize, records) // 2)
+# End of page size controller class
+
+
+# Start of put queue item function
+def putQueueItem(pageRequest,queueItem):
+    # Wait for the main thread to load the features already in the queue, unless the download has been stopped
+    while not pageRequest["stop"].is_set():
+        try:
+            pageRequest["queue"].put(queueItem, True, 1)
+            return
+        except Queue.Full:
+            pass
+    raise Exception("Download stopped...")
+# End of put queue item function
+
+
+# Start of get page features function
+def getPageFeatures(pageRequest):
+    # Read the features for a page downloaded by an earlier run from the page cache
+    if pageRequest.get("cached"):
+        for part in range(pageRequest.get("parts", 1)):
+            # FUNCTION - Get the file for the part of the page
+            with open(getPartFile(pageRequest,part), 'rb') as file:
+                for fileItem in readFeatures(file):
+                    yield fileItem
+        return
+    # Get the header and then the features for a page from the download thread
+    while True:
+        itemType,item = pageRequest["queue"].get()
+        if (itemType == "error"):
+            raise item
+        if (itemType == "end"):
+            break
+        # Read the features from the downloaded file and remove it once loaded, unless it is in the page cache
+        if (itemType == "file"):
+            with open(item, 'rb') as file:
+                for fileItem in readFeatures(file):
+                    yield fileItem
+            if not pageRequest.get("cacheFile"):
+                os.remove(item)
+        else:
+            yield itemType,item
+# End of get page features function
+
+
+# Start of open page cache function
+def openPageCache(mapServiceLayer,query,pageRequests,recordTotal):
+    # FUNCTION - Remove the pages from downloads that have expired
+    cleanPageCache()
+    # Pages for the layer and query are kept in their own folder
+    cacheFolder = os.path.join(pageCacheFolder, hashlib.sha1((mapServiceLayer.rstrip("/").lower() + "?" + query).encode("utf-8")).hexdigest())
+    manifestFile = os.path.join(cacheFolder, "Manifest.json")
+    manifest = None
+    if (os.path.exists(manifestFile)):
+        with open(manifestFile, "r") as file:
+            manifest = json.load(file)
+        # Pages can't be reused if records have been added or deleted since
+        if (manifest.get("recordTotal") != recordTotal):
+            shutil.rmtree(cacheFolder, True)
+            manifest = None
+    if (manifest is None):
+        manifest = {"layer": mapServiceLayer, "query": query, "recordTotal": recordTotal, "created": time.time(), "pages": {}}
+    if not os.path.exists(cacheFolder):
+        os.makedirs(cacheFolder)
+    # Remove any pages that were partly downloaded
+    for fileName in os.listdir(cacheFolder):
+        if fileName.endswith(".part"):
+            os.remove(os.path.join(cacheFolder, fileName))
+
+    pageCache = {"folder": cacheFolder, "manifestFile": manifestFile, "manifest": manifest}
+    for pageRequest in pageRequests:
+        pageRequest["pageKey"] = hashlib.sha1(urllib.urlencode(pageRequest["parameters"])).hexdigest()
+        pageRequest["folder"] = cacheFolder
+        pageRequest["cacheFile"] = os.path.join(cacheFolder, "Page-" + pageRequest["pageKey"] + ".json")
+        pageRequest["cached"] = (pageRequest["pageKey"] in manifest["pages"]) and (os.path.exists(pageRequest["cacheFile"]))
+        if (pageRequest["cached"]):
+            pageRequest["parts"] = manifest["pages"][pageRequest["pageKey"]].get("parts", 1)
+    # FUNCTION - Save the manifest
+    savePageCache(pageCache)
+    return pageCache
+# End of open page cache function
+
+
+# Start of add cached page function
+def addCachedPage(pageCache,pageRequest):
+    # Record the query, record count and number of parts for the page
+    pageCache["manifest"]["pages"][pageRequest["pageKey"]] = {"parameters": pageRequest["parameters"], "records": pageRequest["records"], "parts": pageRequest.get("parts", 1), "downloaded": time.time()}
+    pageRequest["cached"] = True
+    # FUNCTION - Save the manifest
+    savePageCache(pageCache)
+# End of add cached page function
+
+
+# Start of save page cache function
+def savePageCache(pageCache):
+    # Write to a new file and then replace the manifest, so the manifest is never half written
+    with open(pageCache["manifestFile"] + ".part", "w") as file:
+        json.dump(pageCache["manifest"], file)
+    if os.path.exists(pageCache["manifestFile"]):
+        os.remove(pageCache["manifestFile"])
+    os.rename(pageCache["manifestFile"] + ".part", pageCache["manifestFile"])
+# End of save page cache function
+
+
+# Start of clean page cache function
+def cleanPageCache():
+    # Remove the pages for downloads started more than the page cache hours ago
+    if not os.path.exists(pageCacheFolder):
+        return
+    for folderName in os.listdir(pageCacheFolder):
+        cacheFolder = os.path.join(pageCacheFolder, folderName)
+        if not os.path.isdir(cacheFolder):
+            continue
+        created = os.path.getmtime(cacheFolder)
+        manifestFile = os.path.join(cacheFolder, "Manifest.json")
+        if os.path.exists(manifestFile):
+            try:
+                with open(manifestFile, "r") as file:
+                    created = json.load(file).get("created", created)
+            except ValueError:
+                pass
+        if ((time.time() - created) > (float(pageCacheHours) * 3600)):
+            arcpy.AddMessage("Removing expired page cache " + cacheFolder + "...")
+            shutil.rmtree(cacheFolder, True)
+# End of clean page cache function
+
+
+# Start of copy stream class
+class CopyStream(object):
+    # Writes what is read from a stream to a file
+    def __init__(self, stream, file):
+        self.stream = stream
+        self.file = file
+
+    def read(self, size):
+        chunk = self.stream.read(size)
+        self.file.write(chunk)
+        return chunk
+# End of copy stream class
+
+
+# Start of get watermark function
+def getWatermark(mapServiceLayer,outputFeatureClass):
+    # Latest edit date downloaded from the layer into the output
+    if not os.path.exists(watermarkFile):
+        return None
+    with open(watermarkFile, "r") as file:
+        watermarks = json.load(file)
+    watermark = watermarks.get(mapServiceLayer.rstrip("/").lower() + "|" + outputFeatureClass.lower())
+    if not watermark:
+        return None
+    return watermark["editDate"]
+# End of get watermark function
+
+
+# Start of save watermark function
+def saveWatermark(mapServiceLayer,outputFeatureClass,latestEditDate):
+    watermarks = {}
+    if os.path.exists(watermarkFile):
+        with open(watermarkFile, "r") as file:
+            watermarks = json.load(file)
+    # Edit dates are milliseconds since 1970 in UTC, stored to the second for the timestamp query
+    editDate = (datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=latestEditDate)).strftime("%Y-%m-%d %H:%M:%S")
+    watermarks[mapServiceLayer.rstrip("/").lower() + "|" + outputFeatureClass.lower()] = {"editDate": editDate, "updated": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    with open(watermarkFile, "w") as file:
+        json.dump(watermarks, file, indent=2, sort_keys=True)
+    arcpy.AddMessage("Latest edit date downloaded - " + editDate + "...")
+# End of save watermark function
+
+
+# Start of apply edits function
+def applyEdits(datasetPath,outputFeatureClass,cursorFields,hasGeometry,objectIDs):
+    # Edited records keyed by the map service object ID - None if no records were edited
+    editedRecords = {}
+    outputFields = [field.name.lower() for field in arcpy.ListFields(outputFeatureClass)]
+    editFields = [serviceObjectIdField]
+    if (cursorFields):
+        editFields = editFields + [cursorField[1] for cursorField in cursorFields if (cursorField[1].lower() in outputFields) and (cursorField[1] != serviceObjectIdField)]
+        if (hasGeometry):
+            editFields.append("SHAPE@")
+        with arcpy.da.SearchCursor(datasetPath, editFields) as searchCursor:
+            for row in searchCursor:
+                editedRecords[row[0]] = row
+
+    # Edits are made in an edit session so they are applied in a single transaction
+    workspace = os.path.dirname(outputFeatureClass)
+    if (arcpy.Describe(workspace).dataType == "FeatureDataset"):
+        workspace = os.path.dirname(workspace)
+    # Records can't be deleted if the object IDs couldn't be queried
+    serviceObjectIDs = None
+    if (objectIDs is not None):
+        serviceObjectIDs = set(objectIDs)
+    insertCount = 0
+    updateCount = 0
+    deleteCount = 0
+    editor = arcpy.da.Editor(workspace)
+    editor.startEditing(False, bool(arcpy.Describe(outputFeatureClass).isVersioned))
+    editor.startOperation()
+    try:
+        # Update the edited records and delete the records no longer in the layer
+        with arcpy.da.UpdateCursor(outputFeatureClass, editFields) as updateCursor:
+            for row in updateCursor:
+                if (row[0] in editedRecords):
+                    updateCursor.updateRow(editedRecords.pop(row[0]))
+                    updateCount = updateCount + 1
+                elif (serviceObjectIDs is not None) and (row[0] not in serviceObjectIDs):
+                    updateCursor.deleteRow()
+                    deleteCount = deleteCount + 1
+        # Insert the new records
+        with arcpy.da.InsertCursor(outputFeatureClass, editFields) as insertCursor:
+            for objectID in sorted(editedRecords):
+                insertCursor.insertRow(editedRecords[objectID])
+                insertCount = insertCount + 1
+        editor.stopOperation()
+        editor.stopEditing(True)
+    except:
+        editor.abortOperation()
+        editor.stopEditing(False)
+        raise
+    return insertCount,updateCount,deleteCount
+# End of apply edits function
+
+
+# Start of esri json reader class
+class EsriJSONReader(object):
+    # Reads Esri JSON a chunk at a time, so only the value being read is held in memory
+    def __init__(self, stream, chunkSize=64 * 1024):
+        self.stream = stream
+        self.chunkSize = chunkSize
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.finished = False
+
+    def readChunk(self, readSize=None):
+        # Add the next chunk to the buffer, dropping what has already been read
+        chunk = self.stream.read(readSize or self.chunkSize)
+        if not chunk:
+            self.finished = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        # Get the next character that isn't whitespace
+        while True:
+            while (self.position < len(self.buffer)) and (self.buffer[self.position] in " \t\r\n"):
+                self.position = self.position + 1
+            if (self.position < len(self.buffer)):
+                return self.buffer[self.position]
+            if not self.readChunk():
+                raise ValueError("Unexpected end of JSON")
+
+    def expect(self, characters):
+        # Read one of the characters
+        character = self.peek()
+        if (character not in characters):
+            raise ValueError("Expected " + " or ".join(characters) + " in JSON but found " + character)
+        self.position = self.position + 1
+        return character
+
+    def value(self):
+        # Read a value, reading more chunks until the value is complete - Each chunk read for the same value is double
+        # the size of the last, so a large value is only decoded a few times rather than once for every chunk
+        self.peek()
+        readSize = self.chunkSize
+        while True:
+            try:
+                value,end = self.decoder.raw_decode(self.buffer, self.position)
+                # A number at the end of the buffer could carry on in the next chunk
+                if (end < len(self.buffer)) or self.finished or (not self.readChunk(readSize)):
+                    self.position = end
+                    return value
+            except ValueError:
+                if not self.readChunk(readSize):
+                    raise
+            readSize = readSize * 2
+# End of esri json reader class
+
+
+# Start of read features function
+def readFeatures(stream):
+    # Yields the header (everything but the features) once the features are reached and then each feature
+    reader = EsriJSONReader(stream)
+    header = {}
+    reader.expect("{")
+    if (reader.peek() == "}"):
+        reader.expect("}")
+    else:
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if (key == "features"):
+                yield "header",header
+                reader.expect("[")
+                if (reader.peek() == "]"):
+                    reader.expect("]")
+                else:
+                    while True:
+                        yield "feature",reader.value()
+                        if (reader.expect(",]") == "]"):
+                            break
+                header["features"] = True
+            else:
+                header[key] = reader.value()
+            if (reader.expect(",}") == "}"):
+                break
+
+    if "error" in header:
+        raise Exception("Map service error - " + str(header["error"].get("message")) + " " + " ".join([str(detail) for detail in header["error"].get("details") or []]))
+    if "features" not in header:
+        raise Exception("No data returned, check the URL...")
+# End of read features function
+
+
+# Start of create dataset function
+def createDataset(datasetPath,header,addServiceObjectID):
+    # Spatial reference of the features
+    spatialReferenceJSON = header.get("spatialReference") or {}
+    spatialReference = None
+    if (spatialReferenceJSON.get("latestWkid") or spatialReferenceJSON.get("wkid")):
+        spatialReference = arcpy.SpatialReference(int(spatialReferenceJSON.get("latestWkid") or spatialReferenceJSON.get("wkid")))
+    elif (spatialReferenceJSON.get("wkt")):
+        spatialReference = arcpy.SpatialReference()
+        spatialReference.loadFromString(spatialReferenceJSON["wkt"])
+
+    # Create a feature class or a table if the layer has no geometry
+    workspace,datasetName = os.path.split(datasetPath)
+    if (header.get("geometryType") in geometryTypes):
+        hasM = "ENABLED" if header.get("hasM") else "DISABLED"
+        hasZ = "ENABLED" if header.get("hasZ") else "DISABLED"
+        arcpy.CreateFeatureclass_management(workspace, datasetName, geometryTypes[header["geometryType"]], "", hasM, hasZ, spatialReference)
+    else:
+        arcpy.CreateTable_management(workspace, datasetName)
+
+    # Add the fields - Object ID, geometry and fields already in the dataset aren't copied
+    existingFields = [field.name.lower() for field in arcpy.ListFields(datasetPath)]
+    cursorFields = []
+    for field in (header.get("fields") or []):
+        if (field.get("type") in fieldTypes):
+            fieldName = arcpy.ValidateFieldName(field["name"], workspace)
+            if (fieldName.lower() not in existingFields):
+                fieldLength = ""
+                if (fieldTypes[field["type"]] == "TEXT"):
+                    fieldLength = field.get("length") or 255
+                arcpy.AddField_management(datasetPath, fieldName, fieldTypes[field["type"]], "", "", fieldLength, field.get("alias") or "")
+                existingFields.append(fieldName.lower())
+                cursorFields.append([field["name"],fieldName,field["type"]])
+        # Copy the object ID to match records in incremental mode
+        elif (field.get("type") == "esriFieldTypeOID") and (addServiceObjectID):
+            arcpy.AddField_management(datasetPath, serviceObjectIdField, "LONG")
+            cursorFields.append([field["name"],serviceObjectIdField,field["type"]])
+    return cursorFields
+# End of create dataset function
+
+
+# Start of get feature row function
+def getFeatureRow(feature,cursorFields,hasGeometry):
+    row = []
+    if (hasGeometry):
+        geometry = feature.get("geometry")
+        if (geometry):
+            row.append(arcpy.AsShape(geometry, True))
+        else:
+            row.append(None)
+    attributes = feature.get("attributes") or {}
+    for fieldName,datasetFieldName,fieldType in cursorFields:
+        value = attributes.get(fieldName)
+        # Dates are milliseconds since 1970
+        if (fieldType == "esriFieldTypeDate") and (value is not None):
+            value = datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=value)
+        row.append(value)
+    return row
+# End of get feature row function
+
+
 # Start of set logging function
 def setLogging(logFile):
     # Create a logger
@@ -265,11 +1345,18 @@ if __name__ == '__main__':
         logger, logMessage = setLogging(logFile)
         # Log start of process
         logger.info("Process started.")
+    # Get the optional flags from the arguments e.g. --threads=4
+    argv = list(argv)
+    for argument in list(argv):
+        if (argument.lower().startswith("--threads=")):
+            downloadThreads = int(argument.split("=")[1])
+            argv.remove(argument)
+        elif (argument.lower().startswith("--layers=")):
+            serviceLayers = argument.split("=",1)[1]
+            argv.remove(argument)
+    # Allow a request to the server for each download thread
+    HTTPClient.maxConnectionsPerHost = max(HTTPClient.maxConnectionsPerHost, downloadThreads)
     # Setup the use of a proxy for requests
     if (enableProxy == "true"):
-        # Setup the proxy
-        proxy = urllib2.ProxyHandler({requestProtocol : proxyURL})
-        openURL = urllib2.build_opener(proxy)
-        # Install the proxy
-        urllib2.install_opener(openURL)
+        HTTPClient.proxyURL = proxyURL
     mainFunction(*argv)
@@ -1,6 +1,7 @@
 #-------------------------------------------------------------
 # Name:       NZAA ArchSite Data Download
 # Purpose:    Downloads archaeological data from the NZAA ArchSite and loads it into a database. 
+#             Large exports are downloaded as byte ranges at the same time when the server accepts ranges.
 # Author:     Shaun Weston (shaun_weston@eagle.co.nz)
 # Date Created:    22/05/2015
 # Last Updated:    25/05/2015
@@ -17,10 +18,10 @@ import smtplib
 import arcpy
 import json
 import urllib
-import urllib2
 import zipfile
 import glob
 import shutil
+import HTTPClient
 
 # Enable data to be overwritten
 arcpy.env.overwriteOutput = True
@@ -35,8 +36,7 @@ emailPassword = ""
 emailSubject = ""
 emailMessage = ""
 enableProxy = "false"
-requestProtocol = "http" # http or https
-proxyURL = ""
+proxyURL = "" # Proxy for http and https requests e.g. http://proxy.example.com:8080
 output = None
 
 # Start of main function
@@ -58,8 +58,8 @@ def mainFunction(username,password,dataFormat,outputLocation,updateMode): # Get
         
         # Query the gp service with the parameters
         arcpy.AddMessage("Querying the GP service...")
-        gpServiceQuery = gpService + "/execute?User_Name=" + username + "&Output_Format=" + dataFormat + "&Connection_SDE=" + sdeConnectionOnServer + "&token=" + token + "&f=pjson"        
-        urlResponse = urllib.urlopen(gpServiceQuery);
+        gpServiceQuery = gpService + "/execute?" + urllib.urlencode([("User_Name",username),("Output_Format",dataFormat),("Connection_SDE",sdeConnectionOnServer),("token",token),("f","pjson")])
+        urlResponse = HTTPClient.urlopen(gpServiceQuery)
 
         # Get json for the response
         gpServiceQueryJSONData = json.loads(urlResponse.read())
@@ -67,18 +67,8 @@ def mainFunction(username,password,dataFormat,outputLocation,updateMode): # Get
         downloadLink = "https://nzaa.eaglegis.co.nz/NZAAExports/" + username + "/" + gpResultValue
 
         arcpy.AddMessage("Downloading the data...")
-        # Download the file from the link
-        file = urllib2.urlopen(downloadLink)
-        # Download in chunks
-        fileChunk = 16 * 1024
-        with open(os.path.join(arcpy.env.scratchFolder, "Data.zip"), 'wb') as output:
-            while True:
-                chunk = file.read(fileChunk)
-                if not chunk:
-                    break
-                # Write chunk to output file
-                output.write(chunk)
-        output.close()
+        # Download the file from the link - Downloaded as byte ranges at the same time if the server accepts ranges
+        HTTPClient.downloadFile(downloadLink, os.path.join(arcpy.env.scratchFolder, "Data.zip"))
 
         # Unzip the file to the scratch folder
         arcpy.AddMessage("Extracting zip file...")  
@@ -209,7 +199,7 @@ def getToken(username, password, serverName, serverPort):
     url = "http://{}:{}/arcgis/tokens/generateToken?f=json".format(serverName, serverPort)
    
     try:
-        token = json.loads(urllib2.urlopen(url, query_string).read())
+        token = json.loads(HTTPClient.urlopen(url, query_string).read())
         if "token" not in token or token == None:
             arcpy.AddError("Failed to get token, return message from server:")
             arcpy.AddError(token['messages'])            
@@ -222,7 +212,7 @@ def getToken(username, password, serverName, serverPort):
             # Return the token to the function which called for it
             return token['token']
     
-    except urllib2.URLError, error:
+    except HTTPClient.RequestError, error:
         arcpy.AddError("Could not connect to machine {} on port {}".format(serverName, serverPort))
         arcpy.AddError(error)
         # Logging
@@ -286,10 +276,6 @@ if __name__ == '__main__':
         logger.info("Process started.")
     # Setup the use of a proxy for requests
     if (enableProxy == "true"):
-        # Setup the proxy
-        proxy = urllib2.ProxyHandler({requestProtocol : proxyURL})
-        openURL = urllib2.build_opener(proxy)
-        # Install the proxy
-        urllib2.install_opener(openURL)
+        HTTPClient.proxyURL = proxyURL
     mainFunction(*argv)
     
@@ -0,0 +1,172 @@
+#-------------------------------------------------------------
+# Name:       Record Changes
+# Purpose:    Shared change detection used by the toolkit scripts to update a dataset in place. Matches the
+#             records in the source to the records in the output dataset on a key field, using a hash of the
+#             attributes and geometry of each record, and only applies the inserts, updates and deletes in an
+#             edit session. Datasets that are the same as the source are not edited at all. Records can't be
+#             matched when the key field has null or duplicate values, so no changes are applied and the dataset
+#             needs to be deleted and appended instead.
+# Author:     Shaun Weston (shaun_weston@eagle.co.nz)
+# Date Created:    18/10/2026
+# Last Updated:    18/10/2026
+# Copyright:   (c) Eagle Technology
+# ArcGIS Version:   ArcGIS for Desktop 10.1+
+# Python Version:   2.7/3.x
+#--------------------------------
+
+# Import main modules
+import os
+import hashlib
+import numbers
+import arcpy
+
+
+# Start of get key field function
+def getKeyField(datasetName,keyFields,sourceFieldNames,outputDataset):
+    # Get the key field for the dataset - A key field without a dataset name is used for every dataset e.g. "Roads:RoadID,AssetID"
+    keyField = ""
+    for keyFieldSetting in keyFields.split(","):
+        if (":" in keyFieldSetting):
+            if (keyFieldSetting.split(":")[0].strip().lower() == datasetName.lower()):
+                keyField = keyFieldSetting.split(":")[1].strip()
+                break
+        elif (keyFieldSetting.strip()):
+            keyField = keyFieldSetting.strip()
+
+    # Key field needs to be in the source and be a field that can be written to in the output dataset - Otherwise there is no key field
+    outputFields = dict([(field.name.lower(), field.name) for field in arcpy.ListFields(outputDataset) if (field.editable) and (field.type not in ["OID","GlobalID","Geometry","Raster"])])
+    if (not keyField) or (keyField.lower() not in [fieldName.lower() for fieldName in sourceFieldNames]) or (keyField.lower() not in outputFields):
+        return ""
+    return outputFields[keyField.lower()]
+# End of get key field function
+
+
+# Start of update changed records function
+def updateChangedRecords(sourceDataset,outputDataset,keyField):
+    # FUNCTION - Get the fields to compare between the datasets
+    updateFields = [keyField] + getCompareFields([field.name for field in arcpy.ListFields(sourceDataset)],outputDataset,keyField)
+    # Compare the geometry too for feature classes
+    if (arcpy.Describe(outputDataset).dataType == "FeatureClass"):
+        updateFields.append("SHAPE@")
+
+    with arcpy.da.SearchCursor(sourceDataset, updateFields) as searchCursor:
+        # FUNCTION - Apply the inserts, updates and deletes from the source records
+        return applyChanges(searchCursor,outputDataset,updateFields)
+# End of update changed records function
+
+
+# Start of get compare fields function
+def getCompareFields(sourceFieldNames,outputDataset,keyField):
+    # Get the fields that can be updated in the output dataset
+    outputFields = {}
+    for field in arcpy.ListFields(outputDataset):
+        if (field.editable) and (field.type not in ["OID","GlobalID","Geometry","Raster"]):
+            outputFields[field.name.lower()] = field.name
+
+    # Get the fields in the source that are also in the output dataset
+    compareFields = []
+    for fieldName in sourceFieldNames:
+        if (fieldName.lower() in outputFields) and (fieldName.lower() != keyField.lower()) and (outputFields[fieldName.lower()] not in compareFields):
+            compareFields.append(outputFields[fieldName.lower()])
+
+    return compareFields
+# End of get compare fields function
+
+
+# Start of apply changes function
+def applyChanges(sourceRows,outputDataset,updateFields):
+    # Source rows have the key field first and the geometry last for feature classes - Returns None without making any
+    # changes if the key field has null or duplicate values in either dataset
+    hasGeometry = (updateFields[-1] == "SHAPE@")
+    changeCounts = {"inserted": 0,
+                    "updated": 0,
+                    "deleted": 0,
+                    "unchanged": 0}
+
+    # FUNCTION - Get a hash of each record in the output dataset keyed by the key field
+    outputHashes = {}
+    with arcpy.da.SearchCursor(outputDataset, updateFields) as searchCursor:
+        for row in searchCursor:
+            if (row[0] is None) or (row[0] in outputHashes):
+                return None
+            outputHashes[row[0]] = getRecordHash(row,hasGeometry)
+
+    # Work out the inserts and updates from the source records, only the records that have changed are kept
+    insertRecords = []
+    updateRecords = {}
+    geometryKeys = set()
+    sourceKeys = set()
+    for row in sourceRows:
+        if (row[0] is None) or (row[0] in sourceKeys):
+            return None
+        sourceKeys.add(row[0])
+        outputHash = outputHashes.pop(row[0], None)
+        if (outputHash is None):
+            insertRecords.append(list(row))
+            continue
+        # FUNCTION - Get a hash of the source record
+        recordHash = getRecordHash(row,hasGeometry)
+        if (recordHash == outputHash):
+            changeCounts["unchanged"] = changeCounts["unchanged"] + 1
+        else:
+            updateRecords[row[0]] = list(row)
+            # If only the geometry is different, check it again in the update as the coordinates may have been snapped when stored
+            if (recordHash[0] == outputHash[0]):
+                geometryKeys.add(row[0])
+    # Records left in the output dataset are no longer in the source
+    deleteKeys = set(outputHashes)
+    del outputHashes
+    del sourceKeys
+
+    # If there are changes to apply
+    if (len(insertRecords) > 0) or (len(updateRecords) > 0) or (len(deleteKeys) > 0):
+        # Edits are made in an edit session so they are applied in a single transaction
+        workspace = os.path.dirname(outputDataset)
+        if (arcpy.Describe(workspace).dataType == "FeatureDataset"):
+            workspace = os.path.dirname(workspace)
+        editor = arcpy.da.Editor(workspace)
+        editor.startEditing(False, bool(arcpy.Describe(outputDataset).isVersioned))
+        editor.startOperation()
+        try:
+            # Update and delete the records in the output dataset
+            with arcpy.da.UpdateCursor(outputDataset, updateFields) as updateCursor:
+                for row in updateCursor:
+                    if (row[0] in deleteKeys):
+                        updateCursor.deleteRow()
+                        changeCounts["deleted"] = changeCounts["deleted"] + 1
+                    elif (row[0] in updateRecords):
+                        # Geometry is the same within the tolerance of the output dataset
+                        if (row[0] in geometryKeys) and (row[-1]) and (updateRecords[row[0]][-1]) and (row[-1].equals(updateRecords[row[0]][-1])):
+                            changeCounts["unchanged"] = changeCounts["unchanged"] + 1
+                            continue
+                        updateCursor.updateRow(updateRecords[row[0]])
+                        changeCounts["updated"] = changeCounts["updated"] + 1
+            # Insert the new records
+            with arcpy.da.InsertCursor(outputDataset, updateFields) as insertCursor:
+                for row in insertRecords:
+                    insertCursor.insertRow(row)
+                    changeCounts["inserted"] = changeCounts["inserted"] + 1
+            editor.stopOperation()
+            editor.stopEditing(True)
+        except:
+            editor.abortOperation()
+            editor.stopEditing(False)
+            raise
+
+    return changeCounts
+# End of apply changes function
+
+
+# Start of get record hash function
+def getRecordHash(row,hasGeometry):
+    # Hash of the attributes and a hash of the geometry - Numbers are compared as floats so a whole number matches the same value in a double field
+    values = row[1:]
+    geometryHash = None
+    if (hasGeometry):
+        values = row[1:-1]
+        if (row[-1]):
+            geometryHash = hashlib.md5(bytes(row[-1].WKB)).digest()
+    values = [float(value) if isinstance(value, numbers.Number) else value for value in values]
+
+    return hashlib.md5(repr(values).encode('utf-8')).digest(),geometryHash
+# End of get record hash function
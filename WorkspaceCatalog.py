@@ -0,0 +1,176 @@
+#-------------------------------------------------------------
+# Name:       Workspace Catalog
+# Purpose:    Shared catalog of the datasets in a workspace used by the toolkit scripts. Caches the results of
+#             List*, Describe, Exists, ListFields, ListDomains and GetCount calls so each object is only looked up
+#             once per run, which saves a round trip to the database for every repeated call on an enterprise
+#             geodatabase. Writes the toolkit makes itself need to call invalidate with the path changed, and
+#             setCount can record the number of records a load wrote so the dataset doesn't need counting.
+#             hasRecords reads one record to check a dataset isn't empty without counting it.
+# Author:     Shaun Weston (shaun_weston@eagle.co.nz)
+# Date Created:    18/10/2026
+# Last Updated:    18/10/2026
+# Copyright:   (c) Eagle Technology
+# ArcGIS Version:   ArcGIS for Desktop 10.1+
+# Python Version:   2.7/3.x
+#--------------------------------
+
+# Import main modules
+import os
+import arcpy
+
+# Set global variables
+# Catalog cache - Each cache is keyed by the lower case path to the dataset or workspace
+describeCache = {}
+existsCache = {}
+fieldsCache = {}
+domainsCache = {}
+listCache = {}
+countCache = {}
+
+
+# Start of get key function
+def getKey(path):
+    # Use the same key no matter the case or slashes used in the path
+    return path.replace("/", "\\").rstrip("\\").lower()
+# End of get key function
+
+
+# Start of walk workspace function
+def walkWorkspace(workspace):
+    # List the feature datasets, feature classes and tables in the workspace once and cache them
+    for featureDataset in listDatasets(workspace, "", "Feature"):
+        existsCache[getKey(os.path.join(workspace, featureDataset))] = True
+        for featureClass in listFeatureClasses(workspace, "", "", featureDataset):
+            existsCache[getKey(os.path.join(workspace, featureDataset, featureClass))] = True
+    for featureClass in listFeatureClasses(workspace):
+        existsCache[getKey(os.path.join(workspace, featureClass))] = True
+    for table in listTables(workspace):
+        existsCache[getKey(os.path.join(workspace, table))] = True
+# End of walk workspace function
+
+
+# Start of list datasets function
+def listDatasets(workspace,wildCard="",featureType=""):
+    key = (getKey(workspace), "Datasets", wildCard, featureType, "")
+    if key not in listCache:
+        arcpy.env.workspace = workspace
+        listCache[key] = arcpy.ListDatasets(wildCard, featureType) or []
+    return list(listCache[key])
+# End of list datasets function
+
+
+# Start of list feature classes function
+def listFeatureClasses(workspace,wildCard="",featureType="",featureDataset=""):
+    key = (getKey(workspace), "FeatureClasses", wildCard, featureType, featureDataset.lower())
+    if key not in listCache:
+        arcpy.env.workspace = workspace
+        listCache[key] = arcpy.ListFeatureClasses(wildCard, featureType, featureDataset) or []
+    return list(listCache[key])
+# End of list feature classes function
+
+
+# Start of list tables function
+def listTables(workspace,wildCard="",tableType=""):
+    key = (getKey(workspace), "Tables", wildCard, tableType, "")
+    if key not in listCache:
+        arcpy.env.workspace = workspace
+        listCache[key] = arcpy.ListTables(wildCard, tableType) or []
+    return list(listCache[key])
+# End of list tables function
+
+
+# Start of describe function
+def describe(path):
+    key = getKey(path)
+    if key not in describeCache:
+        describeCache[key] = arcpy.Describe(path)
+    return describeCache[key]
+# End of describe function
+
+
+# Start of exists function
+def exists(path):
+    key = getKey(path)
+    if key not in existsCache:
+        existsCache[key] = bool(arcpy.Exists(path))
+    return existsCache[key]
+# End of exists function
+
+
+# Start of list fields function
+def listFields(path):
+    key = getKey(path)
+    if key not in fieldsCache:
+        fieldsCache[key] = arcpy.ListFields(path)
+    return list(fieldsCache[key])
+# End of list fields function
+
+
+# Start of list domains function
+def listDomains(workspace):
+    key = getKey(workspace)
+    if key not in domainsCache:
+        domainsCache[key] = arcpy.da.ListDomains(workspace)
+    return list(domainsCache[key])
+# End of list domains function
+
+
+# Start of get count function
+def getCount(path):
+    # Counting can be a full table scan on an enterprise geodatabase, so each dataset is only counted once
+    key = getKey(path)
+    if key not in countCache:
+        countCache[key] = int(str(arcpy.GetCount_management(path)))
+    return countCache[key]
+# End of get count function
+
+
+# Start of set count function
+def setCount(path,count):
+    # Record the count of a dataset known from loading it e.g. the number of records inserted
+    if (count is not None):
+        countCache[getKey(path)] = int(count)
+    # Number of records loaded isn't known so the dataset needs counting again
+    else:
+        countCache.pop(getKey(path), None)
+# End of set count function
+
+
+# Start of has records function
+def hasRecords(path):
+    # Use the count if the dataset has been counted, otherwise read the first record rather than counting the whole dataset
+    key = getKey(path)
+    if key in countCache:
+        return countCache[key] > 0
+    with arcpy.da.SearchCursor(path, ["OID@"]) as searchCursor:
+        for row in searchCursor:
+            return True
+    return False
+# End of has records function
+
+
+# Start of invalidate function
+def invalidate(path):
+    # Remove the cached entries for the path, anything inside it and the lists of the workspace it is in
+    key = getKey(path)
+    for cache in [describeCache, existsCache, fieldsCache, domainsCache, countCache]:
+        for cacheKey in list(cache.keys()):
+            if (cacheKey == key) or (cacheKey.startswith(key + "\\")):
+                del cache[cacheKey]
+    for cacheKey in list(listCache.keys()):
+        if (cacheKey[0] == key) or (key.startswith(cacheKey[0] + "\\")) or (cacheKey[0].startswith(key + "\\")):
+            del listCache[cacheKey]
+    # Describe of a feature dataset or workspace includes its children
+    parentKey = key
+    while ("\\" in parentKey):
+        parentKey = parentKey.rsplit("\\", 1)[0]
+        describeCache.pop(parentKey, None)
+# End of invalidate function
+
+
+# Start of clear function
+def clear():
+    # Empty the catalog e.g. when changes have been made outside the toolkit
+    for cache in [describeCache, existsCache, fieldsCache, domainsCache, listCache, countCache]:
+        cache.clear()
+# End of clear function